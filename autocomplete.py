@@ -0,0 +1,245 @@
+# Standard library imports
+import logging
+import math
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Local imports
+from gazetteer import Place, trigrams
+from textutils import fold
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Minimum share of the query's trigrams a name must contain to be suggested
+# when no name starts with the query
+FUZZY_CONTAINMENT = 0.5
+
+
+class Suggestion(NamedTuple):
+    """A completion offered for a partial query."""
+    name: str
+    kind: str  # 'stop', 'place' or 'line'
+    detail: str  # line long name, '' otherwise
+
+
+def word_keys(key: str) -> List[str]:
+    """Return a folded name and each of its suffixes starting at a word.
+
+    Args:
+        key: Folded name, e.g. "gare saint jean"
+
+    Returns:
+        List[str]: e.g. ["gare saint jean", "saint jean", "jean"]
+    """
+    return [key] + [key[i + 1:] for i, c in enumerate(key) if c == ' ']
+
+
+class Autocomplete:
+    """Keystroke autocomplete over stop, place and line names.
+
+    Every name is indexed under its folded form and under each of its later
+    words, so "jean" also finds "Gare Saint-Jean". The index is a prefix
+    trie stored as a dict from prefix to the ``limit`` most popular entries
+    below it, so a keystroke costs one dict lookup. A prefix with at most
+    ``limit`` entries below it is a leaf: longer prefixes are not stored,
+    they are answered by filtering the leaf's entries. When no name starts
+    with the query (a typo), names containing most of the query's trigrams
+    are suggested instead.
+
+    Popularity starts from a static score (e.g. the number of lines serving
+    a stop) and grows with :meth:`record`.
+    """
+
+    def __init__(self, limit: int = 10) -> None:
+        """Create an empty index.
+
+        Args:
+            limit: Maximum number of suggestions per query
+        """
+        self.limit = limit
+        self.entries: List[Suggestion] = []
+        self._scores: List[float] = []
+        self._ids: Dict[str, int] = {}
+        self._keys: List[List[str]] = []
+        self._nodes: Dict[str, List[int]] = {'': []}
+        self._leaves: Set[str] = set()
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+        self._grams: List[frozenset] = []
+        self.queries = 0
+        self.fuzzy_queries = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def build(
+        self,
+        places: Iterable[Place],
+        lines: Iterable[Tuple[str, str]] = (),
+        popularity: Optional[Callable[[Place], float]] = None
+    ) -> None:
+        """Index places and lines, replacing the current index.
+
+        Args:
+            places: Stops and landmarks
+            lines: Lines as (short name, long name)
+            popularity: Static score of a place; lines score above every place
+        """
+        self.entries = []
+        self._scores = []
+        self._ids = {}
+        folded = []
+        for place in places:
+            key = fold(place.name)
+            if key and self._ids.setdefault(f"{place.kind}:{key}", len(self.entries)) == len(self.entries):
+                self.entries.append(Suggestion(place.name, place.kind, ''))
+                self._scores.append(popularity(place) if popularity else 0.0)
+                folded.append(key)
+        top_score = max(self._scores, default=0.0) + 1
+        for short, long in lines:
+            key = fold(short)
+            if key and self._ids.setdefault(f"line:{key}", len(self.entries)) == len(self.entries):
+                self.entries.append(Suggestion(short, 'line', long))
+                self._scores.append(top_score)
+                folded.append(key)
+
+        self._keys = []
+        self._trigrams = defaultdict(list)
+        self._grams = []
+        for entry_id, key in enumerate(folded):
+            # Lines are only completed from their own name, not from words
+            # of their long name
+            self._keys.append([key] if self.entries[entry_id].kind == 'line' else word_keys(key))
+            grams = frozenset(sys.intern(gram) for gram in trigrams(key))
+            self._grams.append(grams)
+            for gram in grams:
+                self._trigrams[gram].append(entry_id)
+
+        order = sorted(range(len(self.entries)), key=self._rank)
+        position = {entry_id: i for i, entry_id in enumerate(order)}
+        keys = sorted((key, entry_id) for entry_id, entry_keys in enumerate(self._keys) for key in entry_keys)
+        self._nodes = {}
+        self._leaves = set()
+        self._split('', keys, 0, len(keys), position)
+        logger.info(f"Autocomplete index built with {len(self.entries)} names, {len(self._nodes)} prefixes")
+
+    def _split(self, prefix: str, keys: List[Tuple[str, int]], lo: int, hi: int, position: Dict[int, int]) -> None:
+        # keys[lo:hi] are the sorted keys starting with prefix
+        below = sorted({entry_id for _, entry_id in keys[lo:hi]}, key=position.__getitem__)
+        self._nodes[prefix] = below[:self.limit]
+        if len(below) <= self.limit:
+            self._leaves.add(prefix)
+            return
+        depth = len(prefix)
+        # Keys equal to the prefix sort first and have no next character
+        while lo < hi and len(keys[lo][0]) == depth:
+            lo += 1
+        while lo < hi:
+            child = keys[lo][0][:depth + 1]
+            end = bisect_left(keys, (child + '\uffff',), lo, hi)
+            self._split(child, keys, lo, end, position)
+            lo = end
+
+    def _rank(self, entry_id: int) -> Tuple[float, int, str]:
+        entry = self.entries[entry_id]
+        return (-self._scores[entry_id], len(entry.name), entry.name)
+
+    def _prefixed(self, key: str) -> List[int]:
+        # The key's own node, or else the entries of the leaf above it that
+        # start with the key
+        top = self._nodes.get(key)
+        if top is not None:
+            return top
+        for i in range(len(key) - 1, -1, -1):
+            prefix = key[:i]
+            if prefix in self._nodes:
+                if prefix not in self._leaves:
+                    return []
+                return [
+                    entry_id for entry_id in self._nodes[prefix]
+                    if any(k.startswith(key) for k in self._keys[entry_id])
+                ]
+        return []
+
+    def complete(self, query: str, limit: Optional[int] = None) -> List[Suggestion]:
+        """Return the names completing a partial query, most popular first.
+
+        Args:
+            query: What the user has typed so far
+            limit: Maximum number of suggestions, at most the index's limit
+
+        Returns:
+            List[Suggestion]: Prefix matches, or similar names if there are
+            none; the most popular names for an empty query
+        """
+        self.queries += 1
+        limit = min(limit or self.limit, self.limit)
+        key = fold(query)
+        top = self._prefixed(key)
+        if top:
+            return [self.entries[entry_id] for entry_id in top[:limit]]
+        self.fuzzy_queries += 1
+        return [self.entries[entry_id] for entry_id in self._fuzzy(key, limit)]
+
+    def _fuzzy(self, key: str, limit: int) -> List[int]:
+        if not key:
+            return []
+        grams = trigrams(key)
+        # The query's last word may be unfinished: drop its end-of-word trigram
+        grams.discard(f"  {key} "[-3:])
+        present = sorted((g for g in grams if g in self._trigrams), key=lambda g: len(self._trigrams[g]))
+        # A name containing at least `needed` of the query's trigrams contains
+        # one of the rarest len(present) - needed + 1 of them
+        needed = max(1, math.ceil(FUZZY_CONTAINMENT * len(grams)))
+        if len(present) < needed:
+            return []
+        candidates = set(chain.from_iterable(self._trigrams[g] for g in present[:len(present) - needed + 1]))
+        scored = []
+        for entry_id in candidates:
+            common = len(grams & self._grams[entry_id])
+            if common >= needed:
+                scored.append((-common, self._rank(entry_id), entry_id))
+        scored.sort()
+        return [entry_id for _, _, entry_id in scored[:limit]]
+
+    def record(self, name: str, kind: str = 'stop', weight: float = 1.0) -> None:
+        """Make a name more popular, e.g. when a user looks up its departures.
+
+        The top entries of the prefixes of the name's keys are updated in
+        place.
+
+        Args:
+            name: The name, in any case or accents
+            kind: 'stop', 'place' or 'line'
+            weight: Score to add
+        """
+        entry_id = self._ids.get(f"{kind}:{fold(name)}")
+        if entry_id is None:
+            return
+        self._scores[entry_id] += weight
+        rank = self._rank(entry_id)
+        for key in self._keys[entry_id]:
+            for i in range(len(key) + 1):
+                top = self._nodes.get(key[:i])
+                if top is None:
+                    break
+                if entry_id in top:
+                    top.sort(key=self._rank)
+                elif rank < self._rank(top[-1]):
+                    top[-1] = entry_id
+                    top.sort(key=self._rank)
+
+    def stats(self) -> Dict[str, int]:
+        """Return index size and query counters.
+
+        Returns:
+            Dict[str, int]: Autocomplete counters
+        """
+        return {
+            'names': len(self.entries),
+            'prefixes': len(self._nodes),
+            'queries': self.queries,
+            'fuzzy_queries': self.fuzzy_queries
+        }
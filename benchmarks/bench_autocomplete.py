@@ -0,0 +1,104 @@
+"""Benchmark: inline-query autocomplete latency per keystroke.
+
+Loads the bundled landmarks plus a stop list into the autocomplete index,
+then replays users typing stop names one character at a time, with and
+without a typo, and reports p50/p99 latency per keystroke against the
+gazetteer's prefix search. Pass a GTFS stops.txt (or GTFS zip) to measure
+the real TBM stop set; without one, a synthetic network of the same size
+is generated.
+
+Usage:
+    python benchmarks/bench_autocomplete.py [--stops path/to/stops.txt] [--synthetic 3600]
+"""
+# Standard library imports
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from autocomplete import Autocomplete
+from gazetteer import Place, load_gazetteer
+
+PLACES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'places.csv')
+
+PREFIXES = ['', '', '', 'Place ', 'Rue ', 'Avenue ', 'Cours ', 'Gare ', 'Parc ', 'Lycée ', 'Collège ', 'Église ']
+SYLLABLES = ['ba', 'bè', 'ca', 'cha', 'de', 'fon', 'ga', 'lor', 'ma', 'mé', 'ne', 'pa', 'pel', 'ri',
+             'sa', 'ta', 'ton', 'vi', 'ge', 'ron', 'mont', 'bor', 'lac', 'cen', 'flo', 'ac', 'is', 'et']
+
+
+def synthetic_stops(count: int, rng: random.Random) -> List[Place]:
+    vocabulary = [
+        ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        for _ in range(count // 2)
+    ]
+    names = set()
+    while len(names) < count:
+        names.add(rng.choice(PREFIXES) + ' '.join(rng.sample(vocabulary, rng.randint(1, 2))))
+    return [Place(name, 44.84, -0.58, 'stop') for name in sorted(names)]
+
+
+def keystrokes(name: str) -> List[str]:
+    return [name[:i] for i in range(1, len(name) + 1)]
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(name))
+    return name[:i] + name[i + 1:]
+
+
+def bench(name: str, fn: Callable[[str], object], queries: List[str]) -> None:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = statistics.median(timings) * 1e6
+    p99 = timings[int(len(timings) * 0.99)] * 1e6
+    print(f"{name:<32} p50 {p50:8.1f} us   p99 {p99:8.1f} us   ({len(queries)} keystrokes)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stops', help='GTFS stops.txt or GTFS zip')
+    parser.add_argument('--synthetic', type=int, default=3600, help='synthetic stop count without --stops')
+    parser.add_argument('--names', type=int, default=500, help='stop names typed')
+    parser.add_argument('--limit', type=int, default=10, help='suggestions per query')
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    gazetteer = load_gazetteer(PLACES_PATH, args.stops)
+    if not args.stops:
+        for place in synthetic_stops(args.synthetic, rng):
+            gazetteer.add(place)
+    lines = [(str(i), f'Ligne {i}') for i in range(1, 90)] + [(letter, f'Tram {letter}') for letter in 'ABCD']
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    autocomplete = Autocomplete(limit=args.limit)
+    autocomplete.build(gazetteer.places, lines, popularity=lambda place: rng.randint(1, 6))
+    build_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{len(autocomplete)} names indexed in {build_time * 1000:.1f} ms, {memory / 1024:.0f} KiB")
+
+    names = [rng.choice(gazetteer.places).name for _ in range(args.names)]
+    typed = [query for name in names for query in keystrokes(name)]
+    misspelt = [query for name in names for query in keystrokes(typo(name, rng))]
+    gazetteer.search('a')  # build the prefix index
+    bench("gazetteer.search, typing", lambda q: gazetteer.search(q, args.limit), typed)
+    bench("autocomplete, typing", autocomplete.complete, typed)
+    bench("autocomplete, typing a typo", autocomplete.complete, misspelt)
+    bench("autocomplete.record", autocomplete.record, names)
+    print(f"{autocomplete.fuzzy_queries} of {autocomplete.queries} queries needed the trigram fallback")
+
+
+if __name__ == '__main__':
+    main()
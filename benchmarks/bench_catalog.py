@@ -0,0 +1,65 @@
+"""Microbenchmark: translation catalog startup and multi-row replies.
+
+Times compiling the default language against compiling every language,
+and rendering a departure list by repeated ``+=`` against
+``Messages.rows``, as the reply grows.
+
+Usage:
+    python benchmarks/bench_catalog.py [--repeat 2000]
+"""
+# Standard library imports
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from catalog import MessageCatalog, Messages
+from translations import TRANSLATIONS
+
+
+def per_call(func: Callable[[], object], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def concatenate(messages: Messages, rows: List[Dict[str, str]]) -> str:
+    message = messages['transport_info'].format('Gambetta')
+    for info in rows:
+        message += f"\n{info['line']} - {info['destination']} ({info['time']})"
+    return message
+
+
+def join(messages: Messages, rows: List[Dict[str, str]]) -> str:
+    return messages.rows(messages['transport_info'].format('Gambetta'), 'departure_row', rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    default_only = per_call(lambda: MessageCatalog(TRANSLATIONS.get, 'fr'), args.repeat)
+    every_language = per_call(lambda: MessageCatalog(TRANSLATIONS.get, 'fr', preload=TRANSLATIONS), args.repeat)
+    print(f"startup, default language only: {default_only * 1e6:7.1f} us")
+    print(f"startup, {len(TRANSLATIONS)} languages:          {every_language * 1e6:7.1f} us")
+
+    messages = MessageCatalog(TRANSLATIONS.get, 'fr').get('en')
+    for count in (10, 100, 1000):
+        rows = [
+            {'line': f'L{i % 20}', 'destination': f'Destination {i}', 'time': f'{i % 24:02d}:{i % 60:02d}'}
+            for i in range(count)
+        ]
+        assert concatenate(messages, rows) == join(messages, rows)
+        concatenated = per_call(lambda: concatenate(messages, rows), args.repeat)
+        joined = per_call(lambda: join(messages, rows), args.repeat)
+        print(f"{count:5d} rows: += {concatenated * 1e6:8.1f} us, rows() {joined * 1e6:8.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Load test: a local fake API through an outage, with and without the breaker.
+
+Starts a fake departures API on localhost whose behaviour follows a
+schedule: healthy, then failing (HTTP 500 or hanging until the client
+timeout), then healthy again. Simulated users request departures for a set
+of locations through the same path as the bot: a TTL cache with stale
+fallback in front of a request with linear-backoff retries, called
+directly or through CircuitBreaker. Reports, per phase, how requests were
+answered (fresh, stale, error), their latency, and how many requests
+reached the fake API. Times are scaled down (1 s cache TTL, 1 s timeout).
+
+Usage:
+    python benchmarks/bench_circuit_breaker.py [--outage error|hang] [--users 50] [--phase 6]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import aiohttp
+from aiohttp import web
+
+# Local imports
+from cache import TTLCache
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+TIMEOUT = 1.0  # seconds, API_TIMEOUT scaled down
+RETRIES = 3
+RETRY_DELAY = 0.1  # seconds
+
+
+class FakeAPI:
+    def __init__(self, outage: str) -> None:
+        self.outage = outage
+        self.healthy = True
+        self.requests = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.healthy:
+            await asyncio.sleep(0.02)
+            return web.json_response({'results': [
+                {'line': 'A', 'destination': 'La Gardette', 'time': '12:00', 'type': 'tram'}
+            ]})
+        if self.outage == 'hang':
+            await asyncio.sleep(3600)
+        return web.Response(status=500)
+
+
+class UpstreamError(Exception):
+    pass
+
+
+async def request_once(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+    async with session.get(url, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as response:
+        if response.status >= 500:
+            raise UpstreamError(response.status)
+        return await response.json()
+
+
+async def request(session: aiohttp.ClientSession, url: str, breaker: Optional[CircuitBreaker]) -> Dict[str, Any]:
+    for attempt in range(RETRIES):
+        try:
+            if breaker is None:
+                return await request_once(session, url)
+            return await breaker.call(request_once, session, url)
+        except CircuitOpenError:
+            raise
+        except (UpstreamError, aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == RETRIES - 1:
+                raise
+            await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+    raise AssertionError('unreachable')
+
+
+async def run(args: argparse.Namespace, with_breaker: bool) -> None:
+    api = FakeAPI(args.outage)
+    app = web.Application()
+    app.router.add_get('/departures', api.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/departures"
+
+    cache = TTLCache(ttl=1.0, maxsize=1000, stale_ttl=60.0)
+    breaker = CircuitBreaker('fake API', min_calls=5, slow_call=TIMEOUT / 2, open_duration=2.0) if with_breaker else None
+    outcomes: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    upstream: Dict[str, int] = defaultdict(int)
+    phase = 'healthy'
+    rng = random.Random(1)
+
+    async def user(session: aiohttp.ClientSession, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            location = rng.randrange(args.locations)
+            started = time.monotonic()
+            current = phase
+            try:
+                await cache.get_or_load(location, lambda: request(session, url, breaker))
+                kind = 'fresh'
+            except Exception:
+                kind = 'stale' if cache.get_stale(location) is not None else 'error'
+            outcomes[current][kind].append(time.monotonic() - started)
+            await asyncio.sleep(rng.expovariate(1 / args.think))
+
+    async with aiohttp.ClientSession() as session:
+        deadline = time.monotonic() + 3 * args.phase
+        users = [asyncio.create_task(user(session, deadline)) for _ in range(args.users)]
+        for phase, healthy in (('healthy', True), ('outage', False), ('recovered', True)):
+            api.healthy = healthy
+            before = api.requests
+            await asyncio.sleep(args.phase)
+            upstream[phase] = api.requests - before
+        await asyncio.gather(*users)
+    await runner.cleanup()
+
+    print(f"{'with breaker' if with_breaker else 'retries only'} ({args.outage} outage)")
+    for name in ('healthy', 'outage', 'recovered'):
+        latencies = sorted(t for times in outcomes[name].values() for t in times)
+        counts = ', '.join(f"{kind} {len(outcomes[name][kind])}" for kind in ('fresh', 'stale', 'error'))
+        print(
+            f"  {name:<10} {counts:<34} p50 {statistics.median(latencies) * 1000:6.0f} ms, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.0f} ms, {upstream[name]} upstream requests"
+        )
+    if breaker is not None:
+        print(f"  breaker: {breaker.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--outage', choices=('error', 'hang'), default='hang')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--locations', type=int, default=20)
+    parser.add_argument('--think', type=float, default=0.2, help='mean seconds between requests of a user')
+    parser.add_argument('--phase', type=float, default=6.0, help='seconds per phase')
+    args = parser.parse_args()
+    asyncio.run(run(args, with_breaker=False))
+    asyncio.run(run(args, with_breaker=True))
+
+
+if __name__ == '__main__':
+    main()
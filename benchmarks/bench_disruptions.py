@@ -0,0 +1,78 @@
+"""Microbenchmark: recipients of a disruption alert, index vs full scan.
+
+Subscribes users to random favorite stops, each served by a few lines, then
+resolves the recipients of random one-line and one-stop alerts through the
+subscription index and, for comparison, by scanning every favorite. Checks
+that both agree, including after some users unsubscribe.
+
+Usage:
+    python benchmarks/bench_disruptions.py [--users 100000] [--stops 3000] [--lines 80]
+"""
+# Standard library imports
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from disruptions import SubscriptionIndex
+
+
+def full_scan(favorites: Set[Tuple[int, str]], stop_lines: Dict[str, List[str]], line: str, stop: str) -> Set[int]:
+    return {
+        user for user, favorite in favorites
+        if favorite == stop or line in stop_lines[favorite]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--stops', type=int, default=3000)
+    parser.add_argument('--lines', type=int, default=80)
+    parser.add_argument('--alerts', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    lines = [str(n) for n in range(1, args.lines + 1)]
+    stop_lines = {f"Stop {i}": rng.sample(lines, rng.randint(1, 4)) for i in range(args.stops)}
+    stops = list(stop_lines)
+    favorites = {(user, rng.choice(stops)) for user in range(args.users) for _ in range(rng.randint(1, 3))}
+
+    index = SubscriptionIndex(lambda stop: stop_lines[stop])
+    start = time.perf_counter()
+    for user, stop in favorites:
+        index.subscribe(user, stop)
+    print(f"{len(favorites)} favorites indexed in {(time.perf_counter() - start) * 1000:.0f} ms: {index.stats()}")
+
+    removed = set(rng.sample(sorted(favorites), len(favorites) // 10))
+    for user, stop in removed:
+        index.unsubscribe(user, stop)
+    favorites -= removed
+
+    indexed: List[float] = []
+    scanned: List[float] = []
+    sizes: List[int] = []
+    for _ in range(args.alerts):
+        line, stop = rng.choice(lines), rng.choice(stops)
+        start = time.perf_counter()
+        recipients = index.recipients([line], [stop])
+        indexed.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = full_scan(favorites, stop_lines, line, stop)
+        scanned.append(time.perf_counter() - start)
+        assert recipients == expected, "index and scan disagree"
+        sizes.append(len(recipients))
+
+    print(f"median {statistics.median(sizes):.0f} recipients per alert")
+    print(f"index:     p50 {statistics.median(indexed) * 1000:.2f} ms, max {max(indexed) * 1000:.2f} ms")
+    print(f"full scan: p50 {statistics.median(scanned) * 1000:.2f} ms, max {max(scanned) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
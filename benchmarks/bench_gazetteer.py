@@ -0,0 +1,98 @@
+"""Benchmark: gazetteer lookup latency and memory footprint.
+
+Loads the bundled landmarks plus a stop list and times exact, typo and
+prefix lookups. Pass a GTFS stops.txt (or GTFS zip) to measure the real TBM
+stop set; without one, a synthetic network of the same size is generated.
+
+Usage:
+    python benchmarks/bench_gazetteer.py [--stops path/to/stops.txt] [--synthetic 3600]
+"""
+# Standard library imports
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from gazetteer import Place, load_gazetteer
+
+PLACES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'places.csv')
+
+PREFIXES = ['', '', '', 'Place ', 'Rue ', 'Avenue ', 'Cours ', 'Gare ', 'Parc ', 'Lycée ', 'Collège ', 'Église ']
+SYLLABLES = ['ba', 'bè', 'ca', 'cha', 'de', 'fon', 'ga', 'lor', 'ma', 'mé', 'ne', 'pa', 'pel', 'ri',
+             'sa', 'ta', 'ton', 'vi', 'ge', 'ron', 'mont', 'bor', 'lac', 'cen', 'flo', 'ac', 'is', 'et']
+
+
+def synthetic_word(rng: random.Random) -> str:
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+
+def synthetic_stops(count: int, rng: random.Random) -> List[Place]:
+    # Roughly mimics TBM naming: a few thousand names over a vocabulary of
+    # place and person names, some with a street-type prefix
+    vocabulary = [synthetic_word(rng) for _ in range(count // 2)]
+    names = set()
+    while len(names) < count:
+        name = rng.choice(PREFIXES) + ' '.join(rng.sample(vocabulary, rng.randint(1, 2)))
+        names.add(name)
+    return [
+        Place(name, 44.84 + rng.uniform(-0.1, 0.1), -0.58 + rng.uniform(-0.12, 0.12), 'stop')
+        for name in sorted(names)
+    ]
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + name[i + 1:]
+
+
+def bench(name: str, fn: Callable[[str], object], queries: List[str]) -> None:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = statistics.median(timings) * 1e6
+    p99 = timings[int(len(timings) * 0.99)] * 1e6
+    print(f"{name:<20} p50 {p50:8.1f} us   p99 {p99:8.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stops', help='GTFS stops.txt or GTFS zip')
+    parser.add_argument('--synthetic', type=int, default=3600, help='synthetic stop count without --stops')
+    parser.add_argument('--queries', type=int, default=5000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    if args.stops:
+        gazetteer = load_gazetteer(PLACES_PATH, args.stops)
+    else:
+        gazetteer = load_gazetteer(PLACES_PATH, None)
+        for place in synthetic_stops(args.synthetic, rng):
+            gazetteer.add(place)
+    gazetteer.search('a')  # build the prefix index
+    load_time = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{len(gazetteer)} places loaded in {load_time * 1000:.1f} ms, {memory / 1024:.0f} KiB")
+
+    names = [rng.choice(gazetteer.places).name for _ in range(args.queries)]
+    bench("exact lookup", gazetteer.lookup, names)
+    bench("typo lookup", gazetteer.lookup, [typo(n, rng) for n in names])
+    bench("prefix search", gazetteer.search, [n[:4] for n in names])
+    bench("miss", gazetteer.lookup, ['zzqx ' + str(i) for i in range(args.queries)])
+
+
+if __name__ == '__main__':
+    main()
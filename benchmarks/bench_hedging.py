@@ -0,0 +1,145 @@
+"""Load test: tail latency of a local fake API, with and without hedging.
+
+Starts a fake departures API on localhost that usually answers in about
+20 ms but, for a share of requests, stalls for a second (a slow replica or
+a lost packet). Simulated users call it through Hedger, disabled then
+enabled, and the benchmark reports latency percentiles and the extra
+requests hedging cost. The last two runs hang every request, to show calls
+giving up at the handler deadline instead of after all their timeouts and
+retries.
+
+Usage:
+    python benchmarks/bench_hedging.py [--users 20] [--requests 100] [--stall 0.03]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import aiohttp
+from aiohttp import web
+
+# Local imports
+from upstream import DeadlineExceeded, Hedger, backoff, budget, deadline
+
+TIMEOUT = 2.0  # seconds, API_TIMEOUT scaled down
+RETRIES = 3
+RETRY_DELAY = 0.1  # seconds
+DEADLINE = 1.5  # seconds, handler deadline scaled down
+
+
+class FakeAPI:
+    def __init__(self, stall: float, stall_time: float, seed: int = 1) -> None:
+        self.stall = stall
+        self.stall_time = stall_time
+        self.requests = 0
+        self._rng = random.Random(seed)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self._rng.random() < self.stall:
+            await asyncio.sleep(self.stall_time)
+        else:
+            await asyncio.sleep(self._rng.uniform(0.01, 0.03))
+        return web.json_response({'results': [
+            {'line': 'A', 'destination': 'La Gardette', 'time': '12:00', 'type': 'tram'}
+        ]})
+
+
+async def request_once(session: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+    timeout = aiohttp.ClientTimeout(total=budget(TIMEOUT))
+    async with session.get(url, timeout=timeout) as response:
+        return await response.json()
+
+
+async def request(session: aiohttp.ClientSession, url: str, hedger: Hedger) -> Dict[str, Any]:
+    for attempt in range(RETRIES):
+        if attempt:
+            await backoff(attempt - 1, RETRY_DELAY, 1.0)
+        try:
+            return await hedger.call(request_once, session, url)
+        except DeadlineExceeded:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == RETRIES - 1:
+                raise
+    raise AssertionError('unreachable')
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+
+
+async def run(args: argparse.Namespace, name: str, stall: float, hedging: bool, with_deadline: bool) -> None:
+    api = FakeAPI(stall, 1.0 if stall < 1 else 60.0)
+    app = web.Application()
+    app.router.add_get('/departures', api.handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/departures"
+
+    hedger = Hedger(enabled=hedging, max_ratio=args.max_ratio)
+    latencies: List[float] = []
+    failures = 0
+
+    async def user(session: aiohttp.ClientSession) -> None:
+        nonlocal failures
+        for _ in range(args.requests):
+            started = time.monotonic()
+            try:
+                if with_deadline:
+                    with deadline(DEADLINE):
+                        await request(session, url, hedger)
+                else:
+                    await request(session, url, hedger)
+            except Exception:
+                failures += 1
+            latencies.append(time.monotonic() - started)
+            await asyncio.sleep(0.01)
+
+    async with aiohttp.ClientSession() as session:
+        if hedging:
+            # Warm up the latency window
+            for _ in range(hedger.min_samples):
+                await hedger.call(request_once, session, url)
+            hedger.calls = hedger.hedged = hedger.hedge_wins = 0
+        sent = api.requests
+        await asyncio.gather(*[user(session) for _ in range(args.users)])
+        sent = api.requests - sent
+    await runner.cleanup()
+
+    latencies.sort()
+    print(
+        f"{name:<26} p50 {percentile(latencies, 0.5):6.0f} ms  p95 {percentile(latencies, 0.95):6.0f} ms  "
+        f"p99 {percentile(latencies, 0.99):6.0f} ms  max {latencies[-1] * 1000:6.0f} ms  "
+        f"{sent / len(latencies):.2f} requests per call, {failures} failed"
+    )
+    if hedging:
+        print(f"{'':<26} {hedger.stats()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=100, help='requests per user')
+    parser.add_argument('--stall', type=float, default=0.03, help='share of requests stalling for 1 s')
+    parser.add_argument('--max-ratio', type=float, default=0.1, help='share of requests hedged at most')
+    args = parser.parse_args()
+    asyncio.run(run(args, 'no hedging', args.stall, hedging=False, with_deadline=False))
+    asyncio.run(run(args, 'hedging', args.stall, hedging=True, with_deadline=False))
+    args.requests = 2
+    asyncio.run(run(args, 'stalled, no deadline', 1.0, hedging=False, with_deadline=False))
+    asyncio.run(run(args, f'stalled, {DEADLINE:.1f} s deadline', 1.0, hedging=False, with_deadline=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Benchmark: buffered vs streamed parsing of a large departures response.
+
+Serves a departures response with many records from a local aiohttp
+server, in a child process so its buffers are not counted, and reads it
+the way the bot used to (``response.json()``, then a copy of every
+record) and through json_stream, reading every record or only the first
+``API_MAX_RESULTS``. Reports time and peak Python memory (tracemalloc)
+per read; the streamed reads use 64 KiB chunks, as the bot.
+
+Usage:
+    python benchmarks/bench_json_stream.py [--records 100000] [--limit 100]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import tracemalloc
+from contextlib import aclosing
+from typing import Any, Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import aiohttp
+from aiohttp import web
+
+# Local imports
+from http_pool import discard
+from json_stream import iter_array
+
+FIELDS = ('line', 'destination', 'time', 'type')
+CHUNK_SIZE = 64 * 1024
+
+
+async def read_buffered(response: aiohttp.ClientResponse, limit: int) -> List[Dict[str, Any]]:
+    data = await response.json()
+    return [{field: item[field] for field in FIELDS} for item in data.get('results', [])][:limit]
+
+
+async def read_streamed(response: aiohttp.ClientResponse, limit: int) -> List[Dict[str, Any]]:
+    results = []
+    async with aclosing(iter_array(response.content.iter_chunked(CHUNK_SIZE), 'results')) as records:
+        async for item in records:
+            results.append({field: item[field] for field in FIELDS})
+            if len(results) >= limit:
+                await discard(response)
+                break
+    return results
+
+
+async def measure(
+    session: aiohttp.ClientSession,
+    url: str,
+    name: str,
+    read: Callable[[aiohttp.ClientResponse, int], Awaitable[List[Dict[str, Any]]]],
+    limit: int,
+    runs: int
+) -> None:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        async with session.get(url) as response:
+            results = await read(response, limit)
+        timings.append(time.perf_counter() - started)
+    # Traced separately: tracemalloc slows allocations down
+    tracemalloc.start()
+    async with session.get(url) as response:
+        await read(response, limit)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<28} {min(timings) * 1000:8.1f} ms  peak {peak / 2 ** 20:7.1f} MiB  ({len(results)} records)")
+
+
+def serve(port: int, records: int) -> None:
+    body = json.dumps({'total': records, 'results': [
+        {
+            'line': str(i % 90 + 1),
+            'destination': f'Destination {i % 500}',
+            'time': f'{i // 60 % 24:02d}:{i % 60:02d}',
+            'type': 'bus',
+            'stop_id': f'BORDEAUX:StopPoint:{i}',
+            'accessible': i % 3 == 0,
+            'realtime': True
+        }
+        for i in range(records)
+    ]}).encode()
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(body=body, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/departures', handle)
+    web.run_app(app, host='127.0.0.1', port=port, print=None, access_log=None)
+
+
+async def run(args: argparse.Namespace) -> None:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = multiprocessing.Process(target=serve, args=(port, args.records), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{port}/departures"
+
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(url) as response:
+                    size = len(await response.read())
+                break
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.1)
+        print(f"{args.records} records, {size / 2 ** 20:.1f} MiB body")
+        await measure(session, url, "response.json() + copy", read_buffered, args.records, args.runs)
+        await measure(session, url, "streamed, all records", read_streamed, args.records, args.runs)
+        await measure(session, url, "buffered, first records", read_buffered, args.limit, args.runs)
+        await measure(session, url, "streamed, first records", read_streamed, args.limit, args.runs)
+    server.terminate()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--limit', type=int, default=100, help='records kept, as API_MAX_RESULTS')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark: latest-location lookup, append-only history vs current-location table.
+
+Seeds a scratch schema in a local Postgres with millions of history rows
+and times three ways of reading a user's latest location:
+
+    1. user_locations ORDER BY created_at DESC LIMIT 1, user_id index only
+    2. the same query with the (user_id, created_at DESC) index
+    3. a primary-key lookup on user_current_locations
+
+Requires psycopg (``pip install "psycopg[binary]"``) and a disposable
+database; the ``bench_locations`` schema is dropped and recreated.
+
+Usage:
+    python benchmarks/bench_location_schema.py --dsn postgresql://localhost/postgres \
+        [--users 100000] [--rows 5000000] [--queries 2000]
+"""
+# Standard library imports
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+# Third-party imports
+import psycopg
+
+SCHEMA = 'bench_locations'
+
+
+def seed(conn: psycopg.Connection, users: int, rows: int) -> None:
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        cur.execute(f"SET search_path TO {SCHEMA}")
+        cur.execute("""
+            CREATE TABLE user_locations (
+                id BIGSERIAL PRIMARY KEY,
+                user_id BIGINT NOT NULL,
+                latitude DOUBLE PRECISION NOT NULL,
+                longitude DOUBLE PRECISION NOT NULL,
+                name TEXT NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+        """)
+        cur.execute("""
+            INSERT INTO user_locations (user_id, latitude, longitude, name, created_at)
+            SELECT (random() * %s)::bigint,
+                   44.84 + random() * 0.1,
+                   -0.58 + random() * 0.1,
+                   'stop ' || g,
+                   NOW() - (random() * INTERVAL '365 days')
+            FROM generate_series(1, %s) AS g
+        """, (users - 1, rows))
+        cur.execute("""
+            CREATE TABLE user_current_locations (
+                user_id BIGINT PRIMARY KEY,
+                latitude DOUBLE PRECISION NOT NULL,
+                longitude DOUBLE PRECISION NOT NULL,
+                name TEXT NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+            )
+        """)
+        cur.execute("""
+            INSERT INTO user_current_locations
+            SELECT DISTINCT ON (user_id) user_id, latitude, longitude, name, created_at
+            FROM user_locations
+            ORDER BY user_id, created_at DESC
+        """)
+        cur.execute("CREATE INDEX idx_user_locations_user_id ON user_locations(user_id)")
+        cur.execute("ANALYZE")
+    conn.commit()
+
+
+def time_query(conn: psycopg.Connection, sql: str, user_ids: List[int]) -> List[float]:
+    timings = []
+    with conn.cursor() as cur:
+        cur.execute(f"SET search_path TO {SCHEMA}")
+        for user_id in user_ids:
+            start = time.perf_counter()
+            cur.execute(sql, (user_id,))
+            cur.fetchone()
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> None:
+    timings.sort()
+    p50 = statistics.median(timings) * 1e3
+    p99 = timings[int(len(timings) * 0.99)] * 1e3
+    print(f"{name:<44} p50 {p50:8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dsn', default='postgresql://localhost/postgres')
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    user_ids = [rng.randrange(args.users) for _ in range(args.queries)]
+    history_sql = "SELECT * FROM user_locations WHERE user_id = %s ORDER BY created_at DESC LIMIT 1"
+
+    with psycopg.connect(args.dsn) as conn:
+        start = time.perf_counter()
+        seed(conn, args.users, args.rows)
+        print(f"Seeded {args.rows} history rows for {args.users} users in {time.perf_counter() - start:.1f} s")
+
+        report("history, user_id index", time_query(conn, history_sql, user_ids))
+
+        with conn.cursor() as cur:
+            cur.execute(f"SET search_path TO {SCHEMA}")
+            cur.execute("CREATE INDEX idx_user_locations_user_id_created_at ON user_locations(user_id, created_at DESC)")
+            cur.execute("ANALYZE user_locations")
+        conn.commit()
+        report("history, (user_id, created_at desc) index", time_query(conn, history_sql, user_ids))
+
+        report("user_current_locations primary key", time_query(
+            conn, "SELECT * FROM user_current_locations WHERE user_id = %s", user_ids
+        ))
+
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        conn.commit()
+
+
+if __name__ == '__main__':
+    main()
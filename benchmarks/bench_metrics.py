@@ -0,0 +1,65 @@
+"""Microbenchmark: cost of metrics instrumentation per call.
+
+Times an instrumented no-op handler and the recording methods with metrics
+disabled and enabled, against the bare handler. Disabled decorators must
+return the function itself.
+
+Usage:
+    python benchmarks/bench_metrics.py [--calls 200000]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from metrics import Metrics
+
+
+async def handler(update: Any, context: Any) -> None:
+    pass
+
+
+async def per_call(func: Callable[..., Any], calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await func(None, None)
+    return (time.perf_counter() - start) / calls
+
+
+def per_record(metrics: Metrics, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        metrics.upstream('bordeaux_api', 200, 0.05)
+    return (time.perf_counter() - start) / calls
+
+
+async def run(args: argparse.Namespace) -> None:
+    disabled = Metrics(enabled=False)
+    assert disabled.handler()(handler) is handler, "disabled decorator wrapped the handler"
+    bare = await per_call(handler, args.calls)
+    print(f"{'bare handler':<26} {bare * 1e9:6.0f} ns/call")
+    print(f"{'disabled, record upstream':<26} {per_record(disabled, args.calls) * 1e9:6.0f} ns/call")
+    try:
+        enabled = Metrics(enabled=True)
+    except ImportError:
+        print("prometheus_client not installed, enabled metrics not measured")
+        return
+    instrumented = await per_call(enabled.handler()(handler), args.calls)
+    print(f"{'enabled, handler':<26} {instrumented * 1e9:6.0f} ns/call (+{(instrumented - bare) * 1e9:.0f} ns)")
+    print(f"{'enabled, record upstream':<26} {per_record(enabled, args.calls) * 1e9:6.0f} ns/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Load test: a reminder burst through the outbound dispatcher with a fake bot.
+
+Queues a burst of alert pushes (a few chats receiving several), then sends
+interactive replies while the burst drains. The fake bot answers after a
+fixed latency and answers one message with a 429 RetryAfter of 5 s. Checks the
+global and per-chat limits from the recorded send times and reports
+interactive latency, queue depth and drain time. Time is scaled by
+--speedup so the test runs faster than Telegram's real 30 msg/s.
+
+Usage:
+    python benchmarks/bench_outbound.py [--messages 3000] [--speedup 10]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+from telegram.error import RetryAfter
+
+# Local imports
+from outbound import ALERT, OutboundDispatcher
+
+
+class FakeBot:
+    def __init__(self, latency: float, flood_at: int, retry_after: float) -> None:
+        self.latency = latency
+        self.flood_at = flood_at
+        self.retry_after = retry_after
+        self.calls = 0
+        self.sent: List[Tuple[float, int]] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs: Any) -> Dict[str, Any]:
+        self.calls += 1
+        call, started = self.calls, time.monotonic()
+        await asyncio.sleep(self.latency)
+        if call == self.flood_at:
+            raise RetryAfter(self.retry_after)
+        self.sent.append((started, chat_id))
+        return {'chat_id': chat_id, 'text': text}
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(3)
+    rate = 30.0 * args.speedup
+    chat_interval = 1.0 / args.speedup
+    dispatcher = OutboundDispatcher(rate=rate, chat_interval=chat_interval, group_interval=3 * chat_interval)
+    bot = FakeBot(latency=0.1 / args.speedup, flood_at=args.messages // 3, retry_after=5 / args.speedup)
+    dispatcher.start(bot)
+
+    start = time.monotonic()
+    chats = [rng.randrange(10**9) for _ in range(args.messages // 3)]
+    for i in range(args.messages):
+        dispatcher.push(rng.choice(chats), f"reminder {i}", priority=ALERT)
+    print(f"{args.messages} alerts queued to {len(set(chats))} chats in {(time.monotonic() - start) * 1000:.0f} ms")
+
+    latencies: List[float] = []
+    depths: List[int] = []
+    for i in range(20):
+        await asyncio.sleep(args.messages / rate / 25)
+        depths.append(dispatcher.depth())
+        t = time.monotonic()
+        await dispatcher.send(10**10 + i, "reply")
+        latencies.append(time.monotonic() - t)
+
+    while dispatcher.depth() or dispatcher.stats()['in_flight']:
+        await asyncio.sleep(0.01)
+    elapsed = time.monotonic() - start
+    await dispatcher.stop()
+
+    times = [t for t, _ in bot.sent]
+    window = max(
+        sum(1 for u in times[i:] if u - t < 1.0 / args.speedup) for i, t in enumerate(times)
+    ) if times else 0
+    per_chat: Dict[int, List[float]] = defaultdict(list)
+    for t, chat in bot.sent:
+        per_chat[chat].append(t)
+    gaps = [b - a for ts in per_chat.values() for a, b in zip(ts, ts[1:])]
+
+    print(f"drained in {elapsed:.2f} s scaled ({elapsed * args.speedup:.0f} s at Telegram rates)")
+    print(f"busiest 1 s window: {window} messages (limit 30)")
+    print(f"closest same-chat gap: {min(gaps) * args.speedup:.2f} s (limit 1.00)" if gaps else "no repeated chats")
+    print(
+        f"interactive reply latency: p50 {statistics.median(latencies) * args.speedup * 1000:.0f} ms, "
+        f"max {max(latencies) * args.speedup * 1000:.0f} ms at Telegram rates, "
+        f"with up to {max(depths)} queued alerts"
+    )
+    print(dispatcher.stats())
+    assert window <= 31, "global rate exceeded"
+    assert not gaps or min(gaps) >= chat_interval * 0.99, "per-chat rate exceeded"
+    assert dispatcher.sent == args.messages + 20, "messages were lost"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=3000)
+    parser.add_argument('--speedup', type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Microbenchmark: per-call cost of the rate limiter at 100k users.
+
+Compares the token-bucket RateLimiter with the previous list-of-datetimes
+implementation for both per-user keys and a single hot shared key.
+
+Usage:
+    python benchmarks/bench_rate_limiter.py [--users 100000] [--calls 500000]
+"""
+# Standard library imports
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from rate_limiter import RateLimiter
+
+
+def legacy_check(rate_limit_dict: Dict[str, List[datetime]], key: str, limit: int) -> bool:
+    """The list-scanning check previously used by check_rate_limit."""
+    now = datetime.now()
+    hour_ago = now - timedelta(hours=1)
+    rate_limit_dict[key] = [t for t in rate_limit_dict[key] if t > hour_ago]
+    if len(rate_limit_dict[key]) >= limit:
+        return False
+    rate_limit_dict[key].append(now)
+    return True
+
+
+def bench(name: str, fn, keys: List[str]) -> None:
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed / len(keys) * 1e9:>10.0f} ns/call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--calls', type=int, default=500_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    user_keys = [str(rng.randrange(args.users)) for _ in range(args.calls)]
+    shared_keys = ['api'] * min(args.calls, 50_000)
+
+    limiter = RateLimiter(capacity=100, period=3600)
+    bench("token bucket, per-user", limiter.allow, user_keys)
+    print(f"{'':<32} {len(limiter)} tracked keys")
+
+    api_limiter = RateLimiter(capacity=1000, period=3600)
+    bench("token bucket, shared 'api' key", api_limiter.allow, shared_keys)
+
+    legacy: Dict[str, List[datetime]] = defaultdict(list)
+    bench("legacy list, per-user", lambda k: legacy_check(legacy, k, 100), user_keys)
+
+    legacy_api: Dict[str, List[datetime]] = defaultdict(list)
+    bench("legacy list, shared 'api' key", lambda k: legacy_check(legacy_api, k, 1000), shared_keys)
+
+
+if __name__ == '__main__':
+    main()
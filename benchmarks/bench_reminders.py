@@ -0,0 +1,98 @@
+"""Load test: 100k daily reminders through the scheduler on a fake clock.
+
+Schedules reminders spread over the day and a few thousand stops, removes
+some of them, then advances a fake clock minute by minute over two days,
+and reports scheduling, removal and per-tick times. The scheduler's
+behaviour is checked by tests/test_reminders.py.
+
+Usage:
+    python benchmarks/bench_reminders.py [--reminders 100000] [--stops 3000]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import List
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from reminders import Reminder, ReminderScheduler
+
+TIMEZONE = ZoneInfo('Europe/Paris')
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(1)
+    clock = FakeClock(datetime(2026, 10, 20, 0, 0, 30, tzinfo=TIMEZONE).timestamp())
+
+    async def on_due(stop: str, reminders: List[Reminder]) -> None:
+        pass
+
+    scheduler = ReminderScheduler(on_due, TIMEZONE, clock=clock)
+    reminders = list({
+        Reminder(
+            rng.randrange(args.reminders),
+            str(rng.randrange(1, 80)),
+            f"Stop {rng.randrange(args.stops)}",
+            f"{rng.choice((6, 7, 7, 8, 8, 8, 12, 17, 17, 18)):02d}:{rng.randrange(60):02d}"
+        )
+        for _ in range(args.reminders)
+    })
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for reminder in reminders:
+        scheduler.add(reminder)
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{len(scheduler)} reminders scheduled in {elapsed * 1000:.0f} ms ({elapsed / len(reminders) * 1e6:.1f} us each), {memory / 1e6:.1f} MB")
+
+    removed = set(rng.sample(reminders, len(reminders) // 10))
+    start = time.perf_counter()
+    for reminder in removed:
+        scheduler.remove(reminder)
+    print(f"{len(removed)} removed in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    ticks: List[float] = []
+    for _ in range(2 * 24 * 60):
+        clock.now += 60
+        start = time.perf_counter()
+        await scheduler.run_due()
+        ticks.append(time.perf_counter() - start)
+
+    ticks.sort()
+    busy = [t for t in ticks if t > 0.0005]
+    print(
+        f"{scheduler.fired} firings in {scheduler.batches} stop batches over 2 days; "
+        f"tick p50 {statistics.median(ticks) * 1e6:.0f} us, p99 {ticks[int(len(ticks) * 0.99)] * 1000:.1f} ms, "
+        f"max {ticks[-1] * 1000:.1f} ms ({len(busy)} busy ticks)"
+    )
+    print(scheduler.stats())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reminders', type=int, default=100000)
+    parser.add_argument('--stops', type=int, default=3000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark: journey planning between random origin/destination stops.
+
+Without --gtfs a synthetic network of Bordeaux's size is generated: about
+3600 stops and 80 lines running both ways every 8-15 minutes from 05:00
+to 24:00, roughly 18k trips and 500k stop times.
+
+Usage:
+    python benchmarks/bench_router.py [--gtfs data/gtfs.zip] [--queries 500] [--date 2026-10-20]
+"""
+# Standard library imports
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from gtfs_static import CACHE_FORMAT, Timetable, format_time
+from router import Router
+from spatial_index import SpatialIndex
+
+
+def synthetic_timetable(stops: int = 3600, lines: int = 80, seed: int = 42) -> Timetable:
+    rng = random.Random(seed)
+    lats = np.array([44.84 + rng.uniform(-0.1, 0.1) for _ in range(stops)])
+    lons = np.array([-0.58 + rng.uniform(-0.13, 0.13) for _ in range(stops)])
+    index = SpatialIndex(lats, lons)
+
+    trip_route: List[int] = []
+    st_trip: List[int] = []
+    st_seq: List[int] = []
+    st_stop: List[int] = []
+    st_time: List[int] = []
+    for line in range(lines):
+        # A line threads the stops nearest to evenly spaced points of a chord
+        a, b = rng.randrange(stops), rng.randrange(stops)
+        steps = max(2, int(math.hypot(lats[a] - lats[b], (lons[a] - lons[b]) * 0.7) / 0.004))
+        sequence: List[int] = []
+        for i in range(steps + 1):
+            f = i / steps
+            ids, _ = index.nearest(lats[a] + f * (lats[b] - lats[a]), lons[a] + f * (lons[b] - lons[a]), k=1)
+            if len(ids) and int(ids[0]) not in sequence:
+                sequence.append(int(ids[0]))
+        if len(sequence) < 2:
+            continue
+        headway = rng.choice((480, 600, 720, 900))
+        for direction in (sequence, sequence[::-1]):
+            start = 5 * 3600 + rng.randrange(headway)
+            while start < 24 * 3600:
+                trip = len(trip_route)
+                trip_route.append(line)
+                clock = start
+                for seq, stop in enumerate(direction):
+                    st_trip.append(trip)
+                    st_seq.append(seq)
+                    st_stop.append(stop)
+                    st_time.append(clock)
+                    clock += 90
+                start += headway
+
+    times = np.array(st_time, dtype=np.int32)
+    return Timetable.build(
+        {
+            'stop_lats': lats,
+            'stop_lons': lons,
+            'trip_route': np.array(trip_route, dtype=np.int32),
+            'trip_service': np.zeros(len(trip_route), dtype=np.int32),
+            'trip_headsign': np.zeros(len(trip_route), dtype=np.int32),
+        },
+        np.array(st_trip, dtype=np.int32),
+        np.array(st_seq, dtype=np.int32),
+        np.array(st_stop, dtype=np.int32),
+        times,
+        times,
+        {
+            'format': CACHE_FORMAT,
+            'stop_ids': [str(i) for i in range(stops)],
+            'stop_names': [f"Stop {i}" for i in range(stops)],
+            'route_ids': [str(i) for i in range(lines)],
+            'route_short_names': [str(i + 1) for i in range(lines)],
+            'route_long_names': [''] * lines,
+            'route_types': [3] * lines,
+            'headsigns': [''],
+            'services': ['ALL'],
+            'calendar': {0: [127, 20000101, 20991231]},
+            'exceptions': [],
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--gtfs', help='GTFS zip; a synthetic network is used otherwise')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--date', type=date.fromisoformat, default=date(2026, 10, 20))
+    args = parser.parse_args()
+    rng = random.Random(7)
+
+    start = time.perf_counter()
+    timetable = Timetable.from_gtfs(args.gtfs) if args.gtfs else synthetic_timetable()
+    print(f"{timetable.trip_count} trips, {timetable.stop_time_count} stop times loaded in {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    router = Router(timetable)
+    print(
+        f"{len(router.pattern_stops)} patterns, {len(router.footpaths.neighbours)} footpaths "
+        f"built in {time.perf_counter() - start:.1f} s"
+    )
+
+    served = [s for s in range(router.stop_count) if router.stop_patterns[s]]
+    timings: List[float] = []
+    found = rides = 0
+    for _ in range(args.queries):
+        origin, destination = rng.sample(served, 2)
+        departure = rng.randrange(6 * 3600, 21 * 3600)
+        t = time.perf_counter()
+        journeys = router.route({origin: 0}, {destination: 0}, args.date, departure)
+        timings.append(time.perf_counter() - t)
+        if journeys:
+            found += 1
+            rides += journeys[-1].rides
+    timings.sort()
+    print(
+        f"{args.queries} queries: p50 {statistics.median(timings) * 1000:.1f} ms, "
+        f"p99 {timings[int(len(timings) * 0.99)] * 1000:.1f} ms, max {timings[-1] * 1000:.1f} ms"
+    )
+    print(f"{found} with a journey, {rides / max(found, 1):.1f} rides on average for the earliest arrival")
+
+    journeys = router.route({served[0]: 0}, {served[-1]: 0}, args.date, 8 * 3600)
+    for journey in journeys:
+        print(f"  {format_time(journey.departure)} -> {format_time(journey.arrival)}, {journey.rides} ride(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark: nearest-stop queries with the grid index vs per-pair geodesic.
+
+Usage:
+    python benchmarks/bench_spatial_index.py [--stops path/to/stops.txt] [--synthetic 3600]
+"""
+# Standard library imports
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+from geopy.distance import geodesic
+
+# Local imports
+from spatial_index import SpatialIndex
+
+
+def load_points(path: str) -> List[Tuple[float, float]]:
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return [(float(row['stop_lat']), float(row['stop_lon'])) for row in csv.DictReader(f)]
+
+
+def report(name: str, timings: List[float]) -> None:
+    timings.sort()
+    p50 = statistics.median(timings) * 1e6
+    p99 = timings[int(len(timings) * 0.99)] * 1e6
+    print(f"{name:<28} p50 {p50:10.1f} us   p99 {p99:10.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stops', help='GTFS stops.txt')
+    parser.add_argument('--synthetic', type=int, default=3600, help='synthetic stop count without --stops')
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    if args.stops:
+        points = load_points(args.stops)
+    else:
+        points = [(44.84 + rng.uniform(-0.12, 0.12), -0.58 + rng.uniform(-0.15, 0.15)) for _ in range(args.synthetic)]
+    queries = [(44.84 + rng.uniform(-0.1, 0.1), -0.58 + rng.uniform(-0.12, 0.12)) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = SpatialIndex([p[0] for p in points], [p[1] for p in points])
+    print(f"{len(index)} stops indexed in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for name, query in [
+        ("index nearest k=5", lambda q: index.nearest(q[0], q[1], k=5)),
+        ("index nearest k=5, 1 km", lambda q: index.nearest(q[0], q[1], k=5, max_distance=1000)),
+        ("index within 500 m", lambda q: index.within(q[0], q[1], 500)),
+    ]:
+        timings = []
+        for q in queries:
+            t = time.perf_counter()
+            query(q)
+            timings.append(time.perf_counter() - t)
+        report(name, timings)
+
+    timings = []
+    for q in queries[:20]:
+        t = time.perf_counter()
+        sorted(points, key=lambda p: geodesic(q, p).meters)[:5]
+        timings.append(time.perf_counter() - t)
+    report("geodesic scan (20 queries)", timings)
+
+
+if __name__ == '__main__':
+    main()
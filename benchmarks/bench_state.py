@@ -0,0 +1,98 @@
+"""Load test: shared rate limits and sessions across worker processes.
+
+Starts 1..--workers processes that each run the per-request state checks of
+a command (user rate limit, API rate limit, session read) for random users
+against the same backend, and reports the aggregate checks per second for
+each worker count. Every worker also hammers one shared key and the total
+it was allowed is checked against the bucket capacity, which only holds if
+the buckets are shared atomically. Needs a Redis server; without --redis-url
+only the in-process backend is measured, in a single worker.
+
+Usage:
+    python benchmarks/bench_state.py [--redis-url redis://localhost:6379/0] [--workers 4] [--seconds 3]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from state import RedisBackend, create_backend
+
+SHARED_CAPACITY = 500
+
+
+async def worker(url: Optional[str], seconds: float, users: int, seed: int) -> Tuple[int, int]:
+    backend = create_backend(url)
+    await backend.start()
+    rng = random.Random(seed)
+    checks = shared_allowed = 0
+    deadline = time.monotonic() + seconds
+
+    async def client() -> None:
+        nonlocal checks, shared_allowed
+        while time.monotonic() < deadline:
+            user_id = rng.randrange(users)
+            await backend.allow(f'bench:rate:user:{user_id}', 100, 3600)
+            await backend.allow('bench:rate:api', 10**9, 3600)
+            if await backend.get(f'bench:session:{user_id}', ttl=60) is None:
+                await backend.set(f'bench:session:{user_id}', {'token': 'x'}, 60)
+            if await backend.allow('bench:rate:shared', SHARED_CAPACITY, 3600):
+                shared_allowed += 1
+            checks += 1
+
+    await asyncio.gather(*(client() for _ in range(32)))
+    await backend.close()
+    return checks, shared_allowed
+
+
+def run_worker(args: Tuple[Optional[str], float, int, int]) -> Tuple[int, int]:
+    return asyncio.run(worker(*args))
+
+
+async def reset(url: str) -> None:
+    backend = RedisBackend(url)
+    for key in ('bench:rate:shared', 'bench:rate:api'):
+        await backend.delete(key)
+    await backend.close()
+
+
+def measure(url: Optional[str], workers: int, args: argparse.Namespace) -> None:
+    if url:
+        asyncio.run(reset(url))
+    jobs = [(url, args.seconds, args.users, seed) for seed in range(workers)]
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.map(run_worker, jobs)
+    checks = sum(c for c, _ in results)
+    allowed = sum(a for _, a in results)
+    name = 'redis' if url else 'memory'
+    print(f"{name}, {workers} worker(s): {checks / args.seconds:,.0f} command checks/s, shared bucket allowed {allowed}/{SHARED_CAPACITY}")
+    if url:
+        assert allowed <= SHARED_CAPACITY, "shared rate limit exceeded across workers"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--redis-url')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--users', type=int, default=100000)
+    args = parser.parse_args()
+
+    measure(None, 1, args)
+    if args.redis_url:
+        workers = 1
+        while workers <= args.workers:
+            measure(args.redis_url, workers, args)
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
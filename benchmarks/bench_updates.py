@@ -0,0 +1,142 @@
+"""Load test: update processing strategies under injected upstream latency.
+
+Queues a burst of command updates from many chats into an Application whose
+bot never contacts Telegram. Each handler simulates an upstream call: most
+take --fast ms, --slow-share of them take --slow ms (a slow geocode). The
+same burst is processed sequentially (the default), concurrently without
+ordering, and with OrderedUpdateProcessor; a last run adds hung calls that
+only the processor's timeout releases. Reports throughput, latency of the
+updates, per-chat ordering violations and timeouts.
+
+Usage:
+    python benchmarks/bench_updates.py [--updates 600] [--chats 100] [--concurrency 64]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+from telegram import Update, User
+from telegram.ext import Application, CommandHandler, ContextTypes, ExtBot, SimpleUpdateProcessor
+
+# Local imports
+from update_processor import OrderedUpdateProcessor
+
+
+class OfflineBot(ExtBot):
+    async def get_me(self, *args: Any, **kwargs: Any) -> User:
+        self._bot_user = User(1, 'Bench', True, username='bench_bot')
+        return self._bot_user
+
+
+def make_updates(args: argparse.Namespace, bot: ExtBot, hang_share: float) -> List[Tuple[Update, float]]:
+    rng = random.Random(7)
+    updates = []
+    for update_id in range(args.updates):
+        chat_id = 10**6 + rng.randrange(args.chats)
+        r = rng.random()
+        delay = 3600.0 if r < hang_share else args.slow / 1000 if r < hang_share + args.slow_share else args.fast / 1000
+        data = {
+            'update_id': update_id,
+            'message': {
+                'message_id': update_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': {'id': chat_id, 'is_bot': False, 'first_name': 'User'},
+                'text': '/work',
+                'entities': [{'type': 'bot_command', 'offset': 0, 'length': 5}]
+            }
+        }
+        updates.append((Update.de_json(data, bot), delay))
+    return updates
+
+
+async def run(name: str, processor: Any, args: argparse.Namespace, hang_share: float = 0.0) -> None:
+    builder = Application.builder().bot(OfflineBot('1:bench'))
+    if processor is not None:
+        builder.concurrent_updates(processor)
+    application = builder.build()
+    await application.initialize()
+    updates = make_updates(args, application.bot, hang_share)
+    delays = {update.update_id: delay for update, delay in updates}
+    queued: Dict[int, float] = {}
+    finished: Dict[int, float] = {}
+    running: Dict[int, int] = defaultdict(int)
+    started_order: Dict[int, List[int]] = defaultdict(list)
+    overlaps = 0
+
+    async def work(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        nonlocal overlaps
+        chat_id = update.effective_chat.id
+        started_order[chat_id].append(update.update_id)
+        running[chat_id] += 1
+        overlaps += running[chat_id] > 1
+        try:
+            await asyncio.sleep(delays[update.update_id])
+        finally:
+            running[chat_id] -= 1
+            finished[update.update_id] = time.perf_counter()
+
+    application.add_handler(CommandHandler('work', work))
+    await application.start()
+    start = time.perf_counter()
+    for update, _ in updates:
+        queued[update.update_id] = time.perf_counter()
+        await application.update_queue.put(update)
+    await application.update_queue.join()
+    elapsed = time.perf_counter() - start
+    await application.stop()
+    await application.shutdown()
+
+    latencies = sorted(finished[i] - queued[i] for i in finished if delays[i] < args.slow / 1000)
+    reordered = sum(order != sorted(order) for order in started_order.values())
+    extra = ''
+    if isinstance(processor, OrderedUpdateProcessor):
+        extra = f", {processor.timeouts} timeouts"
+    print(
+        f"{name:<34} {len(updates) / elapsed:7.0f} updates/s, fast updates p50 "
+        f"{statistics.median(latencies) * 1000:6.0f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.0f} ms, "
+        f"{reordered} chats reordered, {overlaps} overlaps{extra}"
+    )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    processors: List[Tuple[str, Any]] = [
+        ('sequential (default)', None),
+        ('concurrent, unordered', SimpleUpdateProcessor(args.concurrency)),
+        ('concurrent, per-chat order', OrderedUpdateProcessor(args.concurrency, timeout=args.timeout))
+    ]
+    for name, processor in processors:
+        await run(name, processor, args)
+    await run(
+        f'per-chat order, {args.hang_share:.0%} hung calls',
+        OrderedUpdateProcessor(args.concurrency, timeout=args.timeout),
+        args,
+        args.hang_share
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=600)
+    parser.add_argument('--chats', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--fast', type=float, default=10.0, help='upstream latency, ms')
+    parser.add_argument('--slow', type=float, default=400.0, help='slow upstream latency, ms')
+    parser.add_argument('--slow-share', type=float, default=0.1)
+    parser.add_argument('--hang-share', type=float, default=0.01)
+    parser.add_argument('--timeout', type=float, default=2.0, help='processor timeout, s')
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Load test: synthetic Telegram updates POSTed to the webhook server.
+
+Runs the webhook server in front of an Application whose bot never contacts
+Telegram, with a /ping handler that simulates --work ms of I/O per update.
+Clients POST --updates synthetic command updates from many users over
+--clients connections and the harness reports accepted requests per second,
+request latency, end-to-end processing throughput and 503 refusals.
+
+Usage:
+    python benchmarks/bench_webhook.py [--updates 20000] [--clients 40] [--concurrency 64] [--work 20]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Any, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import aiohttp
+from telegram import Update, User
+from telegram.ext import Application, CommandHandler, ContextTypes, ExtBot
+
+# Local imports
+from update_processor import OrderedUpdateProcessor
+from webhook import WebhookServer
+
+SECRET = 'bench-secret'
+
+
+class OfflineBot(ExtBot):
+    async def get_me(self, *args: Any, **kwargs: Any) -> User:
+        self._bot_user = User(1, 'Bench', True, username='bench_bot')
+        return self._bot_user
+
+
+def synthetic_update(update_id: int, user_id: int) -> dict:
+    user = {'id': user_id, 'is_bot': False, 'first_name': 'User'}
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': user,
+            'text': '/ping',
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': 5}]
+        }
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    processed = 0
+    done = asyncio.Event()
+
+    async def ping(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        nonlocal processed
+        await asyncio.sleep(args.work / 1000)
+        processed += 1
+        if processed == args.updates:
+            done.set()
+
+    application = Application.builder()\
+        .bot(OfflineBot('1:bench'))\
+        .concurrent_updates(OrderedUpdateProcessor(args.concurrency))\
+        .build()
+    application.add_handler(CommandHandler('ping', ping))
+    server = WebhookServer(application, secret_token=SECRET, max_pending=args.max_pending)
+    await application.initialize()
+    await application.start()
+    await server.start('127.0.0.1', args.port)
+
+    url = f"http://127.0.0.1:{args.port}{server.path}"
+    headers = {'X-Telegram-Bot-Api-Secret-Token': SECRET}
+    latencies: List[float] = []
+    refused = 0
+    next_id = iter(range(args.updates))
+
+    async def client(session: aiohttp.ClientSession) -> None:
+        nonlocal refused
+        for update_id in next_id:
+            body = synthetic_update(update_id, 10**6 + update_id % args.users)
+            while True:
+                t = time.perf_counter()
+                async with session.post(url, json=body, headers=headers) as response:
+                    latencies.append(time.perf_counter() - t)
+                    if response.status == 200:
+                        break
+                    assert response.status == 503, f"unexpected status {response.status}"
+                refused += 1
+                await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.clients)) as session:
+        await asyncio.gather(*(client(session) for _ in range(args.clients)))
+        posted = time.perf_counter() - start
+        await asyncio.wait_for(done.wait(), 60)
+        elapsed = time.perf_counter() - start
+        async with session.get(f"http://127.0.0.1:{args.port}{server.health_path}") as response:
+            health = await response.json()
+
+    await server.stop()
+    await application.stop()
+    await application.shutdown()
+
+    latencies.sort()
+    print(f"{args.updates} updates POSTed in {posted:.2f} s ({args.updates / posted:.0f} req/s), {refused} refused with 503")
+    print(f"request latency: p50 {statistics.median(latencies) * 1000:.1f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+    print(f"processed in {elapsed:.2f} s ({processed / elapsed:.0f} updates/s at {args.work} ms each, concurrency {args.concurrency})")
+    print(health)
+    assert processed == args.updates, "updates were lost"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--clients', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--work', type=float, default=20.0, help='simulated handler time, ms')
+    parser.add_argument('--max-pending', type=int, default=1000)
+    parser.add_argument('--port', type=int, default=8089)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
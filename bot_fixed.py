@@ -4,13 +4,24 @@ import os
 import json
 import math
 import asyncio
-from datetime import datetime, timedelta
-from collections import defaultdict
-from typing import Optional, Tuple, Dict, Any, List, Final, TypedDict, Union
+import secrets
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from typing import Optional, Tuple, Dict, Any, List, Final, TypedDict, Union, AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+from functools import partial
 from dotenv import load_dotenv
 
 # Third-party imports
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import (
+    Update,
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InlineQueryResultArticle,
+    InputTextMessageContent
+)
+from telegram.error import TelegramError
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -19,18 +30,40 @@ from telegram.ext import (
     filters,
     CallbackQueryHandler,
     ConversationHandler,
-    MessageRateLimit,
-    MessageThrottle
+    InlineQueryHandler
 )
 import aiohttp
 from aiohttp import ClientTimeout
 import geopy
-from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
 from supabase import create_client, Client
 
 # Local imports
 from translations import TRANSLATIONS
+from catalog import MessageCatalog, Messages
+from http_pool import HTTPPool, discard
+from cache import TTLCache, quantize_location
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from geocoding import Geocoder
+from gazetteer import Gazetteer, Place, load_gazetteer
+from autocomplete import Autocomplete
+from spatial_index import SpatialIndex
+from storage import SupabaseStore, WriteBehindQueue
+from profiles import ProfileCache, UserProfile
+from realtime import RealtimePoller
+from gtfs_static import Timetable, cache_directory, format_time, load_timetable
+from footpaths import load_footpaths
+from reminders import Reminder, ReminderScheduler, parse_time_of_day
+from textutils import fold, split_message
+from outbound import ALERT, INTERACTIVE, OutboundDispatcher
+from disruptions import Disruption, DisruptionPoller, SubscriptionIndex
+from router import Journey, Router
+from webhook import WebhookServer, run_webhook
+from update_processor import OrderedUpdateProcessor
+from upstream import DeadlineExceeded, Hedger, backoff, budget
+from json_stream import iter_array
+from metrics import Metrics
+from state import Leadership, StateBackend, create_backend
 
 # Load environment variables
 load_dotenv()
@@ -69,18 +102,304 @@ if not SUPABASE_KEY:
 # API Request Settings
 API_TIMEOUT: Final[int] = 10  # seconds
 MAX_RETRIES: Final[int] = 3
-RETRY_DELAY: Final[int] = 1  # second
+RETRY_DELAY: Final[float] = 1.0  # seconds, maximum jittered delay after the first failure
+RETRY_MAX_DELAY: Final[float] = 8.0  # seconds
 RATE_LIMIT: Final[int] = 100  # requests per hour
+API_RATE_LIMIT: Final[int] = 1000  # upstream requests per hour
+API_MAX_RESULTS: Final[int] = int(os.getenv('API_MAX_RESULTS', '100'))  # departures read per location
+API_PAGE_SIZE: Final[int] = int(os.getenv('API_PAGE_SIZE', '0'))  # records per request (rows/start), 0 for one request
+API_READ_CHUNK: Final[int] = 64 * 1024  # bytes of response parsed at a time
+
+# HTTP Connection Pool Settings
+HTTP_POOL_SIZE: Final[int] = int(os.getenv('HTTP_POOL_SIZE', '100'))
+HTTP_POOL_PER_HOST: Final[int] = int(os.getenv('HTTP_POOL_PER_HOST', '20'))
+HTTP_DNS_TTL: Final[int] = int(os.getenv('HTTP_DNS_TTL', '300'))  # seconds
+HTTP_KEEPALIVE_TIMEOUT: Final[float] = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '30'))  # seconds
+
+# Transport Cache Settings
+TRANSPORT_CACHE_TTL: Final[float] = float(os.getenv('TRANSPORT_CACHE_TTL', '20'))  # seconds
+TRANSPORT_CACHE_SIZE: Final[int] = int(os.getenv('TRANSPORT_CACHE_SIZE', '5000'))
+TRANSPORT_CACHE_PRECISION: Final[int] = int(os.getenv('TRANSPORT_CACHE_PRECISION', '3'))  # decimal places (~110 m)
+TRANSPORT_STALE_TTL: Final[float] = float(os.getenv('TRANSPORT_STALE_TTL', '600'))  # seconds expired departures are served while the API fails
+
+# Circuit Breaker Settings (the API is not called while its circuit is open)
+BREAKER_WINDOW: Final[int] = 20  # recent calls considered
+BREAKER_FAILURE_RATIO: Final[float] = 0.5  # of recent calls failed
+BREAKER_SLOW_CALL: Final[float] = 5.0  # seconds
+BREAKER_SLOW_RATIO: Final[float] = 0.8  # of recent calls slow
+BREAKER_OPEN_DURATION: Final[float] = float(os.getenv('BREAKER_OPEN_DURATION', '30'))  # seconds before trial calls
+
+# Hedging Settings (a second API request when the first is slower than usual)
+API_HEDGING: Final[bool] = os.getenv('API_HEDGING', 'false').lower() == 'true'
+HEDGE_QUANTILE: Final[float] = 0.95  # of recent latencies after which a request is hedged
+HEDGE_MAX_RATIO: Final[float] = float(os.getenv('HEDGE_MAX_RATIO', '0.1'))  # of requests hedged at most
+
+# Geocoding Settings
+GEOCODE_CACHE_PATH: Final[str] = os.getenv('GEOCODE_CACHE_PATH', 'geocode_cache.sqlite3')
+GEOCODE_CACHE_SIZE: Final[int] = int(os.getenv('GEOCODE_CACHE_SIZE', '10000'))
+GEOCODE_MIN_DELAY: Final[float] = 1.0  # seconds, Nominatim usage policy
+GEOCODE_NOT_FOUND_TTL: Final[float] = 3600.0  # seconds before an address not found is looked up again
+
+# Offline Data Settings
+DATA_DIR: Final[str] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+GAZETTEER_PLACES_PATH: Final[str] = os.getenv('GAZETTEER_PLACES_PATH', os.path.join(DATA_DIR, 'places.csv'))
+GTFS_PATH: Final[str] = os.getenv('GTFS_PATH', os.path.join(DATA_DIR, 'gtfs.zip'))
+GTFS_CACHE_DIR: Final[str] = os.getenv('GTFS_CACHE_DIR', os.path.join(DATA_DIR, 'cache'))
+TIMEZONE: Final[ZoneInfo] = ZoneInfo('Europe/Paris')
+TIMES_LIMIT: Final[int] = 20
+
+# Nearby Stops Settings
+DEFAULT_LANGUAGE: Final[str] = 'fr'
+NEARBY_LIMIT: Final[int] = 5
+NEARBY_RADIUS: Final[float] = 1000.0  # meters
+
+# Inline Query Settings (inline mode is enabled with @BotFather's /setinline)
+INLINE_RESULTS: Final[int] = 10
+INLINE_CACHE_TIME: Final[int] = int(os.getenv('INLINE_CACHE_TIME', '300'))  # seconds Telegram reuses the results of a query
+
+# Journey Planner Settings
+ROUTE_MAX_RIDES: Final[int] = 5
+ROUTE_WALK_RADIUS: Final[float] = 400.0  # meters, from a place to its stops
+
+# Database Settings
+DB_POOL_SIZE: Final[int] = int(os.getenv('DB_POOL_SIZE', '8'))
+DB_FLUSH_INTERVAL: Final[float] = float(os.getenv('DB_FLUSH_INTERVAL_MS', '50')) / 1000  # seconds
+DB_MAX_BATCH: Final[int] = int(os.getenv('DB_MAX_BATCH', '500'))
+LOCATION_HISTORY: Final[bool] = os.getenv('LOCATION_HISTORY', 'false').lower() == 'true'
+
+# Profile Cache Settings
+PROFILE_CACHE_TTL: Final[float] = float(os.getenv('PROFILE_CACHE_TTL', '300'))  # seconds
+PROFILE_CACHE_SIZE: Final[int] = int(os.getenv('PROFILE_CACHE_SIZE', '50000'))
+
+# Realtime Feed Settings
+REALTIME_FEED_URL: Final[Optional[str]] = os.getenv('REALTIME_FEED_URL')
+REALTIME_POLL_INTERVAL: Final[float] = float(os.getenv('REALTIME_POLL_INTERVAL', '30'))  # seconds
+REALTIME_MAX_AGE: Final[float] = float(os.getenv('REALTIME_MAX_AGE', '90'))  # seconds
+DEPARTURES_LIMIT: Final[int] = 10
+
+# Update Processing Settings (one update at a time per chat)
+UPDATE_CONCURRENCY: Final[int] = int(os.getenv('UPDATE_CONCURRENCY', '64'))  # updates processed at once
+HANDLER_TIMEOUT: Final[float] = float(os.getenv('HANDLER_TIMEOUT', '30'))  # seconds before an update is cancelled
+HANDLER_RESERVE: Final[float] = 2.0  # seconds before HANDLER_TIMEOUT at which upstream calls give up
+
+# Webhook Settings (polling when WEBHOOK_URL is unset)
+WEBHOOK_URL: Final[Optional[str]] = os.getenv('WEBHOOK_URL')  # public HTTPS base URL
+WEBHOOK_PATH: Final[str] = os.getenv('WEBHOOK_PATH', '/telegram')
+WEBHOOK_SECRET: Final[str] = os.getenv('WEBHOOK_SECRET') or secrets.token_urlsafe(32)  # random for a single worker
+WEBHOOK_HOST: Final[str] = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT: Final[int] = int(os.getenv('WEBHOOK_PORT', os.getenv('PORT', '8080')))
+WEBHOOK_MAX_PENDING: Final[int] = int(os.getenv('WEBHOOK_MAX_PENDING', '1000'))  # queued updates before 503
+WEBHOOK_MAX_CONNECTIONS: Final[int] = 40  # Telegram default, at most 100
+
+# Disruption Feed Settings
+DISRUPTIONS_FEED_URL: Final[Optional[str]] = os.getenv('DISRUPTIONS_FEED_URL')
+DISRUPTIONS_POLL_INTERVAL: Final[float] = float(os.getenv('DISRUPTIONS_POLL_INTERVAL', '60'))  # seconds
+FAVORITES_LOAD_PAGE: Final[int] = 1000  # rows per request when loading
+
+# Outbound Message Settings (Telegram allows about 30 messages per second)
+OUTBOUND_RATE: Final[float] = float(os.getenv('OUTBOUND_RATE', '30'))  # messages per second
+OUTBOUND_CHAT_INTERVAL: Final[float] = 1.0  # seconds between messages to one chat
+OUTBOUND_MAX_QUEUE: Final[int] = int(os.getenv('OUTBOUND_MAX_QUEUE', '50000'))
+
+# Reminder Settings
+REMINDER_DEPARTURES: Final[int] = 3  # per reminder
+REMINDER_LOAD_PAGE: Final[int] = 1000  # rows per request when loading
+REMINDERS_FIRED_KEY: Final[str] = 'reminders:fired_until'
+
+# Translation Settings (other languages are compiled the first time a user needs them)
+PRELOAD_LANGUAGES: Final[List[str]] = [code for code in os.getenv('PRELOAD_LANGUAGES', '').split(',') if code]
+
+# Metrics Settings (GET /metrics on METRICS_PORT, disabled when 0)
+METRICS_PORT: Final[int] = int(os.getenv('METRICS_PORT', '0'))
+METRICS_HOST: Final[str] = os.getenv('METRICS_HOST', '0.0.0.0')
+
+# Shared State Settings (in-process when REDIS_URL is unset)
+REDIS_URL: Final[Optional[str]] = os.getenv('REDIS_URL')
+SESSION_LIFETIME: Final[float] = 12 * 3600  # seconds of inactivity before a new session token
+LEADER_LOCK_TTL: Final[float] = 15.0  # seconds before another worker takes over background jobs
+# Each worker registers the webhook: a random secret per worker would lock the others out
+if WEBHOOK_URL and REDIS_URL and not os.getenv('WEBHOOK_SECRET'):
+    raise ValueError("WEBHOOK_SECRET environment variable must be set when workers share REDIS_URL")
+
+# Initialize translations (templates checked and compiled once per language)
+catalog: MessageCatalog = MessageCatalog(TRANSLATIONS.get, DEFAULT_LANGUAGE, preload=PRELOAD_LANGUAGES)
+
+# Initialize metrics (decorators are no-ops when disabled)
+metrics: Metrics = Metrics(enabled=METRICS_PORT > 0)
+
+# Initialize shared state (rate limits, sessions, cached departures), opened in post_init
+state: StateBackend = create_backend(REDIS_URL)
+
+# Initialize shared HTTP connection pool (opened in post_init)
+http_pool: HTTPPool = HTTPPool(
+    limit=HTTP_POOL_SIZE,
+    limit_per_host=HTTP_POOL_PER_HOST,
+    dns_ttl=HTTP_DNS_TTL,
+    keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    timeout=API_TIMEOUT
+)
+
+# Initialize geocoder (requests go through the shared HTTP pool)
+geocoder: Geocoder = Geocoder(
+    session_provider=lambda: http_pool.session,
+    cache_path=GEOCODE_CACHE_PATH,
+    cache_size=GEOCODE_CACHE_SIZE,
+    user_agent="bordeaux_transport_bot",
+    min_delay=GEOCODE_MIN_DELAY,
+    timeout=API_TIMEOUT,
+    not_found_ttl=GEOCODE_NOT_FOUND_TTL
+)
+
+# Initialize offline gazetteer of stops and landmarks
+gazetteer: Gazetteer = load_gazetteer(GAZETTEER_PLACES_PATH, GTFS_PATH)
+
+# Initialize static timetable (memory-mapped from the compiled cache when available)
+timetable: Optional[Timetable] = load_timetable(GTFS_PATH, GTFS_CACHE_DIR)
+
+# Initialize journey planner over the static timetable and its precomputed footpaths
+journey_planner: Optional[Router] = Router(
+    timetable,
+    load_footpaths(cache_directory(GTFS_PATH, GTFS_CACHE_DIR), timetable.stop_lats, timetable.stop_lons)
+) if timetable else None
+
+# Initialize inline-query autocomplete, stops served by more lines ranking first
+autocomplete: Autocomplete = Autocomplete(limit=INLINE_RESULTS)
+autocomplete.build(
+    gazetteer.places,
+    timetable.lines() if timetable else [],
+    popularity=lambda place: len(timetable.stop_lines(place.name)) if timetable else 0
+)
+
+# Initialize spatial index of stops for nearest-stop queries
+nearby_stops: List[Place] = [place for place in gazetteer.places if place.kind == 'stop']
+stop_index: SpatialIndex = SpatialIndex(
+    [place.lat for place in nearby_stops],
+    [place.lon for place in nearby_stops]
+)
+
+# Initialize realtime departures poller (optional)
+realtime_poller: Optional[RealtimePoller] = RealtimePoller(
+    session_provider=lambda: http_pool.session,
+    url=REALTIME_FEED_URL,
+    interval=REALTIME_POLL_INTERVAL,
+    headers={'Authorization': f'Bearer {BORDEAUX_API_KEY}'},
+    timeout=API_TIMEOUT,
+    tz=TIMEZONE
+) if REALTIME_FEED_URL else None
 
-# Initialize rate limiting
-rate_limit_dict: Dict[str, List[datetime]] = defaultdict(list)
+# Initialize transport information cache (expired entries kept as a fallback)
+transport_cache: TTLCache = TTLCache(
+    ttl=TRANSPORT_CACHE_TTL,
+    maxsize=TRANSPORT_CACHE_SIZE,
+    stale_ttl=TRANSPORT_STALE_TTL
+)
+
+# Initialize the Bordeaux API circuit breaker; rejected requests do not count against it
+api_breaker: CircuitBreaker = CircuitBreaker(
+    'Bordeaux API',
+    window=BREAKER_WINDOW,
+    failure_ratio=BREAKER_FAILURE_RATIO,
+    slow_call=BREAKER_SLOW_CALL,
+    slow_ratio=BREAKER_SLOW_RATIO,
+    open_duration=BREAKER_OPEN_DURATION,
+    is_failure=lambda e: isinstance(e, UpstreamError) or not isinstance(e, (APIError, DeadlineExceeded))
+)
 
-# Initialize geolocator
-geolocator: Nominatim = Nominatim(user_agent="bordeaux_transport_bot")
+# Initialize API request hedging (only once enough latencies are known)
+api_hedger: Hedger = Hedger(
+    enabled=API_HEDGING,
+    quantile=HEDGE_QUANTILE,
+    max_ratio=HEDGE_MAX_RATIO
+)
 
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Initialize async database layer and write-behind queues
+db: SupabaseStore = SupabaseStore(supabase, pool_size=DB_POOL_SIZE)
+db.execute = metrics.timed('supabase')(db.execute)
+location_writes: WriteBehindQueue = WriteBehindQueue(
+    db,
+    'user_current_locations',
+    on_conflict=('user_id',),
+    interval=DB_FLUSH_INTERVAL,
+    max_batch=DB_MAX_BATCH
+)
+location_history_writes: WriteBehindQueue = WriteBehindQueue(
+    db,
+    'user_locations',
+    interval=DB_FLUSH_INTERVAL,
+    max_batch=DB_MAX_BATCH
+)
+
+# Initialize per-user profile cache (loader defined with the database functions)
+profile_cache: ProfileCache = ProfileCache(
+    lambda user_id: load_user_profile(user_id),
+    ttl=PROFILE_CACHE_TTL,
+    maxsize=PROFILE_CACHE_SIZE
+)
+
+# Initialize outbound message queue (started in post_init)
+outbound: OutboundDispatcher = OutboundDispatcher(
+    rate=OUTBOUND_RATE,
+    chat_interval=OUTBOUND_CHAT_INTERVAL,
+    max_queue=OUTBOUND_MAX_QUEUE
+)
+
+# Initialize favorite-stop subscriptions and disruption poller (optional)
+subscriptions: SubscriptionIndex = SubscriptionIndex(
+    lambda stop: timetable.stop_lines(stop) if timetable else ()
+)
+disruption_poller: Optional[DisruptionPoller] = DisruptionPoller(
+    session_provider=lambda: http_pool.session,
+    url=DISRUPTIONS_FEED_URL,
+    on_change=lambda changed, resolved: send_disruption_alerts(changed, resolved),
+    interval=DISRUPTIONS_POLL_INTERVAL,
+    headers={'Authorization': f'Bearer {BORDEAUX_API_KEY}'},
+    timeout=API_TIMEOUT
+) if DISRUPTIONS_FEED_URL else None
+
+# Initialize reminder scheduler (started in post_init, once reminders are loaded)
+reminder_scheduler: ReminderScheduler = ReminderScheduler(
+    lambda stop, reminders: send_reminders(stop, reminders),
+    tz=TIMEZONE
+)
+
+# Initialize leader election: reminders and disruption alerts are sent by one worker only
+leadership: Leadership = Leadership(
+    state,
+    on_elected=lambda: start_leader_jobs(),
+    on_deposed=lambda: stop_leader_jobs(),
+    ttl=LEADER_LOCK_TTL
+)
+
+# Keep every worker's reminders, favorite-stop index and cached profiles in sync
+state.subscribe('reminders', lambda message: apply_reminder_change(message))
+state.subscribe('favorites', lambda message: apply_favorite_change(message))
+state.subscribe('profiles', lambda message: apply_profile_change(message))
+
+# Export component counters as metrics
+for name, component in [
+    ('http_pool', http_pool),
+    ('geocoder', geocoder),
+    ('transport_cache', transport_cache),
+    ('api_circuit', api_breaker),
+    ('api_hedging', api_hedger),
+    ('profile_cache', profile_cache),
+    ('location_writes', location_writes),
+    ('location_history_writes', location_history_writes),
+    ('realtime', realtime_poller),
+    ('disruptions', disruption_poller),
+    ('subscriptions', subscriptions),
+    ('reminders', reminder_scheduler),
+    ('outbound', outbound),
+    ('state', state),
+    ('translations', catalog),
+    ('autocomplete', autocomplete)
+]:
+    if component is not None:
+        metrics.register(name, component.stats)
+
 # ============= Type Definitions =============
 
 class Location(TypedDict):
@@ -166,19 +485,14 @@ async def check_rate_limit(user_id: int) -> bool:
     Returns:
         bool: True if user is within rate limit, False otherwise
     """
-    now = datetime.now()
-    hour_ago = now - timedelta(hours=1)
-    
-    # Clean old requests
-    rate_limit_dict[str(user_id)] = [t for t in rate_limit_dict[str(user_id)] if t > hour_ago]
-    
-    # Check limit
-    if len(rate_limit_dict[str(user_id)]) >= RATE_LIMIT:
-        return False
-    
-    # Add new request
-    rate_limit_dict[str(user_id)].append(now)
-    return True
+    try:
+        allowed = await state.allow(f'rate:user:{user_id}', RATE_LIMIT, 3600)
+    except Exception as e:
+        logger.error(f"Rate limit check failed: {str(e)}")
+        return True
+    if not allowed:
+        metrics.rejected('user')
+    return allowed
 
 async def check_api_rate_limit() -> bool:
     """Check if API rate limit is exceeded.
@@ -186,19 +500,14 @@ async def check_api_rate_limit() -> bool:
     Returns:
         bool: True if API is within rate limit, False otherwise
     """
-    now = datetime.now()
-    hour_ago = now - timedelta(hours=1)
-    
-    # Clean old requests
-    rate_limit_dict['api'] = [t for t in rate_limit_dict['api'] if t > hour_ago]
-    
-    # Check limit
-    if len(rate_limit_dict['api']) >= 1000:  # API rate limit
-        return False
-    
-    # Add new request
-    rate_limit_dict['api'].append(now)
-    return True
+    try:
+        allowed = await state.allow('rate:api', API_RATE_LIMIT, 3600)
+    except Exception as e:
+        logger.error(f"API rate limit check failed: {str(e)}")
+        return True
+    if not allowed:
+        metrics.rejected('api')
+    return allowed
 
 async def check_user_session(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """Check if user session is valid.
@@ -216,13 +525,12 @@ async def check_user_session(update: Update, context: ContextTypes.DEFAULT_TYPE)
     if not await check_rate_limit(user_id):
         return False
     
-    # Check session expiration and rotate if needed
-    if context.user_data.get('session_start'):
-        if datetime.now() - context.user_data['session_start'] > timedelta(hours=12):
-            await rotate_session_token(context)
-    
-    # Update session
-    context.user_data['session_start'] = datetime.now()
+    # Sessions expire after SESSION_LIFETIME of inactivity; reading one extends it
+    try:
+        if await state.get(f'session:{user_id}', ttl=SESSION_LIFETIME) is None:
+            await rotate_session_token(user_id)
+    except Exception as e:
+        logger.error(f"Session check failed: {str(e)}")
     return True
 
 async def validate_request(update: Update) -> bool:
@@ -259,53 +567,170 @@ class APIError(Exception):
     """Custom exception for API errors."""
     pass
 
-async def make_api_request(params: Dict[str, Any], retries: int = MAX_RETRIES) -> Dict[str, Any]:
+class UpstreamError(APIError):
+    """The API is failing (rate limited or server error), not rejecting the request."""
+    
+    def __init__(self, status: int) -> None:
+        super().__init__(f"API request failed with status {status}")
+        self.status = status
+
+async def read_json(response: aiohttp.ClientResponse) -> Any:
+    """Read a whole JSON response body.
+    
+    Args:
+        response: The API response
+        
+    Returns:
+        Any: The decoded body
+        
+    Raises:
+        APIError: If the body is empty
+    """
+    data = await response.json()
+    if not data:
+        raise APIError("Empty response from API")
+    return data
+
+async def read_results(response: aiohttp.ClientResponse, limit: int) -> List[Dict[str, Any]]:
+    """Read the records of a response's 'results' array as they arrive.
+    
+    Records are decoded one at a time, without buffering the body, and
+    reading stops after ``limit`` of them; the rest of the body is
+    discarded.
+    
+    Args:
+        response: The API response
+        limit: Maximum number of records to read
+        
+    Returns:
+        List[Dict[str, Any]]: The records, at most limit
+        
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON
+    """
+    results = []
+    if limit <= 0:
+        return results
+    async with aclosing(iter_array(response.content.iter_chunked(API_READ_CHUNK), 'results')) as records:
+        async for record in records:
+            results.append(record)
+            if len(results) >= limit:
+                await discard(response)
+                break
+    return results
+
+async def request_api(
+    params: Dict[str, Any],
+    headers: Dict[str, str],
+    read: Callable[[aiohttp.ClientResponse], Awaitable[Any]] = read_json
+) -> Any:
+    """Send one request to the API and record its outcome.
+    
+    The request times out after API_TIMEOUT, or earlier at the deadline of
+    the update being handled.
+    
+    Args:
+        params: The parameters for the API request
+        headers: Request headers
+        read: Reads the body of a successful response
+        
+    Returns:
+        Any: What read returned
+        
+    Raises:
+        UpstreamError: On a 429 or 5xx response
+        APIError: On any other non-200 response
+        aiohttp.ClientError: On a network error
+        DeadlineExceeded: If the deadline passed before the API answered
+        asyncio.TimeoutError: If the request timed out
+    """
+    timeout = budget(API_TIMEOUT)
+    started = time.perf_counter()
+    try:
+        session = http_pool.session
+        async with session.get(
+            BORDEAUX_API_BASE_URL,
+            params=params,
+            headers=headers,
+            timeout=ClientTimeout(total=timeout)
+        ) as response:
+            metrics.upstream('bordeaux_api', response.status, time.perf_counter() - started)
+            if response.status == 429 or response.status >= 500:
+                raise UpstreamError(response.status)
+            if response.status != 200:
+                raise APIError(f"API request failed with status {response.status}")
+            return await read(response)
+    except aiohttp.ClientError:
+        metrics.upstream('bordeaux_api', 'network_error', time.perf_counter() - started)
+        raise
+    except asyncio.TimeoutError:
+        metrics.upstream('bordeaux_api', 'timeout', time.perf_counter() - started)
+        if timeout < API_TIMEOUT:
+            # Cut short by the deadline: not a sign of a slow API
+            raise DeadlineExceeded("Deadline exceeded") from None
+        raise
+
+async def make_api_request(
+    params: Dict[str, Any],
+    read: Callable[[aiohttp.ClientResponse], Awaitable[Any]] = read_json,
+    retries: int = MAX_RETRIES
+) -> Any:
     """Make an API request with rate limiting and retry logic.
     
+    Requests go through the API circuit breaker: while it is open they
+    fail at once instead of waiting for a timeout and retrying. With
+    API_HEDGING, a request slower than usual is sent a second time and
+    the first answer is used. Retries wait a jittered, exponentially
+    growing delay, and stop when it would pass the deadline.
+    
     Args:
         params: The parameters for the API request
+        read: Reads the body of a successful response; the whole JSON
+            body by default
         retries: Number of retry attempts
         
     Returns:
-        Dict[str, Any]: The API response data
+        Any: What read returned
         
     Raises:
-        APIError: If the API request fails
+        APIError: If the API request fails, the circuit is open or the
+            deadline passed
     """
     if not await check_api_rate_limit():
         raise APIError("API rate limit exceeded")
     
-    timeout = ClientTimeout(total=API_TIMEOUT)
+    headers = {'Authorization': f'Bearer {BORDEAUX_API_KEY}'}
     
     for attempt in range(retries):
+        if attempt:
+            metrics.retry('bordeaux_api')
+            try:
+                await backoff(attempt - 1, RETRY_DELAY, RETRY_MAX_DELAY)
+            except DeadlineExceeded:
+                raise APIError("API request timed out")
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                headers = {'Authorization': f'Bearer {BORDEAUX_API_KEY}'}
-                async with session.get(BORDEAUX_API_BASE_URL, params=params, headers=headers) as response:
-                    if response.status == 429:  # Rate limit
-                        if attempt < retries - 1:
-                            await asyncio.sleep(RETRY_DELAY * (attempt + 1))
-                            continue
-                        raise APIError("API rate limit exceeded")
-                    
-                    if response.status != 200:
-                        raise APIError(f"API request failed with status {response.status}")
-                    
-                    data = await response.json()
-                    if not data:
-                        raise APIError("Empty response from API")
-                    
-                    return data
+            return await api_hedger.call(api_breaker.call, request_api, params, headers, read)
+        
+        except CircuitOpenError as e:
+            metrics.rejected('api_circuit')
+            raise APIError(str(e))
+        
+        except DeadlineExceeded:
+            raise APIError("API request timed out")
+            
+        except UpstreamError as e:
+            if e.status != 429:
+                raise
+            if attempt == retries - 1:
+                raise APIError("API rate limit exceeded")
                     
         except aiohttp.ClientError as e:
             if attempt == retries - 1:
                 raise APIError(f"Network error: {str(e)}")
-            await asyncio.sleep(RETRY_DELAY * (attempt + 1))
             
         except asyncio.TimeoutError:
             if attempt == retries - 1:
                 raise APIError("API request timed out")
-            await asyncio.sleep(RETRY_DELAY * (attempt + 1))
             
         except json.JSONDecodeError:
             raise APIError("Invalid JSON response from API")
@@ -333,155 +758,841 @@ async def handle_database_error(operation: str, error: Exception) -> None:
 async def save_user_location(user_id: int, location: Location) -> None:
     """Save user's location to database.
     
+    The current location is upserted by the next batched flush of
+    ``location_writes``; when LOCATION_HISTORY is enabled the change is
+    also appended to the history table. Flush failures are logged by the
+    queues.
+    
     Args:
         user_id: The user's ID
         location: The location data to save
         
     Raises:
-        Exception: If database operation fails
+        Exception: If the row cannot be queued
     """
     try:
-        await supabase.table('user_locations').insert({
+        now = datetime.now().isoformat()
+        location_writes.put({
             'user_id': user_id,
             'latitude': location['lat'],
             'longitude': location['lon'],
             'name': location['name'],
-            'created_at': datetime.now().isoformat()
-        }).execute()
+            'updated_at': now
+        })
+        if LOCATION_HISTORY:
+            location_history_writes.put({
+                'user_id': user_id,
+                'latitude': location['lat'],
+                'longitude': location['lon'],
+                'name': location['name'],
+                'created_at': now
+            })
+        await state.publish('profiles', {'user_id': user_id, 'location': location})
     except Exception as e:
         await handle_database_error("save_user_location", e)
 
-async def get_user_location(user_id: int) -> Optional[Location]:
-    """Get user's saved location from database.
+def apply_profile_change(message: Dict[str, Any]) -> None:
+    """Apply a location saved by any worker to the profile cache.
+    
+    Without it, other workers would serve the old location from their
+    cache until the entry expires.
+    
+    Args:
+        message: Broadcast with user_id and location
+    """
+    profile_cache.update(message['user_id'], location=message['location'])
+
+def location_from_row(data: Dict[str, Any]) -> Location:
+    """Convert a user_current_locations row to a Location.
+    
+    Args:
+        data: The database row
+        
+    Returns:
+        Location: The location
+    """
+    return {
+        'lat': data['latitude'],
+        'lon': data['longitude'],
+        'name': data['name']
+    }
+
+async def load_user_profile(user_id: int) -> UserProfile:
+    """Load a user's location, language and preferences in one query.
     
     Args:
         user_id: The user's ID
         
     Returns:
-        Optional[Location]: The user's location if found, None otherwise
+        UserProfile: The user's profile
         
     Raises:
         Exception: If database operation fails
     """
     try:
-        response = await supabase.table('user_locations')\
-            .select('*')\
-            .eq('user_id', user_id)\
-            .order('created_at', desc=True)\
-            .limit(1)\
-            .execute()
+        response = await db.execute(db.rpc('get_user_profile', {'p_user_id': user_id}))
+        data = response.data or {}
         
-        if response.data:
-            data = response.data[0]
-            return {
-                'lat': data['latitude'],
-                'lon': data['longitude'],
-                'name': data['name']
-            }
-        return None
+        location = location_from_row(data['location']) if data.get('location') else None
+        
+        # A location saved moments ago may not be flushed yet
+        pending = location_writes.pending(user_id=user_id)
+        if pending:
+            location = location_from_row(pending)
+        
+        return UserProfile(
+            user_id,
+            location=location,
+            language=data.get('language'),
+            preferences=data.get('preferences') or {}
+        )
     except Exception as e:
-        await handle_database_error("get_user_location", e)
+        await handle_database_error("load_user_profile", e)
 
-# ============= Location Functions =============
+async def get_user_profile(user_id: int) -> UserProfile:
+    """Get user's profile, from the profile cache when possible.
+    
+    Args:
+        user_id: The user's ID
+        
+    Returns:
+        UserProfile: The user's profile
+        
+    Raises:
+        Exception: If database operation fails
+    """
+    return await profile_cache.get(user_id)
 
-async def get_location_from_address(address: str) -> Optional[Location]:
-    """Get location coordinates from address.
+async def get_user_location(user_id: int) -> Optional[Location]:
+    """Get user's saved location.
     
     Args:
-        address: The address to geocode
+        user_id: The user's ID
         
     Returns:
-        Optional[Location]: The location data if found, None otherwise
+        Optional[Location]: The user's location if found, None otherwise
+        
+    Raises:
+        Exception: If database operation fails
+    """
+    profile = await get_user_profile(user_id)
+    return profile.location
+
+async def get_messages(update: Update) -> Messages:
+    """Get the translations of the user's language.
+    
+    The language saved in the user's profile wins over the language of
+    their Telegram client.
+    
+    Args:
+        update: The incoming update
+        
+    Returns:
+        Messages: Translations of the user's language
     """
+    user = update.effective_user
     try:
-        validate_address(address)
-        location = await geolocator.geocode(address)
-        if location:
-            return {
-                'lat': location.latitude,
-                'lon': location.longitude,
-                'name': location.address
-            }
-        return None
-    except SecurityError as e:
-        logger.error(f"Security error: {str(e)}")
-        return None
+        language = (await get_user_profile(user.id)).language
     except Exception as e:
-        logger.error(f"Geocoding error: {str(e)}")
-        return None
+        logger.error(f"Failed to get language of user {user.id}: {str(e)}")
+        language = None
+    return catalog.get(language or user.language_code)
 
-def calculate_distance(loc1: Location, loc2: Location) -> float:
-    """Calculate distance between two locations.
+def cached_messages(user_id: int, fallback: Optional[str] = None) -> Messages:
+    """Get the translations of a user's language without loading their profile.
+    
+    Used when messaging many users at once; users whose profile is not
+    cached get the fallback language, or the default language.
     
     Args:
-        loc1: First location
-        loc2: Second location
+        user_id: The user's ID
+        fallback: Language to use if the profile is not cached
         
     Returns:
-        float: Distance in kilometers
+        Messages: Translations of the user's language
     """
-    return geodesic(
-        (loc1['lat'], loc1['lon']),
-        (loc2['lat'], loc2['lon'])
-    ).kilometers
-
-# ============= Transport Functions =============
+    profile = profile_cache.peek(user_id)
+    return catalog.get((profile.language if profile else None) or fallback)
 
-async def get_transport_info(location: Location) -> List[TransportInfo]:
-    """Get transport information for a location."""
+async def load_favorites() -> int:
+    """Load every favorite stop into the subscription index.
+    
+    Returns:
+        int: Number of favorites loaded
+        
+    Raises:
+        Exception: If database operation fails
+    """
     try:
-        # Validate coordinates
-        validate_coordinates(location['lat'], location['lon'])
+        start = 0
+        count = 0
+        while True:
+            response = await db.execute(
+                db.table('user_favorites')
+                .select('user_id, stop_name')
+                .range(start, start + FAVORITES_LOAD_PAGE - 1)
+            )
+            for row in response.data:
+                count += subscriptions.subscribe(int(row['user_id']), row['stop_name'])
+            if len(response.data) < FAVORITES_LOAD_PAGE:
+                return count
+            start += FAVORITES_LOAD_PAGE
+    except Exception as e:
+        await handle_database_error("load_favorites", e)
+
+async def get_favorites(user_id: int) -> List[str]:
+    """Get user's favorite stops.
+    
+    Args:
+        user_id: The user's ID
         
-        params = {
-            'lat': location['lat'],
-            'lon': location['lon']
-        }
+    Returns:
+        List[str]: Stop names, oldest first
         
-        data = await make_api_request(params)
-        results = []
+    Raises:
+        Exception: If database operation fails
+    """
+    try:
+        response = await db.execute(
+            db.table('user_favorites')
+            .select('stop_name')
+            .eq('user_id', user_id)
+            .order('created_at')
+        )
+        return [row['stop_name'] for row in response.data]
+    except Exception as e:
+        await handle_database_error("get_favorites", e)
+
+async def save_favorite(user_id: int, stop_name: str) -> bool:
+    """Store a favorite stop and subscribe the user to its alerts.
+    
+    Args:
+        user_id: The user's ID
+        stop_name: The stop name
         
-        for item in data.get('results', []):
-            info = {
-                'line': item['line'],
-                'destination': item['destination'],
-                'time': item['time'],
-                'type': item['type']
-            }
-            
-            if validate_transport_info(info):
-                results.append(info)
+    Returns:
+        bool: False if the stop already was a favorite
         
-        return results
-    except SecurityError as e:
-        logger.error(f"Security error: {str(e)}")
-        raise APIError(f"Invalid transport information: {str(e)}")
+    Raises:
+        Exception: If database operation fails
+    """
+    try:
+        response = await db.execute(
+            db.table('user_favorites')
+            .upsert({'user_id': user_id, 'stop_name': stop_name}, ignore_duplicates=True)
+        )
+        await state.publish('favorites', {'user_id': user_id, 'stop': stop_name, 'subscribed': True})
+        return bool(response.data)
     except Exception as e:
-        logger.error(f"Failed to get transport info: {str(e)}")
-        raise APIError(f"Failed to get transport info: {str(e)}")
-
-# ============= Command Handlers =============
+        await handle_database_error("save_favorite", e)
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle /start command."""
-    if not await validate_request(update):
-        return
+async def delete_favorite(user_id: int, stop_name: str) -> bool:
+    """Delete a favorite stop and unsubscribe the user from its alerts.
     
-    await log_request(update, context)
+    Args:
+        user_id: The user's ID
+        stop_name: The stop name
+        
+    Returns:
+        bool: True if the stop was a favorite
+        
+    Raises:
+        Exception: If database operation fails
+    """
+    try:
+        response = await db.execute(
+            db.table('user_favorites')
+            .delete()
+            .eq('user_id', user_id)
+            .eq('stop_name', stop_name)
+        )
+        await state.publish('favorites', {'user_id': user_id, 'stop': stop_name, 'subscribed': False})
+        return bool(response.data)
+    except Exception as e:
+        await handle_database_error("delete_favorite", e)
+
+def apply_favorite_change(message: Dict[str, Any]) -> None:
+    """Apply a favorite added or removed by any worker to the subscription index.
     
-    if not await check_user_session(update, context):
-        await update.message.reply_text("Session expired. Please try again.")
-        return
+    Args:
+        message: Broadcast with user_id, stop and subscribed
+    """
+    if message['subscribed']:
+        subscriptions.subscribe(message['user_id'], message['stop'])
+    else:
+        subscriptions.unsubscribe(message['user_id'], message['stop'])
+
+async def load_reminders() -> int:
+    """Load every stored reminder into the scheduler.
     
-    user_id = update.effective_user.id
-    await update.message.reply_text(
-        TRANSLATIONS['welcome'],
-        reply_markup=InlineKeyboardMarkup([
-            [InlineKeyboardButton(TRANSLATIONS['set_location'], callback_data='set_location')],
-            [InlineKeyboardButton(TRANSLATIONS['get_transport'], callback_data='get_transport')]
+    Returns:
+        int: Number of reminders loaded
+        
+    Raises:
+        Exception: If database operation fails
+    """
+    try:
+        start = 0
+        while True:
+            response = await db.execute(
+                db.table('user_reminders')
+                .select('user_id, line, stop, time')
+                .range(start, start + REMINDER_LOAD_PAGE - 1)
+            )
+            for row in response.data:
+                try:
+                    reminder_scheduler.add(Reminder(int(row['user_id']), row['line'], row['stop'], row['time']))
+                except ValueError as e:
+                    logger.error(f"Skipping reminder of user {row['user_id']}: {str(e)}")
+            if len(response.data) < REMINDER_LOAD_PAGE:
+                return len(reminder_scheduler)
+            start += REMINDER_LOAD_PAGE
+    except Exception as e:
+        await handle_database_error("load_reminders", e)
+
+async def save_reminder(reminder: Reminder) -> None:
+    """Store a reminder and schedule it.
+    
+    Args:
+        reminder: The reminder
+        
+    Raises:
+        Exception: If database operation fails
+    """
+    try:
+        await db.execute(db.table('user_reminders').upsert(reminder._asdict()))
+        await state.publish('reminders', {'add': reminder._asdict()})
+    except Exception as e:
+        await handle_database_error("save_reminder", e)
+
+async def delete_reminder(reminder: Reminder) -> bool:
+    """Delete a stored reminder and unschedule it.
+    
+    Args:
+        reminder: The reminder
+        
+    Returns:
+        bool: True if the reminder existed
+        
+    Raises:
+        Exception: If database operation fails
+    """
+    try:
+        response = await db.execute(
+            db.table('user_reminders')
+            .delete()
+            .eq('user_id', reminder.user_id)
+            .eq('line', reminder.line)
+            .eq('stop', reminder.stop)
+            .eq('time', reminder.time)
+        )
+        await state.publish('reminders', {'remove': reminder._asdict()})
+        return bool(response.data)
+    except Exception as e:
+        await handle_database_error("delete_reminder", e)
+
+def apply_reminder_change(message: Dict[str, Any]) -> None:
+    """Apply a reminder set or deleted by any worker to the scheduler.
+    
+    Args:
+        message: Broadcast with the reminder under 'add' or 'remove'
+    """
+    if 'add' in message:
+        reminder_scheduler.add(Reminder(**message['add']))
+    else:
+        reminder_scheduler.remove(Reminder(**message['remove']))
+
+# ============= Location Functions =============
+
+@metrics.timed('geocode')
+async def get_location_from_address(address: str) -> Optional[Location]:
+    """Get location coordinates from address.
+    
+    Names and aliases of stops and landmarks are answered by the offline
+    gazetteer; anything else, including near matches, goes to Nominatim.
+    
+    Args:
+        address: The address to geocode
+        
+    Returns:
+        Optional[Location]: The location data if found, None otherwise
+    """
+    try:
+        validate_address(address)
+        
+        # Stop names and landmarks are answered locally; a street address
+        # may resemble a landmark name, so only exact names are trusted
+        place = gazetteer.lookup(address, fuzzy=False)
+        if place:
+            return {
+                'lat': place.lat,
+                'lon': place.lon,
+                'name': place.name
+            }
+        
+        return await geocoder.geocode(address)
+    except SecurityError as e:
+        logger.error(f"Security error: {str(e)}")
+        return None
+    except Exception as e:
+        logger.error(f"Geocoding error: {str(e)}")
+        return None
+
+def calculate_distance(loc1: Location, loc2: Location) -> float:
+    """Calculate distance between two locations.
+    
+    Args:
+        loc1: First location
+        loc2: Second location
+        
+    Returns:
+        float: Distance in kilometers
+    """
+    return geodesic(
+        (loc1['lat'], loc1['lon']),
+        (loc2['lat'], loc2['lon'])
+    ).kilometers
+
+def find_nearby_stops(location: Location, limit: int = NEARBY_LIMIT, radius: float = NEARBY_RADIUS) -> List[Tuple[Place, float]]:
+    """Find the stops closest to a location.
+    
+    Candidates are ranked with the spatial index; only the returned stops
+    get an exact geodesic distance for display.
+    
+    Args:
+        location: The location to search around
+        limit: Maximum number of stops to return
+        radius: Maximum distance in meters
+        
+    Returns:
+        List[Tuple[Place, float]]: Stops and their distance in meters, nearest first
+    """
+    validate_coordinates(location['lat'], location['lon'])
+    indices, _ = stop_index.nearest(location['lat'], location['lon'], k=limit, max_distance=radius)
+    results = []
+    for i in indices.tolist():
+        stop = nearby_stops[i]
+        distance = calculate_distance(location, {'lat': stop.lat, 'lon': stop.lon, 'name': stop.name})
+        results.append((stop, distance * 1000))
+    return results
+
+def nearby_stop_names(location: Location, limit: int = NEARBY_LIMIT, radius: float = NEARBY_RADIUS) -> List[str]:
+    """Get the names of the stops closest to a location.
+    
+    Args:
+        location: The location to search around
+        limit: Maximum number of stops
+        radius: Maximum distance in meters
+        
+    Returns:
+        List[str]: Stop names, nearest first
+    """
+    indices, _ = stop_index.nearest(location['lat'], location['lon'], k=limit, max_distance=radius)
+    return [nearby_stops[i].name for i in indices.tolist()]
+
+# ============= Journey Planning Functions =============
+
+def resolve_route_endpoint(query: str) -> Optional[Tuple[str, Dict[int, int]]]:
+    """Resolve a stop or place name to timetable stops.
+    
+    Args:
+        query: Stop name, alias or landmark
+        
+    Returns:
+        Optional[Tuple[str, Dict[int, int]]]: Display name and the stops with
+        the walking seconds to reach them, or None if nothing matches
+    """
+    stop_ids = timetable.find_stops(query)
+    if stop_ids:
+        return timetable.stop_names[stop_ids[0]], {stop: 0 for stop in stop_ids}
+    place = gazetteer.lookup(query)
+    if not place:
+        return None
+    stop_ids = timetable.find_stops(place.name)
+    if stop_ids:
+        return place.name, {stop: 0 for stop in stop_ids}
+    stops = journey_planner.stops_near(place.lat, place.lon, ROUTE_WALK_RADIUS)
+    return (place.name, stops) if stops else None
+
+def split_route_query(words: List[str]) -> Optional[Tuple[Tuple[str, Dict[int, int]], Tuple[str, Dict[int, int]]]]:
+    """Split /route arguments into a resolved origin and destination.
+    
+    Names may span several words, so every split point is tried, the
+    shortest origin first.
+    
+    Args:
+        words: Command arguments
+        
+    Returns:
+        Optional[Tuple]: Resolved origin and destination, or None
+    """
+    for i in range(1, len(words)):
+        origin = resolve_route_endpoint(' '.join(words[:i]))
+        if not origin:
+            continue
+        destination = resolve_route_endpoint(' '.join(words[i:]))
+        if destination:
+            return origin, destination
+    return None
+
+def format_journey(journey: Journey, messages: Dict[str, str]) -> str:
+    """Format a journey option, one line per leg.
+    
+    Args:
+        journey: The journey
+        messages: Translations of the user's language
+        
+    Returns:
+        str: The formatted journey
+    """
+    lines = [messages['route_option'].format(
+        format_time(journey.departure),
+        format_time(journey.arrival),
+        (journey.arrival - journey.departure + 59) // 60,
+        max(journey.rides - 1, 0)
+    )]
+    for leg in journey.legs:
+        if leg.line is None:
+            lines.append(messages['route_walk'].format(
+                (leg.arrival - leg.departure + 59) // 60,
+                timetable.stop_names[leg.to_stop]
+            ))
+        else:
+            lines.append(messages['route_ride'].format(
+                format_time(leg.departure),
+                timetable.stop_names[leg.from_stop],
+                format_time(leg.arrival),
+                timetable.stop_names[leg.to_stop],
+                leg.line,
+                leg.headsign
+            ))
+    return '\n'.join(lines)
+
+# ============= Transport Functions =============
+
+async def load_transport_info(lat: float, lon: float) -> List[TransportInfo]:
+    """Get departures around a quantized location through the shared state.
+    
+    With several workers, one upstream request per location and TTL window
+    serves all of them; with in-process state this is just the fetch.
+    
+    Args:
+        lat: Quantized latitude
+        lon: Quantized longitude
+        
+    Returns:
+        List[TransportInfo]: List of transport information
+    """
+    if not state.shared:
+        return await fetch_transport_info(lat, lon)
+    
+    key = f'departures:{lat}:{lon}'
+    try:
+        departures = await state.get(key)
+        if departures is not None:
+            return departures
+    except Exception as e:
+        logger.error(f"Shared departure cache unavailable: {str(e)}")
+    
+    departures = await fetch_transport_info(lat, lon)
+    try:
+        await state.set(key, departures, TRANSPORT_CACHE_TTL)
+    except Exception as e:
+        logger.error(f"Failed to share departures: {str(e)}")
+    return departures
+
+async def iter_transport_info(lat: float, lon: float, limit: int = API_MAX_RESULTS) -> AsyncIterator[TransportInfo]:
+    """Yield validated departures for coordinates as the API returns them.
+    
+    Records are parsed from the response stream one at a time. With
+    API_PAGE_SIZE, they are requested a page at a time (``rows`` and
+    ``start``), and the next page is only requested once the consumer has
+    taken the current one.
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        limit: Maximum number of departures
+        
+    Yields:
+        TransportInfo: Validated transport information
+        
+    Raises:
+        APIError: If the API request fails
+        SecurityError: If the API returns invalid transport information
+    """
+    start = 0
+    while start < limit:
+        params = {
+            'lat': lat,
+            'lon': lon
+        }
+        count = limit - start
+        if API_PAGE_SIZE:
+            count = min(count, API_PAGE_SIZE)
+            params.update(rows=count, start=start)
+        
+        page = await make_api_request(params, partial(read_results, limit=count))
+        for item in page:
+            info = {
+                'line': item['line'],
+                'destination': item['destination'],
+                'time': item['time'],
+                'type': item['type']
+            }
+            
+            if validate_transport_info(info):
+                yield info
+        
+        if not API_PAGE_SIZE or len(page) < count:
+            return
+        start += len(page)
+
+async def fetch_transport_info(lat: float, lon: float) -> List[TransportInfo]:
+    """Fetch transport information for coordinates from the API.
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        
+    Returns:
+        List[TransportInfo]: Validated transport information, at most
+        API_MAX_RESULTS
+        
+    Raises:
+        APIError: If the API request fails
+        SecurityError: If the API returns invalid transport information
+    """
+    return [info async for info in iter_transport_info(lat, lon)]
+
+def get_board_departures(stops: List[str]) -> Optional[List[TransportInfo]]:
+    """Get departures at stops from the in-memory realtime board.
+    
+    Args:
+        stops: Stop names or IDs
+        
+    Returns:
+        Optional[List[TransportInfo]]: Upcoming departures, soonest first,
+        or None if the realtime feed is disabled, its board is stale or it
+        has none of the stops
+    """
+    if realtime_poller is None:
+        return None
+    departures = realtime_poller.departures(stops, DEPARTURES_LIMIT, REALTIME_MAX_AGE)
+    if departures is None:
+        return None
+    return [departure._asdict() for departure in departures]
+
+async def get_transport_info(location: Location) -> Tuple[List[TransportInfo], Optional[float]]:
+    """Get transport information for a location.
+    
+    Departures come from the realtime board when it is fresh. Otherwise
+    nearby locations share a quantized cache key, so users in the same
+    neighbourhood are served from one upstream request per TTL window.
+    If the API fails, or its circuit is open, the last departures cached
+    for the location are served for up to TRANSPORT_STALE_TTL.
+    
+    Returns:
+        Tuple[List[TransportInfo], Optional[float]]: Departures, and their
+        age in seconds if they are stale
+    """
+    try:
+        # Validate coordinates
+        validate_coordinates(location['lat'], location['lon'])
+        
+        # Served from memory while the realtime board is fresh
+        departures = get_board_departures(nearby_stop_names(location))
+        if departures:
+            return departures, None
+        
+        lat, lon = quantize_location(location['lat'], location['lon'], TRANSPORT_CACHE_PRECISION)
+        try:
+            departures = await transport_cache.get_or_load(
+                (lat, lon),
+                lambda: load_transport_info(lat, lon)
+            )
+            return departures, None
+        except Exception as e:
+            stale = transport_cache.get_stale((lat, lon))
+            if stale is None:
+                raise
+            logger.warning(f"Serving departures cached {stale[1]:.0f} s ago: {str(e)}")
+            return stale
+    except SecurityError as e:
+        logger.error(f"Security error: {str(e)}")
+        raise APIError(f"Invalid transport information: {str(e)}")
+    except Exception as e:
+        logger.error(f"Failed to get transport info: {str(e)}")
+        raise APIError(f"Failed to get transport info: {str(e)}")
+
+def departures_title(messages: Dict[str, str], title: str, stale_age: Optional[float]) -> str:
+    """Add a warning under the title of stale departures.
+    
+    Args:
+        messages: Translations of the user's language
+        title: The formatted title
+        stale_age: Age of the departures in seconds, None if fresh
+        
+    Returns:
+        str: The title
+    """
+    if stale_age is None:
+        return title
+    return '\n'.join([title, messages['stale_departures'].format(max(1, round(stale_age / 60)))])
+
+def stop_departures(stop: str, lines: List[str], limit: int) -> List[TransportInfo]:
+    """Get the next departures of some lines at a stop.
+    
+    The realtime board is used while fresh, the static timetable otherwise.
+    
+    Args:
+        stop: Stop name
+        lines: Line names
+        limit: Maximum number of departures
+        
+    Returns:
+        List[TransportInfo]: Departures sorted by time
+    """
+    wanted = {fold(line) for line in lines}
+    if realtime_poller is not None:
+        departures = realtime_poller.departures([stop], DEPARTURES_LIMIT * 10, REALTIME_MAX_AGE)
+        if departures is not None:
+            return [d._asdict() for d in departures if fold(d.line) in wanted][:limit]
+    if timetable is None:
+        return []
+    stop_ids = timetable.find_stops(stop)
+    routes = [route for line in wanted for route in timetable.find_routes(line)]
+    now = datetime.now(TIMEZONE)
+    seconds = now.hour * 3600 + now.minute * 60 + now.second
+    return [
+        {'line': d.line, 'destination': d.destination, 'time': d.time, 'type': d.type}
+        for d in timetable.next_departures(routes, stop_ids, now.date(), seconds, limit)
+    ]
+
+async def send_reminders(stop: str, reminders: List[Reminder]) -> None:
+    """Send the due reminders of one stop.
+    
+    The stop's departures are looked up once for the whole batch.
+    
+    Args:
+        stop: Stop name
+        reminders: Due reminders at this stop
+    """
+    lines = sorted({reminder.line for reminder in reminders})
+    departures = stop_departures(stop, lines, REMINDER_DEPARTURES * len(lines))
+    for reminder in reminders:
+        messages = cached_messages(reminder.user_id)
+        upcoming = [d for d in departures if fold(d['line']) == fold(reminder.line)][:REMINDER_DEPARTURES]
+        title = messages['reminder_title'].format(reminder.line, reminder.stop)
+        if upcoming:
+            text = messages.rows(title, 'reminder_row', upcoming)
+        else:
+            text = '\n'.join([title, messages['no_departures']])
+        if not outbound.push(reminder.user_id, text, priority=ALERT):
+            logger.error(f"Outbound queue full, reminder to user {reminder.user_id} dropped")
+    try:
+        # Lets the next leader skip reminders this one already sent
+        await state.set(REMINDERS_FIRED_KEY, time.time(), 24 * 3600)
+    except Exception as e:
+        logger.error(f"Failed to record sent reminders: {str(e)}")
+
+def format_disruption(disruption: Disruption, messages: Dict[str, str]) -> str:
+    """Format a disruption for display.
+    
+    Args:
+        disruption: The disruption
+        messages: Translations of the user's language
+        
+    Returns:
+        str: The formatted disruption
+    """
+    lines = [messages['disruption_alert'].format(disruption.title)]
+    if disruption.lines:
+        lines.append(messages['disruption_lines'].format(', '.join(disruption.lines)))
+    if disruption.message:
+        lines.append(disruption.message)
+    return '\n'.join(lines)
+
+async def send_disruption_alerts(changed: List[Disruption], resolved: List[Disruption]) -> None:
+    """Push new, changed and resolved disruptions to subscribed users.
+    
+    Args:
+        changed: New or changed disruptions
+        resolved: Disruptions no longer reported
+    """
+    # Every worker polls the feed, only the leader sends alerts
+    if not leadership.leader:
+        return
+    
+    for disruption, ended in [*((d, False) for d in changed), *((d, True) for d in resolved)]:
+        recipients = subscriptions.recipients(disruption.lines, disruption.stops)
+        texts: Dict[str, str] = {}  # rendered once per language
+        for user_id in recipients:
+            messages = cached_messages(user_id)
+            text = texts.get(messages.language)
+            if text is None:
+                text = texts[messages.language] = (
+                    messages['disruption_resolved'].format(disruption.title) if ended
+                    else format_disruption(disruption, messages)
+                )
+            if not outbound.push(user_id, text, priority=ALERT):
+                logger.error(f"Outbound queue full, disruption {disruption.id} not sent to all users")
+                break
+        logger.info(f"Disruption {disruption.id} sent to {len(recipients)} users")
+
+# ============= Command Handlers =============
+
+def reply(update: Update, text: str, **kwargs: Any) -> None:
+    """Queue a reply to the chat of an update.
+    
+    Replies go through the outbound queue ahead of alerts and broadcasts;
+    the handler does not wait for delivery. A text over Telegram's length
+    limit (a long list of lines or stops) is sent as several messages.
+    
+    Args:
+        update: The incoming update
+        text: Message text
+        **kwargs: Further ``send_message`` arguments, e.g. reply_markup,
+            applied to the last message
+    """
+    chunks = split_message(text)
+    for chunk in chunks[:-1]:
+        outbound.push(update.effective_chat.id, chunk, priority=INTERACTIVE)
+    outbound.push(update.effective_chat.id, chunks[-1], priority=INTERACTIVE, **kwargs)
+
+async def handle_timeout(update: object) -> None:
+    """Tell the user when their command was cancelled for taking too long.
+    
+    Args:
+        update: The update whose processing timed out
+    """
+    if isinstance(update, Update) and update.effective_chat:
+        messages = cached_messages(update.effective_user.id) if update.effective_user else catalog.default
+        reply(update, messages['error'])
+
+@metrics.handler()
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /start command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    user_id = update.effective_user.id
+    messages = await get_messages(update)
+    reply(update,
+        messages['welcome'],
+        reply_markup=InlineKeyboardMarkup([
+            [InlineKeyboardButton(messages['set_location'], callback_data='set_location')],
+            [InlineKeyboardButton(messages['get_transport'], callback_data='get_transport')]
         ])
     )
 
+@metrics.handler()
 async def set_location(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle location setting."""
     if not await validate_request(update):
@@ -490,40 +1601,42 @@ async def set_location(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     await log_request(update, context)
     
     if not await check_user_session(update, context):
-        await update.message.reply_text("Session expired. Please try again.")
+        reply(update, "Session expired. Please try again.")
         return
     
     user_id = update.effective_user.id
     
     try:
-        # Get and validate address
-        address = update.message.text.strip()
+        # Get and validate address (the command arguments, without /set_location)
+        address = ' '.join(context.args or []).strip()
         if not address:
-            await update.message.reply_text("Please provide a valid address.")
+            reply(update, "Please provide a valid address.")
             return
         
         # Get location
         location = await get_location_from_address(address)
         if not location:
-            await update.message.reply_text("Could not find location. Please try again.")
+            reply(update, "Could not find location. Please try again.")
             return
         
         # Save location
         await save_user_location(user_id, location)
         
-        await update.message.reply_text(
-            TRANSLATIONS['current_location'].format(location['name']),
+        messages = await get_messages(update)
+        reply(update,
+            messages['current_location'].format(location['name']),
             reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton(TRANSLATIONS['change_location'], callback_data='change_location')]
+                [InlineKeyboardButton(messages['change_location'], callback_data='change_location')]
             ])
         )
     except SecurityError as e:
-        await update.message.reply_text("Invalid location. Please try again.")
+        reply(update, "Invalid location. Please try again.")
         logger.error(f"Security error in set_location: {str(e)}")
     except Exception as e:
-        await update.message.reply_text("An error occurred. Please try again.")
+        reply(update, "An error occurred. Please try again.")
         logger.error(f"Error in set_location: {str(e)}")
 
+@metrics.handler()
 async def get_transport(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle transport information request."""
     if not await validate_request(update):
@@ -532,65 +1645,639 @@ async def get_transport(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     await log_request(update, context)
     
     if not await check_user_session(update, context):
-        await update.message.reply_text("Session expired. Please try again.")
+        reply(update, "Session expired. Please try again.")
         return
     
     user_id = update.effective_user.id
     location = await get_user_location(user_id)
+    messages = await get_messages(update)
     
     if not location:
-        await update.message.reply_text(TRANSLATIONS['no_location'])
+        reply(update, messages['no_location'])
         return
     
     try:
-        transport_info = await get_transport_info(location)
+        transport_info, stale_age = await get_transport_info(location)
         if not transport_info:
-            await update.message.reply_text(TRANSLATIONS['no_transport'])
+            reply(update, messages['no_transport'])
             return
         
-        message = TRANSLATIONS['transport_info'].format(location['name'])
-        for info in transport_info:
-            message += f"\n{info['line']} - {info['destination']} ({info['time']})"
+        reply(update, messages.rows(
+            departures_title(messages, messages['transport_info'].format(location['name']), stale_age),
+            'departure_row',
+            transport_info
+        ))
+    except APIError as e:
+        reply(update, messages['api_error'])
+        logger.error(f"API error: {str(e)}")
+
+@metrics.handler()
+async def next_bus(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /next_bus command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    query = ' '.join(context.args or []).strip()
+    if not query:
+        reply(update, messages['no_stop'])
+        return
+    
+    try:
+        validate_address(query)
+        # A stop wins over a landmark of the same name
+        stop = gazetteer.lookup(query, kind='stop') or gazetteer.lookup(query)
+        stop_name = stop.name if stop else query
+        if stop:
+            autocomplete.record(stop.name, stop.kind)
+        
+        if stop and stop.kind != 'stop':
+            board_stops = nearby_stop_names({'lat': stop.lat, 'lon': stop.lon, 'name': stop.name})
+        else:
+            board_stops = [stop_name]
+        departures = get_board_departures(board_stops)
+        stale_age = None
+        if departures is None and stop:
+            departures, stale_age = await get_transport_info({'lat': stop.lat, 'lon': stop.lon, 'name': stop.name})
+        if departures is None:
+            reply(update, messages['no_stop_found'].format(query))
+            return
+        if not departures:
+            reply(update, messages['no_departures'])
+            return
         
-        await update.message.reply_text(message)
+        reply(update, messages.rows(
+            departures_title(messages, messages['next_bus_title'].format(stop_name), stale_age),
+            'departure_row',
+            departures
+        ))
+    except SecurityError as e:
+        reply(update, messages['invalid_stop'])
+        logger.error(f"Security error in next_bus: {str(e)}")
     except APIError as e:
-        await update.message.reply_text(TRANSLATIONS['api_error'])
+        reply(update, messages['api_error'])
         logger.error(f"API error: {str(e)}")
 
+@metrics.handler()
+async def list_lines(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /lines command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    if timetable is None or not timetable.lines():
+        reply(update, messages['no_lines'])
+        return
+    
+    reply(update, '\n'.join(
+        f"{short} - {long}" if long else short for short, long in timetable.lines()
+    ))
+
+@metrics.handler()
+async def list_stops(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /stops command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    if not context.args:
+        reply(update, messages['no_line'])
+        return
+    
+    line = context.args[0]
+    routes = timetable.find_routes(line) if timetable else []
+    if not routes:
+        reply(update, messages['no_line_found'].format(line))
+        return
+    
+    names: List[str] = []
+    for route in routes:
+        for stop in timetable.route_stops(route):
+            name = timetable.stop_names[stop]
+            if name not in names:
+                names.append(name)
+    
+    lines = [messages['stops_title'].format(line)]
+    lines.extend(f"• {name}" for name in names)
+    reply(update, '\n'.join(lines))
+
+@metrics.handler()
+async def show_times(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /times command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    if not context.args or len(context.args) < 2:
+        reply(update, messages['no_schedule_params'])
+        return
+    
+    line = context.args[0]
+    stop_query = ' '.join(context.args[1:])
+    routes = timetable.find_routes(line) if timetable else []
+    if not routes:
+        reply(update, messages['no_line_found'].format(line))
+        return
+    
+    stop_ids = timetable.find_stops(stop_query)
+    if not stop_ids:
+        stop = gazetteer.lookup(stop_query)
+        stop_ids = timetable.find_stops(stop.name) if stop else []
+    if not stop_ids:
+        reply(update, messages['no_stop_found'].format(stop_query))
+        return
+    stop_name = timetable.stop_names[stop_ids[0]]
+    
+    now = datetime.now(TIMEZONE)
+    seconds = now.hour * 3600 + now.minute * 60 + now.second
+    departures = timetable.next_departures(routes, stop_ids, now.date(), seconds, TIMES_LIMIT)
+    if not departures:
+        reply(update, messages['no_schedule'].format(line, stop_name))
+        return
+    
+    lines = [messages['schedule_title'].format(line, stop_name)]
+    lines.extend(f"{departure.time} - {departure.destination}" for departure in departures)
+    reply(update, '\n'.join(lines))
+
+@metrics.handler()
+async def nearby(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /nearby command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    query = ' '.join(context.args or []).strip()
+    if not query:
+        reply(update, messages['no_location'])
+        return
+    
+    try:
+        location = await get_location_from_address(query)
+        if not location:
+            reply(update, messages['location_not_found'].format(query))
+            return
+        
+        stops = find_nearby_stops(location)
+        if not stops:
+            reply(update, messages['no_nearby'])
+            return
+        
+        lines = [messages['nearby_title'].format(location['name'])]
+        lines.extend(f"{stop.name} - {distance:.0f} m" for stop, distance in stops)
+        reply(update, '\n'.join(lines))
+    except SecurityError as e:
+        reply(update, messages['error'])
+        logger.error(f"Security error in nearby: {str(e)}")
+
+@metrics.handler()
+async def plan_route(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /route command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    if not context.args or len(context.args) < 2:
+        reply(update, messages['no_route'])
+        return
+    
+    if journey_planner is None:
+        reply(update, messages['no_direct_route'])
+        return
+    
+    endpoints = split_route_query(context.args)
+    if not endpoints:
+        reply(update, messages['no_stop_found'].format(' '.join(context.args)))
+        return
+    (origin_name, origins), (destination_name, destinations) = endpoints
+    
+    now = datetime.now(TIMEZONE)
+    seconds = now.hour * 3600 + now.minute * 60 + now.second
+    journeys = await asyncio.to_thread(
+        journey_planner.route, origins, destinations, now.date(), seconds, ROUTE_MAX_RIDES
+    )
+    if not journeys:
+        reply(update, messages['no_direct_route'])
+        return
+    
+    lines = [messages['route_title'].format(origin_name, destination_name)]
+    lines.extend(format_journey(journey, messages) for journey in journeys)
+    reply(update, '\n\n'.join(lines))
+
+def parse_reminder_args(user_id: int, args: List[str]) -> Optional[Reminder]:
+    """Parse "<line> <stop...> <HH:MM>" command arguments.
+    
+    Args:
+        user_id: The user's ID
+        args: Command arguments
+        
+    Returns:
+        Optional[Reminder]: The reminder, or None if the arguments are invalid
+    """
+    if len(args) < 3:
+        return None
+    try:
+        hours, minutes = parse_time_of_day(args[-1])
+    except ValueError:
+        return None
+    return Reminder(user_id, args[0], ' '.join(args[1:-1]), f"{hours:02d}:{minutes:02d}")
+
+@metrics.handler()
+async def set_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /reminder command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    reminder = parse_reminder_args(update.effective_user.id, context.args or [])
+    if reminder is None:
+        reply(update, messages['invalid_reminder_format'])
+        return
+    
+    try:
+        await save_reminder(reminder)
+        reply(update, messages['reminder_set'].format(reminder.line, reminder.stop, reminder.time))
+    except Exception as e:
+        reply(update, messages['error'])
+        logger.error(f"Error in set_reminder: {str(e)}")
+
+@metrics.handler()
+async def remove_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /delete_reminder command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    reminder = parse_reminder_args(update.effective_user.id, context.args or [])
+    if reminder is None:
+        reply(update, messages['invalid_reminder_format'])
+        return
+    
+    try:
+        if await delete_reminder(reminder):
+            reply(update, messages['reminder_deleted'].format(reminder.line, reminder.stop, reminder.time))
+        else:
+            reply(update, messages['reminder_not_found'])
+    except Exception as e:
+        reply(update, messages['error'])
+        logger.error(f"Error in remove_reminder: {str(e)}")
+
+@metrics.handler()
+async def show_disruptions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /disruptions command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    disruptions = disruption_poller.disruptions(context.args or ()) if disruption_poller else []
+    if not disruptions:
+        reply(update, messages['no_disruptions'])
+        return
+    
+    reply(update, '\n\n'.join(format_disruption(d, messages) for d in disruptions))
+
+@metrics.handler()
+async def network_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /status command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    disruptions = disruption_poller.disruptions() if disruption_poller else []
+    lines = [messages['status_title']]
+    if disruptions:
+        affected = sorted({line for d in disruptions for line in d.lines}, key=lambda name: (len(name), name))
+        lines.append(messages['status_disrupted'].format(len(disruptions), ', '.join(affected) or '-'))
+    else:
+        lines.append(messages['status_ok'])
+    if realtime_poller is not None:
+        age = realtime_poller.board.age()
+        lines.append(messages['status_realtime'].format(int(age)) if age <= REALTIME_MAX_AGE else messages['status_realtime_stale'])
+    reply(update, '\n'.join(lines))
+
+@metrics.handler()
+async def list_favorites(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /favorites command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    try:
+        favorites = await get_favorites(update.effective_user.id)
+        if not favorites:
+            reply(update, messages['no_favorites'])
+            return
+        reply(update, '\n'.join([messages['favorites_title'], *favorites]))
+    except Exception as e:
+        reply(update, messages['error'])
+        logger.error(f"Error in list_favorites: {str(e)}")
+
+@metrics.handler()
+async def add_favorite(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /add_favorite command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    query = ' '.join(context.args or []).strip()
+    if not query:
+        reply(update, messages['no_stop'])
+        return
+    
+    stop_ids = timetable.find_stops(query) if timetable else []
+    stop_name = timetable.stop_names[stop_ids[0]] if stop_ids else query
+    try:
+        if await save_favorite(update.effective_user.id, stop_name):
+            reply(update, messages['favorite_added'].format(stop_name))
+        else:
+            reply(update, messages['favorite_exists'].format(stop_name))
+    except Exception as e:
+        reply(update, messages['error'])
+        logger.error(f"Error in add_favorite: {str(e)}")
+
+@metrics.handler()
+async def remove_favorite(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /remove_favorite command."""
+    if not await validate_request(update):
+        return
+    
+    await log_request(update, context)
+    
+    if not await check_user_session(update, context):
+        reply(update, "Session expired. Please try again.")
+        return
+    
+    messages = await get_messages(update)
+    query = ' '.join(context.args or []).strip()
+    if not query:
+        reply(update, messages['no_stop'])
+        return
+    
+    stop_ids = timetable.find_stops(query) if timetable else []
+    stop_name = timetable.stop_names[stop_ids[0]] if stop_ids else query
+    try:
+        if await delete_favorite(update.effective_user.id, stop_name):
+            reply(update, messages['favorite_removed'].format(stop_name))
+        else:
+            reply(update, messages['favorite_not_found'].format(stop_name))
+    except Exception as e:
+        reply(update, messages['error'])
+        logger.error(f"Error in remove_favorite: {str(e)}")
+
+@metrics.handler()
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle inline queries (@bot <name>) with stop, place and line suggestions.
+    
+    Each suggestion sends the matching command: /next_bus for a stop,
+    /nearby for a place, /stops for a line. Inline queries arrive on every
+    keystroke, so they are neither logged nor counted against the user's
+    rate limit; Telegram reuses the results for INLINE_CACHE_TIME.
+    """
+    if not await validate_request(update):
+        return
+    
+    query = update.inline_query
+    messages = cached_messages(query.from_user.id, query.from_user.language_code)
+    results = []
+    for i, suggestion in enumerate(autocomplete.complete(query.query[:100])):
+        if suggestion.kind == 'line':
+            command, description = 'stops', suggestion.detail
+        elif suggestion.kind == 'place':
+            command, description = 'nearby', messages['nearby_title'].format(suggestion.name)
+        else:
+            lines = timetable.stop_lines(suggestion.name) if timetable else []
+            command, description = 'next_bus', ', '.join(lines)
+        results.append(InlineQueryResultArticle(
+            id=str(i),
+            title=suggestion.name,
+            description=description or None,
+            input_message_content=InputTextMessageContent(f"/{command} {suggestion.name}")
+        ))
+    
+    try:
+        await query.answer(results, cache_time=INLINE_CACHE_TIME)
+    except TelegramError as e:
+        # The user typed on and Telegram no longer accepts this answer
+        logger.warning(f"Inline query not answered: {str(e)}")
+
 # ============= Session Management =============
 
-async def rotate_session_token(context: ContextTypes.DEFAULT_TYPE) -> str:
+async def rotate_session_token(user_id: int) -> str:
     """Rotate session token for security.
     
+    Sessions live in the shared state, so every worker sees the same one.
+    
     Args:
-        context: The context object from Telegram
+        user_id: The user's ID
         
     Returns:
         str: New session token
     """
     token = os.urandom(32).hex()
-    context.user_data['session_token'] = token
-    context.user_data['session_start'] = datetime.now()
+    await state.set(
+        f'session:{user_id}',
+        {'token': token, 'started': time.time()},
+        SESSION_LIFETIME
+    )
     return token
 
+# ============= Lifecycle Hooks =============
+
+async def start_leader_jobs() -> None:
+    """Start the background jobs run by a single worker."""
+    try:
+        fired_until = await state.get(REMINDERS_FIRED_KEY)
+        if fired_until is not None:
+            # Already sent by the previous leader
+            reminder_scheduler.pop_due(fired_until)
+    except Exception as e:
+        logger.error(f"Failed to read sent reminders: {str(e)}")
+    reminder_scheduler.start()
+
+async def stop_leader_jobs() -> None:
+    """Stop the background jobs run by a single worker."""
+    await reminder_scheduler.stop()
+
+async def post_init(application: Application) -> None:
+    """Open shared resources once the application is initialized.
+    
+    Args:
+        application: The running application
+    """
+    await http_pool.open()
+    await state.start()
+    await metrics.start(METRICS_HOST, METRICS_PORT)
+    outbound.start(application.bot)
+    location_writes.start()
+    location_history_writes.start()
+    if realtime_poller:
+        realtime_poller.start()
+    try:
+        count = await load_favorites()
+        logger.info(f"Loaded {count} favorite stops")
+    except Exception as e:
+        logger.error(f"Failed to load favorites: {str(e)}")
+    if disruption_poller:
+        disruption_poller.start()
+    try:
+        count = await load_reminders()
+        logger.info(f"Loaded {count} reminders")
+    except Exception as e:
+        logger.error(f"Failed to load reminders: {str(e)}")
+    leadership.start()
+
+async def post_shutdown(application: Application) -> None:
+    """Release shared resources when the application shuts down.
+    
+    Args:
+        application: The running application
+    """
+    await leadership.stop()
+    if realtime_poller:
+        await realtime_poller.stop()
+    if disruption_poller:
+        await disruption_poller.stop()
+    await location_writes.stop()
+    await location_history_writes.stop()
+    await outbound.stop()
+    db.close()
+    geocoder.close()
+    await state.close()
+    await metrics.stop()
+    await http_pool.close()
+
 # ============= Main Function =============
 
 def main() -> None:
     """Start the bot."""
     # Create the Application
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    application = Application.builder()\
+        .token(TELEGRAM_BOT_TOKEN)\
+        .concurrent_updates(OrderedUpdateProcessor(
+            UPDATE_CONCURRENCY,
+            timeout=HANDLER_TIMEOUT,
+            reserve=HANDLER_RESERVE,
+            on_timeout=handle_timeout
+        ))\
+        .post_init(post_init)\
+        .post_shutdown(post_shutdown)\
+        .build()
+    metrics.register('updates', application.update_processor.stats)
     
     # Add handlers
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("set_location", set_location))
     application.add_handler(CommandHandler("get_transport", get_transport))
-    
-    # Add rate limiting
-    application.add_handler(MessageRateLimit(rate_limit=100, per=3600))
-    application.add_handler(MessageThrottle(rate_limit=10, per=60))
+    application.add_handler(CommandHandler("next_bus", next_bus))
+    application.add_handler(CommandHandler("lines", list_lines))
+    application.add_handler(CommandHandler("stops", list_stops))
+    application.add_handler(CommandHandler("times", show_times))
+    application.add_handler(CommandHandler("nearby", nearby))
+    application.add_handler(CommandHandler("route", plan_route))
+    application.add_handler(CommandHandler("reminder", set_reminder))
+    application.add_handler(CommandHandler("delete_reminder", remove_reminder))
+    application.add_handler(CommandHandler("disruptions", show_disruptions))
+    application.add_handler(CommandHandler("status", network_status))
+    application.add_handler(CommandHandler("favorites", list_favorites))
+    application.add_handler(CommandHandler("add_favorite", add_favorite))
+    application.add_handler(CommandHandler("remove_favorite", remove_favorite))
+    application.add_handler(InlineQueryHandler(inline_query))
     
     # Start the bot
-    application.run_polling()
+    if WEBHOOK_URL:
+        server = WebhookServer(
+            application,
+            path=WEBHOOK_PATH,
+            secret_token=WEBHOOK_SECRET,
+            max_pending=WEBHOOK_MAX_PENDING,
+            health=lambda: {
+                'outbound': outbound.depth(),
+                'leader': leadership.leader,
+                'updates': application.update_processor.stats()
+            }
+        )
+        metrics.register('webhook', server.stats)
+        asyncio.run(run_webhook(
+            application,
+            server,
+            WEBHOOK_URL.rstrip('/') + WEBHOOK_PATH,
+            host=WEBHOOK_HOST,
+            port=WEBHOOK_PORT,
+            max_connections=WEBHOOK_MAX_CONNECTIONS
+        ))
+    else:
+        application.run_polling()
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
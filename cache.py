@@ -0,0 +1,180 @@
+# Standard library imports
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Local imports
+from upstream import no_deadline, within_deadline
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a fixed TTL.
+
+    Concurrent misses for the same key are coalesced: the first caller starts
+    the loader and every other caller awaits the same in-flight task, so only
+    one upstream request runs per key at a time. The shared load does not
+    inherit the first caller's deadline: each caller stops waiting at its
+    own deadline, and the load still completes and is cached. Expired
+    entries can be kept for ``stale_ttl`` more seconds, to be served by
+    :meth:`get_stale` when reloading them fails.
+    """
+
+    def __init__(self, ttl: float, maxsize: int, stale_ttl: float = 0.0) -> None:
+        """Configure the cache.
+
+        Args:
+            ttl: Seconds an entry stays fresh
+            maxsize: Maximum number of entries before the least recently
+                used one is evicted
+            stale_ttl: Seconds an expired entry is kept for get_stale
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._data: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Optional[Any]: The cached value, or None if missing or expired
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at <= now:
+            if expires_at + self.stale_ttl <= now:
+                del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def get_stale(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """Return a cached value even if expired, within ``stale_ttl``.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Optional[Tuple[Any, float]]: The value and its age in seconds,
+            or None if missing or too old
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        age = time.monotonic() - (expires_at - self.ttl)
+        if age >= self.ttl + self.stale_ttl:
+            return None
+        self.stale_hits += 1
+        return value, age
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: The cache key
+            value: The value to store
+        """
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a key from the cache.
+
+        Args:
+            key: The cache key
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry from the cache."""
+        self._data.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading it on a miss.
+
+        Args:
+            key: The cache key
+            loader: Coroutine function producing the value on a miss
+
+        Returns:
+            Any: The cached or freshly loaded value
+
+        Raises:
+            Exception: Whatever the loader raised; failures are not cached
+            DeadlineExceeded: If the caller's deadline passed first
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            with no_deadline():
+                task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_loaded(key, t))
+
+        # Shield so one cancelled or late caller does not cancel the shared load
+        return await within_deadline(asyncio.shield(task))
+
+    def _on_loaded(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self.set(key, task.result())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters.
+
+        Returns:
+            Dict[str, Any]: Size, capacity, TTL and counters
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'stale_ttl': self.stale_ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'stale_hits': self.stale_hits,
+            'inflight': len(self._inflight),
+            'hit_ratio': (self.hits + self.coalesced) / lookups if lookups else 0.0
+        }
+
+
+def quantize_location(lat: float, lon: float, precision: int = 3) -> Tuple[float, float]:
+    """Round coordinates so that nearby requests share a cache key.
+
+    Args:
+        lat: Latitude
+        lon: Longitude
+        precision: Decimal places to keep (3 is roughly 110 m)
+
+    Returns:
+        Tuple[float, float]: The rounded coordinates
+    """
+    return (round(lat, precision), round(lon, precision))
@@ -0,0 +1,192 @@
+# Standard library imports
+import logging
+import string
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_formatter = string.Formatter()
+
+
+def placeholders(template: str) -> Tuple[str, ...]:
+    """Return the replacement fields of a template, in order.
+
+    Args:
+        template: A ``str.format`` template
+
+    Returns:
+        Tuple[str, ...]: Field names, '' for positional ``{}`` fields
+
+    Raises:
+        ValueError: If the template is malformed
+    """
+    return tuple(field for _, field, _, _ in _formatter.parse(template) if field is not None)
+
+
+def compile_row(template: str) -> Callable[[Mapping[str, Any]], str]:
+    """Compile a template with named fields into a function of one row.
+
+    The fields are fetched with a single ``itemgetter`` and passed to the
+    template rewritten with positional fields, which is about a third
+    faster than ``format_map``.
+
+    Args:
+        template: A template such as ``"{line} - {destination}"``
+
+    Returns:
+        Callable[[Mapping[str, Any]], str]: Renders a row
+
+    Raises:
+        ValueError: If the template is malformed
+    """
+    parts = []
+    fields = []
+    for literal, field, spec, conversion in _formatter.parse(template):
+        parts.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is not None:
+            fields.append(field)
+            parts.append('{' + (f'!{conversion}' if conversion else '') + (f':{spec}' if spec else '') + '}')
+    if not fields or any(not field.isidentifier() for field in fields):
+        return template.format_map
+    positional = ''.join(parts).format
+    if len(fields) == 1:
+        get = itemgetter(fields[0])
+        return lambda row: positional(get(row))
+    get_all = itemgetter(*fields)
+    return lambda row: positional(*get_all(row))
+
+
+class Messages(dict):
+    """The compiled messages of one language.
+
+    A dict of message key to template, so handlers keep writing
+    ``messages['key'].format(...)``. Keys missing from the language hold the
+    default language's template. Row templates, whose keys end in ``_row``,
+    are compiled for ``rows``.
+    """
+
+    def __init__(self, language: str, templates: Mapping[str, str]) -> None:
+        super().__init__(templates)
+        self.language = language
+        self._rows: Dict[str, Callable[[Mapping[str, Any]], str]] = {
+            key: compile_row(template) for key, template in self.items() if key.endswith('_row')
+        }
+
+    def rows(self, title: str, row_key: str, rows: Iterable[Mapping[str, Any]]) -> str:
+        """Render a title followed by one line per row.
+
+        The lines are joined once instead of concatenated one by one.
+
+        Args:
+            title: The first line, already formatted
+            row_key: Key of a row template, with named fields such as ``{line}``
+            rows: One mapping of field values per line
+
+        Returns:
+            str: The rendered message
+        """
+        render = self._rows[row_key]
+        return '\n'.join([title, *[render(row) for row in rows]])
+
+
+class MessageCatalog:
+    """Translations compiled once per language, on first use.
+
+    Compiling a language checks every template against the default
+    language: a template that does not parse, or whose fields differ from
+    the default's, is logged and replaced by the default template, so a
+    translation mistake shows up at load time rather than as an exception
+    in a handler. Only the default and preloaded languages are compiled at
+    startup; other languages are loaded the first time a user needs them.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[Mapping[str, str]]],
+        default: str,
+        preload: Iterable[str] = ()
+    ) -> None:
+        """Compile the default and preloaded languages.
+
+        Args:
+            loader: Returns the templates of a language code, or None if the
+                language is not translated
+            default: Language used for untranslated languages and keys
+            preload: Further languages to compile at startup
+
+        Raises:
+            KeyError: If the default language cannot be loaded
+        """
+        self._loader = loader
+        self._compiled: Dict[str, Messages] = {}
+        templates = loader(default)
+        if templates is None:
+            raise KeyError(f"No translations for default language '{default}'")
+        self._fields = {}
+        for key, template in templates.items():
+            try:
+                self._fields[key] = placeholders(template)
+            except ValueError as e:
+                raise ValueError(f"Invalid template {default}.{key}: {str(e)}") from e
+        self.default = self._compiled[default] = Messages(default, templates)
+        self.fallbacks = 0
+        for language in preload:
+            self.get(language)
+
+    def _compile(self, language: str, templates: Mapping[str, str]) -> Messages:
+        compiled = dict(self.default)
+        for key, template in templates.items():
+            try:
+                fields = placeholders(template)
+            except ValueError as e:
+                logger.error(f"Invalid template {language}.{key}: {str(e)}")
+                continue
+            expected = self._fields.get(key)
+            if expected is not None and fields != expected:
+                logger.error(f"Template {language}.{key} has fields {fields}, expected {expected}")
+                continue
+            compiled[key] = template
+        missing = len(self.default.keys() - templates.keys())
+        if missing:
+            logger.warning(f"{missing} messages untranslated in '{language}', using '{self.default.language}'")
+        return Messages(language, compiled)
+
+    def get(self, language: Optional[str]) -> Messages:
+        """Return the messages of a language, compiling it on first use.
+
+        Args:
+            language: Language code such as 'en' or 'en-US', or None
+
+        Returns:
+            Messages: The language's messages, the default language's if it
+                is not translated
+        """
+        if not language:
+            return self.default
+        messages = self._compiled.get(language)
+        if messages is not None:
+            return messages
+        code = language.replace('_', '-').split('-')[0].lower()
+        messages = self._compiled.get(code)
+        if messages is None:
+            templates = self._loader(code)
+            if templates is None:
+                self.fallbacks += 1
+                messages = self.default
+            else:
+                messages = self._compile(code, templates)
+                logger.info(f"Loaded '{code}' translations")
+            self._compiled[code] = messages
+        return messages
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of compiled languages.
+
+        Returns:
+            Dict[str, Any]: Catalog counters
+        """
+        return {
+            'languages': len({messages.language for messages in self._compiled.values()}),
+            'untranslated_languages': self.fallbacks
+        }
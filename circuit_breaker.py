@@ -0,0 +1,209 @@
+# Standard library imports
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Tuple, TypeVar
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """Stops calling an upstream that keeps failing or answering slowly.
+
+    While closed, the outcomes of the last ``window`` calls are tracked; once
+    ``min_calls`` have been seen, the circuit opens if the share of failed
+    calls reaches ``failure_ratio`` or the share of calls slower than
+    ``slow_call`` reaches ``slow_ratio``. While open, calls fail at once with
+    :class:`CircuitOpenError`. After ``open_duration`` the circuit is half
+    open: one trial call is let through, then two at a time once it
+    succeeds, then four, up to ``max_probes``; the circuit closes when that
+    many succeed, and opens again on the first failed or slow trial. A trial
+    that raises an error not counted as a failure, or is cancelled, proves
+    nothing either way: it only frees its slot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_ratio: float = 0.5,
+        slow_call: float = 5.0,
+        slow_ratio: float = 0.8,
+        open_duration: float = 30.0,
+        max_probes: int = 8,
+        is_failure: Callable[[Exception], bool] = lambda e: True,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Configure the breaker.
+
+        Args:
+            name: Upstream name, for logs
+            window: Number of recent calls considered
+            min_calls: Calls needed in the window before the circuit may open
+            failure_ratio: Share of failed calls that opens the circuit
+            slow_call: Seconds after which a call counts as slow
+            slow_ratio: Share of slow calls that opens the circuit
+            open_duration: Seconds the circuit stays open before trial calls
+            max_probes: Concurrent trial calls that must succeed to close
+            is_failure: Whether an exception counts against the upstream;
+                errors caused by the request itself should not
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call = slow_call
+        self.slow_ratio = slow_ratio
+        self.open_duration = open_duration
+        self.max_probes = max_probes
+        self._is_failure = is_failure
+        self._clock = clock
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probes = 1  # trial calls allowed at once while half open
+        self._probing = 0
+        self._probe_successes = 0
+        self._generation = 0  # bumped on every state change
+        self.opened = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        """Return the seconds left before trial calls are let through.
+
+        Returns:
+            float: Seconds, 0 unless the circuit is open
+        """
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_duration - self._clock())
+
+    def _admit(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                return False
+            self._transition(HALF_OPEN)
+        if self._probing < self._probes:
+            self._probing += 1
+            return True
+        return False
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self._generation += 1
+        self._outcomes.clear()
+        self._failures = self._slow = 0
+        self._probes = 1
+        self._probing = self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = self._clock()
+            self.opened += 1
+            logger.warning(f"Circuit for {self.name} opened for {self.open_duration:.0f} s")
+        else:
+            logger.info(f"Circuit for {self.name} {state.replace('_', ' ')}")
+
+    def _release(self, generation: int) -> None:
+        # A trial call ended without telling whether the upstream recovered
+        if generation == self._generation and self.state == HALF_OPEN:
+            self._probing -= 1
+
+    def _record(self, generation: int, failed: bool, duration: float) -> None:
+        if generation != self._generation:
+            return  # started before the last state change
+        slow = duration >= self.slow_call
+        if self.state == HALF_OPEN:
+            self._probing -= 1
+            if failed or slow:
+                self._transition(OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self._probes:
+                if self._probes >= self.max_probes:
+                    self._transition(CLOSED)
+                else:
+                    # Let more traffic through, once the last step succeeded
+                    self._probes = min(self._probes * 2, self.max_probes)
+                    self._probe_successes = 0
+            return
+
+        if len(self._outcomes) == self._outcomes.maxlen:
+            old_failed, old_slow = self._outcomes[0]
+            self._failures -= old_failed
+            self._slow -= old_slow
+        self._outcomes.append((failed, slow))
+        self._failures += failed
+        self._slow += slow
+        calls = len(self._outcomes)
+        if calls >= self.min_calls and (
+            self._failures >= self.failure_ratio * calls or self._slow >= self.slow_ratio * calls
+        ):
+            self._transition(OPEN)
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Call the upstream through the breaker.
+
+        Args:
+            func: Coroutine function making the call
+            *args: Positional arguments of func
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            T: What func returned
+
+        Raises:
+            CircuitOpenError: If the circuit is open, without calling func
+            Exception: Whatever func raised
+        """
+        if not self._admit():
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} unavailable, retry in {self.retry_after():.0f} s")
+        generation = self._generation
+        started = self._clock()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            if self._is_failure(e):
+                self._record(generation, True, self._clock() - started)
+            elif self.state == HALF_OPEN:
+                self._release(generation)  # e.g. the caller's deadline passed
+            else:
+                self._record(generation, False, self._clock() - started)
+            raise
+        except BaseException:
+            self._release(generation)  # cancelled
+            raise
+        self._record(generation, False, self._clock() - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the circuit state and counters.
+
+        Returns:
+            Dict[str, Any]: Breaker counters
+        """
+        return {
+            'state': self.state,
+            'open': self.state == OPEN,
+            'recent_calls': len(self._outcomes),
+            'recent_failures': self._failures,
+            'recent_slow_calls': self._slow,
+            'opened': self.opened,
+            'rejected': self.rejected,
+            'probes': self._probes if self.state == HALF_OPEN else 0
+        }
@@ -0,0 +1,316 @@
+# Standard library imports
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Third-party imports
+import aiohttp
+
+# Local imports
+from textutils import fold
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class Disruption(NamedTuple):
+    """One service disruption, as published by the upstream feed."""
+    id: str
+    title: str
+    message: str
+    severity: str
+    lines: Tuple[str, ...]
+    stops: Tuple[str, ...]
+
+
+def _names(value: Any) -> Tuple[str, ...]:
+    # Lists, or "A, B; C" strings
+    if not value:
+        return ()
+    if isinstance(value, str):
+        value = value.replace(';', ',').split(',')
+    return tuple(sorted({str(v).strip() for v in value if str(v).strip()}))
+
+
+def parse_disruptions(data: Dict[str, Any]) -> Dict[str, Disruption]:
+    """Parse an open-data disruptions payload.
+
+    The payload holds a ``records`` (Opendatasoft) or ``results`` list whose
+    items, or their ``fields``, carry ``id``, ``title``, ``message``,
+    ``severity``, ``lines`` and ``stops`` (lists or comma-separated). Records
+    without an id or title are skipped.
+
+    Args:
+        data: The decoded JSON payload
+
+    Returns:
+        Dict[str, Disruption]: Disruptions by id
+    """
+    disruptions: Dict[str, Disruption] = {}
+    for record in data.get('records') or data.get('results') or ():
+        fields = record.get('fields', record)
+        try:
+            disruption = Disruption(
+                str(fields['id']),
+                str(fields['title']),
+                str(fields.get('message') or ''),
+                str(fields.get('severity') or 'info'),
+                _names(fields.get('lines')),
+                _names(fields.get('stops'))
+            )
+        except (KeyError, TypeError, AttributeError):
+            continue
+        disruptions[disruption.id] = disruption
+    return disruptions
+
+
+def diff_disruptions(
+    previous: Dict[str, Disruption],
+    current: Dict[str, Disruption]
+) -> Tuple[List[Disruption], List[Disruption]]:
+    """Compare two snapshots.
+
+    Args:
+        previous: Disruptions by id from the last poll
+        current: Disruptions by id from this poll
+
+    Returns:
+        Tuple[List[Disruption], List[Disruption]]: New or changed
+        disruptions, and disruptions that are no longer reported
+    """
+    changed = [d for key, d in current.items() if previous.get(key) != d]
+    resolved = [d for key, d in previous.items() if key not in current]
+    return changed, resolved
+
+
+class SubscriptionIndex:
+    """Inverted index from stops and lines to subscribed users.
+
+    Users subscribe to stops (their favorites); they are also indexed under
+    every line serving those stops, with a count so a line is only dropped
+    once none of the user's stops is served by it. Looking up the recipients
+    of an alert costs one set union over its lines and stops.
+    """
+
+    def __init__(self, lines_for_stop: Callable[[str], Iterable[str]] = lambda stop: ()) -> None:
+        """Create an empty index.
+
+        Args:
+            lines_for_stop: Returns the names of the lines serving a stop
+        """
+        self._lines_for_stop = lines_for_stop
+        self._stops: Dict[str, Set[int]] = defaultdict(set)
+        self._lines: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._stop_lines: Dict[str, Tuple[str, ...]] = {}
+
+    def _lines_of(self, key: str, stop: str) -> Tuple[str, ...]:
+        lines = self._stop_lines.get(key)
+        if lines is None:
+            lines = self._stop_lines[key] = tuple({fold(line) for line in self._lines_for_stop(stop)})
+        return lines
+
+    def subscribe(self, user_id: int, stop: str) -> bool:
+        """Subscribe a user to a stop and the lines serving it.
+
+        Args:
+            user_id: The user's ID
+            stop: Stop name
+
+        Returns:
+            bool: False if the user was already subscribed to the stop
+        """
+        key = fold(stop)
+        users = self._stops[key]
+        if user_id in users:
+            return False
+        users.add(user_id)
+        for line in self._lines_of(key, stop):
+            counts = self._lines[line]
+            counts[user_id] = counts.get(user_id, 0) + 1
+        return True
+
+    def unsubscribe(self, user_id: int, stop: str) -> bool:
+        """Unsubscribe a user from a stop.
+
+        Args:
+            user_id: The user's ID
+            stop: Stop name
+
+        Returns:
+            bool: False if the user was not subscribed to the stop
+        """
+        key = fold(stop)
+        users = self._stops.get(key)
+        if not users or user_id not in users:
+            return False
+        users.discard(user_id)
+        if not users:
+            del self._stops[key]
+        for line in self._lines_of(key, stop):
+            counts = self._lines[line]
+            if counts.get(user_id, 0) <= 1:
+                counts.pop(user_id, None)
+                if not counts:
+                    del self._lines[line]
+            else:
+                counts[user_id] -= 1
+        return True
+
+    def recipients(self, lines: Iterable[str] = (), stops: Iterable[str] = ()) -> Set[int]:
+        """Return the users subscribed to any of the lines or stops.
+
+        Args:
+            lines: Line names
+            stops: Stop names
+
+        Returns:
+            Set[int]: User IDs
+        """
+        users: Set[int] = set()
+        for line in lines:
+            users.update(self._lines.get(fold(line), ()))
+        for stop in stops:
+            users.update(self._stops.get(fold(stop), ()))
+        return users
+
+    def stats(self) -> Dict[str, int]:
+        """Return index sizes.
+
+        Returns:
+            Dict[str, int]: Indexed stops, lines and subscriptions
+        """
+        return {
+            'stops': len(self._stops),
+            'lines': len(self._lines),
+            'subscriptions': sum(len(users) for users in self._stops.values())
+        }
+
+
+class DisruptionPoller:
+    """Background task polling the disruptions feed and reporting changes.
+
+    Each poll is diffed against the previous snapshot; only new or changed
+    disruptions, and those no longer reported, are passed to ``on_change``.
+    The first successful poll only sets the baseline, so a restart does not
+    re-send every ongoing disruption.
+    """
+
+    def __init__(
+        self,
+        session_provider: Callable[[], aiohttp.ClientSession],
+        url: str,
+        on_change: Callable[[List[Disruption], List[Disruption]], Awaitable[None]],
+        interval: float = 60.0,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0
+    ) -> None:
+        """Configure the poller.
+
+        Args:
+            session_provider: Callable returning the shared aiohttp session
+            url: Feed URL
+            on_change: Coroutine called with new or changed disruptions and
+                resolved disruptions
+            interval: Seconds between polls
+            params: Query parameters sent with every poll
+            headers: Headers sent with every poll
+            timeout: Timeout of a poll, in seconds
+        """
+        self._session_provider = session_provider
+        self.url = url
+        self._on_change = on_change
+        self.interval = interval
+        self.params = params or {}
+        self.headers = headers or {}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.current: Dict[str, Disruption] = {}
+        self.updated_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.failures = 0
+        self.changes = 0
+
+    def start(self) -> None:
+        """Start polling in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='disruption-poller')
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await self.poll()
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def poll(self) -> bool:
+        """Fetch the feed once, diff it and report changes.
+
+        Returns:
+            bool: True if the snapshot was replaced
+        """
+        self.polls += 1
+        try:
+            session = self._session_provider()
+            async with session.get(self.url, params=self.params, headers=self.headers, timeout=self.timeout) as response:
+                if response.status != 200:
+                    raise ValueError(f"feed returned status {response.status}")
+                data = await response.json(content_type=None)
+            current = parse_disruptions(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Disruption poll failed: {str(e)}")
+            return False
+
+        first = self.updated_at is None
+        changed, resolved = diff_disruptions(self.current, current)
+        self.current = current
+        self.updated_at = time.monotonic()
+        if not first and (changed or resolved):
+            self.changes += len(changed) + len(resolved)
+            try:
+                await self._on_change(changed, resolved)
+            except Exception as e:
+                logger.error(f"Disruption alert fan-out failed: {str(e)}")
+        return True
+
+    def disruptions(self, lines: Iterable[str] = ()) -> List[Disruption]:
+        """Return current disruptions, optionally only those of some lines.
+
+        Args:
+            lines: Line names; all disruptions when empty
+
+        Returns:
+            List[Disruption]: Disruptions sorted by id
+        """
+        wanted = {fold(line) for line in lines}
+        return [
+            d for _, d in sorted(self.current.items())
+            if not wanted or wanted.intersection(fold(line) for line in d.lines)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return snapshot size, age and poll counters.
+
+        Returns:
+            Dict[str, Any]: Poller counters
+        """
+        return {
+            'disruptions': len(self.current),
+            'age': time.monotonic() - self.updated_at if self.updated_at is not None else None,
+            'polls': self.polls,
+            'failures': self.failures,
+            'changes': self.changes
+        }
@@ -0,0 +1,151 @@
+# Standard library imports
+import json
+import logging
+import os
+from typing import List, NamedTuple, Optional, Sequence
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from spatial_index import SpatialIndex
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+FOOTPATHS_FORMAT = 1
+WALKING_SPEED = 1.2  # meters per second, with detour allowance
+FOOTPATH_RADIUS = 400.0  # meters
+ARRAY_NAMES = ('offsets', 'neighbours', 'distances', 'seconds')
+
+
+class Footpaths(NamedTuple):
+    """Walking transfers between stops as a CSR adjacency.
+
+    The transfers of stop ``s`` are ``neighbours[offsets[s]:offsets[s + 1]]``
+    with matching ``distances`` (meters) and ``seconds``, nearest first.
+    """
+    offsets: np.ndarray
+    neighbours: np.ndarray
+    distances: np.ndarray
+    seconds: np.ndarray
+    radius: float
+    speed: float
+
+    def __len__(self) -> int:
+        return len(self.neighbours)
+
+    def save(self, directory: str) -> None:
+        """Write the adjacency as .npy arrays plus a JSON header.
+
+        Args:
+            directory: Target directory, created if needed
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"footpath_{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(directory, 'footpaths.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': FOOTPATHS_FORMAT,
+                'stops': len(self.offsets) - 1,
+                'radius': self.radius,
+                'speed': self.speed
+            }, f)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['Footpaths']:
+        """Memory-map an adjacency saved with :meth:`save`.
+
+        Args:
+            directory: Cache directory
+
+        Returns:
+            Optional[Footpaths]: The footpaths, or None if the directory holds
+            none in the current format
+        """
+        try:
+            with open(os.path.join(directory, 'footpaths.json'), encoding='utf-8') as f:
+                header = json.load(f)
+        except FileNotFoundError:
+            return None
+        if header.get('format') != FOOTPATHS_FORMAT:
+            return None
+        arrays = [
+            np.load(os.path.join(directory, f"footpath_{name}.npy"), mmap_mode='r')
+            for name in ARRAY_NAMES
+        ]
+        return cls(*arrays, float(header['radius']), float(header['speed']))
+
+
+def build_footpaths(
+    index: SpatialIndex,
+    radius: float = FOOTPATH_RADIUS,
+    speed: float = WALKING_SPEED
+) -> Footpaths:
+    """Compute walking transfers between all stops within a radius.
+
+    Each stop is one radius query on the grid index, so the build is linear
+    in the number of stops rather than quadratic.
+
+    Args:
+        index: Spatial index over the stops
+        radius: Maximum walking distance, in meters
+        speed: Walking speed, in meters per second
+
+    Returns:
+        Footpaths: The transfers
+    """
+    offsets = np.zeros(len(index) + 1, dtype=np.int64)
+    neighbours: List[np.ndarray] = []
+    distances: List[np.ndarray] = []
+    for stop in range(len(index)):
+        ids, meters = index.within(float(index.lats[stop]), float(index.lons[stop]), radius)
+        keep = ids != stop
+        neighbours.append(ids[keep].astype(np.int32))
+        distances.append(meters[keep].astype(np.float32))
+        offsets[stop + 1] = offsets[stop] + int(keep.sum())
+    neighbours_array = np.concatenate(neighbours) if neighbours else np.empty(0, dtype=np.int32)
+    distances_array = np.concatenate(distances) if distances else np.empty(0, dtype=np.float32)
+    return Footpaths(
+        offsets,
+        neighbours_array,
+        distances_array,
+        np.ceil(distances_array / speed).astype(np.int32),
+        radius,
+        speed
+    )
+
+
+def load_footpaths(
+    directory: str,
+    lats: Sequence[float],
+    lons: Sequence[float],
+    radius: float = FOOTPATH_RADIUS,
+    speed: float = WALKING_SPEED
+) -> Footpaths:
+    """Load the footpaths from the cache, building them on a miss.
+
+    Args:
+        directory: Cache directory, normally the timetable's
+        lats: Stop latitudes
+        lons: Stop longitudes
+        radius: Maximum walking distance, in meters
+        speed: Walking speed, in meters per second
+
+    Returns:
+        Footpaths: The transfers
+    """
+    footpaths = Footpaths.load(directory)
+    if footpaths is not None and (
+        len(footpaths.offsets) - 1 == len(lats)
+        and footpaths.radius == radius
+        and footpaths.speed == speed
+    ):
+        logger.info(f"Footpaths mapped from {directory}")
+        return footpaths
+    footpaths = build_footpaths(SpatialIndex(lats, lons), radius, speed)
+    try:
+        footpaths.save(directory)
+    except OSError as e:
+        logger.error(f"Could not write footpaths cache: {str(e)}")
+    logger.info(f"Footpaths built: {len(footpaths)} transfers within {radius:.0f} m")
+    return footpaths
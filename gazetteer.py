@@ -0,0 +1,266 @@
+# Standard library imports
+import csv
+import heapq
+import io
+import logging
+import math
+import os
+import sys
+import zipfile
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Local imports
+from textutils import fold
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Minimum trigram similarity for fuzzy results in prefix search
+SEARCH_SIMILARITY = 0.3
+
+
+class Place(NamedTuple):
+    """A named point known to the gazetteer."""
+    name: str
+    lat: float
+    lon: float
+    kind: str  # 'stop' or 'place'
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the character trigrams of already-folded text.
+
+    Args:
+        text: Folded text
+
+    Returns:
+        Set[str]: Trigrams, with word boundaries padded by spaces
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """Offline index of Bordeaux stops and landmarks.
+
+    Names are folded with :func:`textutils.fold` and indexed three ways: an
+    exact-match dict, a sorted key list for prefix search and a trigram
+    inverted index for typo-tolerant matching. Every lookup stays in memory.
+    A stop and a landmark may share a name (the "Gambetta" stop and "Place
+    Gambetta", alias "Gambetta"): both are kept, and lookups may ask for one
+    kind.
+    """
+
+    def __init__(self, min_similarity: float = 0.6) -> None:
+        """Create an empty gazetteer.
+
+        Args:
+            min_similarity: Minimum trigram similarity (0-1) for a fuzzy
+                match to be accepted by :meth:`lookup`
+        """
+        self.min_similarity = min_similarity
+        self.places: List[Place] = []
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        self._keys: List[Tuple[str, int]] = []
+        self._trigrams: Dict[str, List[int]] = defaultdict(list)
+        self._key_grams: List[FrozenSet[str]] = []
+        self._key_ids: List[int] = []
+        self._sorted = True
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def add(self, place: Place, aliases: Iterable[str] = ()) -> None:
+        """Add a place under its name and optional aliases.
+
+        Names already used by a place of the same kind are ignored, so the
+        first source loaded wins; places of other kinds keep theirs.
+
+        Args:
+            place: The place to add
+            aliases: Alternative names for the place
+        """
+        place_id = len(self.places)
+        added = False
+        for name in (place.name, *aliases):
+            key = fold(name)
+            if not key:
+                continue
+            ids = self._exact[key]
+            if place_id in ids or any(self.places[i].kind == place.kind for i in ids):
+                continue
+            ids.append(place_id)
+            key_id = len(self._key_ids)
+            self._key_ids.append(place_id)
+            grams = frozenset(sys.intern(gram) for gram in trigrams(key))
+            self._key_grams.append(grams)
+            for gram in grams:
+                self._trigrams[gram].append(key_id)
+            self._keys.append((key, place_id))
+            added = True
+        if added:
+            self.places.append(place)
+            self._sorted = False
+
+    def load_places_csv(self, path: str) -> int:
+        """Load landmarks from a CSV with name, lat, lon and aliases columns.
+
+        Args:
+            path: Path of the CSV file; aliases are separated by '|'
+
+        Returns:
+            int: Number of rows loaded
+        """
+        count = 0
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                aliases = [a for a in (row.get('aliases') or '').split('|') if a]
+                self.add(Place(row['name'], float(row['lat']), float(row['lon']), 'place'), aliases)
+                count += 1
+        return count
+
+    def load_gtfs_stops(self, source: Iterable[str]) -> int:
+        """Load stops from the lines of a GTFS stops.txt.
+
+        Stop points sharing a name are merged into one entry at their mean
+        position, unless the feed defines a parent station for them.
+
+        Args:
+            source: Lines of stops.txt (an open file or decoded zip member)
+
+        Returns:
+            int: Number of distinct stop names loaded
+        """
+        groups: Dict[str, List[Tuple[float, float]]] = defaultdict(list)
+        stations: Dict[str, Tuple[float, float]] = {}
+        for row in csv.DictReader(source):
+            name = row['stop_name'].strip()
+            point = (float(row['stop_lat']), float(row['stop_lon']))
+            if row.get('location_type') == '1':
+                stations[name] = point
+            else:
+                groups[name].append(point)
+
+        for name, points in groups.items():
+            if name in stations:
+                lat, lon = stations[name]
+            else:
+                lat = sum(p[0] for p in points) / len(points)
+                lon = sum(p[1] for p in points) / len(points)
+            self.add(Place(name, lat, lon, 'stop'))
+        return len(groups)
+
+    def lookup(self, query: str, kind: Optional[str] = None, fuzzy: bool = True) -> Optional[Place]:
+        """Return the place best matching a free-text query.
+
+        Args:
+            query: The user's input
+            kind: 'stop' or 'place' to only match that kind
+            fuzzy: Whether to fall back to the most similar name; off for
+                street addresses, which often resemble a landmark's name
+                ("rue Saint-Jean" and "Gare Saint-Jean")
+
+        Returns:
+            Optional[Place]: The exact match, the first loaded if several
+            kinds share the name, or the most similar name above
+            ``min_similarity``, or None
+        """
+        key = fold(query)
+        if not key:
+            return None
+        for place_id in self._exact.get(key, ()):
+            if kind is None or self.places[place_id].kind == kind:
+                return self.places[place_id]
+        if not fuzzy:
+            return None
+        matches = self._fuzzy(key, 1, self.min_similarity, kind)
+        if matches:
+            return self.places[matches[0][1]]
+        return None
+
+    def search(self, query: str, limit: int = 10) -> List[Place]:
+        """Return places whose name starts with, or resembles, the query.
+
+        Args:
+            query: The user's (possibly partial) input
+            limit: Maximum number of results
+
+        Returns:
+            List[Place]: Prefix matches first, then fuzzy matches
+        """
+        key = fold(query)
+        if not key:
+            return []
+        seen: Set[int] = set()
+        results: List[Place] = []
+        for place_id in self._prefix(key, limit):
+            if place_id not in seen:
+                seen.add(place_id)
+                results.append(self.places[place_id])
+        if len(results) < limit:
+            for score, place_id in self._fuzzy(key, limit, SEARCH_SIMILARITY):
+                if len(results) >= limit:
+                    break
+                if place_id not in seen:
+                    seen.add(place_id)
+                    results.append(self.places[place_id])
+        return results
+
+    def _prefix(self, key: str, limit: int) -> List[int]:
+        if not self._sorted:
+            self._keys.sort()
+            self._sorted = True
+        ids = []
+        i = bisect_left(self._keys, (key, -1))
+        while i < len(self._keys) and len(ids) < limit and self._keys[i][0].startswith(key):
+            ids.append(self._keys[i][1])
+            i += 1
+        return ids
+
+    def _fuzzy(self, key: str, limit: int, threshold: float, kind: Optional[str] = None) -> List[Tuple[float, int]]:
+        grams = trigrams(key)
+        present = sorted((g for g in grams if g in self._trigrams), key=lambda g: len(self._trigrams[g]))
+        # A key with Jaccard similarity >= threshold shares at least `needed`
+        # trigrams with the query, so it must contain one of the rarest
+        # len(present) - needed + 1 of them: only those posting lists are read.
+        needed = max(1, math.ceil(threshold * len(grams)))
+        if len(present) < needed:
+            return []
+        candidates = set(chain.from_iterable(self._trigrams[g] for g in present[:len(present) - needed + 1]))
+        best: Dict[int, float] = {}
+        for key_id in candidates:
+            other = self._key_grams[key_id]
+            common = len(grams & other)
+            score = common / (len(grams) + len(other) - common)
+            place_id = self._key_ids[key_id]
+            if kind is not None and self.places[place_id].kind != kind:
+                continue
+            if score >= threshold and score > best.get(place_id, 0.0):
+                best[place_id] = score
+        return heapq.nlargest(limit, ((score, place_id) for place_id, score in best.items()))
+
+
+def load_gazetteer(places_path: Optional[str], stops_path: Optional[str]) -> Gazetteer:
+    """Build a gazetteer from the bundled landmarks and an optional stop list.
+
+    Args:
+        places_path: Path of the landmarks CSV, skipped if missing
+        stops_path: Path of a GTFS stops.txt or GTFS zip, skipped if missing
+
+    Returns:
+        Gazetteer: The loaded gazetteer
+    """
+    gazetteer = Gazetteer()
+    if places_path and os.path.exists(places_path):
+        gazetteer.load_places_csv(places_path)
+    if stops_path and os.path.exists(stops_path):
+        if stops_path.endswith('.zip'):
+            with zipfile.ZipFile(stops_path) as archive, archive.open('stops.txt') as f:
+                gazetteer.load_gtfs_stops(io.TextIOWrapper(f, encoding='utf-8-sig'))
+        else:
+            with open(stops_path, newline='', encoding='utf-8-sig') as f:
+                gazetteer.load_gtfs_stops(f)
+    logger.info(f"Gazetteer loaded with {len(gazetteer)} places")
+    return gazetteer
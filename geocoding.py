@@ -0,0 +1,251 @@
+# Standard library imports
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+# Third-party imports
+import aiohttp
+from geopy.adapters import AioHTTPAdapter
+from geopy.extra.rate_limiter import AsyncRateLimiter
+from geopy.geocoders import Nominatim
+
+# Local imports
+from cache import TTLCache
+from textutils import fold
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class SharedSessionAdapter(AioHTTPAdapter):
+    """geopy adapter that sends requests through an existing aiohttp session."""
+
+    def __init__(self, *, proxies, ssl_context, session_provider: Callable[[], aiohttp.ClientSession]) -> None:
+        super().__init__(proxies=proxies, ssl_context=ssl_context)
+        self._session_provider = session_provider
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session_provider()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        # The session belongs to the application, not to the geocoder
+        pass
+
+
+class AddressStore:
+    """Persistent SQLite tables of geocoded addresses and of addresses not found."""
+
+    def __init__(self, path: str) -> None:
+        """Open (and create if needed) the address table.
+
+        Args:
+            path: Path of the SQLite file
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocoded_addresses ("
+                "query TEXT PRIMARY KEY, "
+                "latitude REAL NOT NULL, "
+                "longitude REAL NOT NULL, "
+                "name TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocoding_not_found ("
+                "query TEXT PRIMARY KEY, "
+                "expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a stored location.
+
+        Args:
+            query: The normalized address
+
+        Returns:
+            Optional[Dict[str, Any]]: The location if stored, None otherwise
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT latitude, longitude, name FROM geocoded_addresses WHERE query = ?",
+                (query,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'lat': row[0], 'lon': row[1], 'name': row[2]}
+
+    def put(self, query: str, location: Dict[str, Any]) -> None:
+        """Store a location.
+
+        Args:
+            query: The normalized address
+            location: The location to store
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocoded_addresses VALUES (?, ?, ?, ?, ?)",
+                (query, location['lat'], location['lon'], location['name'], time.time())
+            )
+            self._conn.commit()
+
+    def is_not_found(self, query: str) -> bool:
+        """Return whether an address was recently not found.
+
+        Args:
+            query: The normalized address
+
+        Returns:
+            bool: True until the entry expires
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM geocoding_not_found WHERE query = ? AND expires_at > ?",
+                (query, time.time())
+            ).fetchone()
+        return row is not None
+
+    def put_not_found(self, query: str, ttl: float) -> None:
+        """Record that an address was not found, dropping expired entries.
+
+        Args:
+            query: The normalized address
+            ttl: Seconds before the address may be looked up again
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM geocoding_not_found WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocoding_not_found VALUES (?, ?)",
+                (query, now + ttl)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class Geocoder:
+    """Non-blocking Nominatim geocoder with a two-level address cache.
+
+    Lookups are normalized with :func:`textutils.fold` and answered from an
+    in-memory LRU, then from the persistent SQLite store, and only then from
+    Nominatim. Remote calls go through the application's shared aiohttp
+    session and are spaced by an async limiter to respect Nominatim's usage
+    policy without blocking the event loop. Concurrent lookups of the same
+    address share one remote request. Addresses Nominatim does not find
+    are remembered for ``not_found_ttl`` seconds, in memory and in the
+    store, so repeated typos do not use up the rate limit.
+    """
+
+    def __init__(
+        self,
+        session_provider: Callable[[], aiohttp.ClientSession],
+        cache_path: str,
+        cache_size: int = 10000,
+        user_agent: str = "bordeaux_transport_bot",
+        min_delay: float = 1.0,
+        timeout: float = 10.0,
+        not_found_ttl: float = 3600.0
+    ) -> None:
+        """Configure the geocoder.
+
+        Args:
+            session_provider: Callable returning the shared aiohttp session
+            cache_path: Path of the persistent SQLite address cache
+            cache_size: Maximum number of addresses kept in memory
+            user_agent: User-Agent sent to Nominatim
+            min_delay: Minimum delay between Nominatim requests, in seconds
+            timeout: Timeout of a Nominatim request, in seconds
+            not_found_ttl: Seconds an address not found is not looked up again
+        """
+        self._nominatim = Nominatim(
+            user_agent=user_agent,
+            timeout=timeout,
+            adapter_factory=partial(SharedSessionAdapter, session_provider=session_provider)
+        )
+        self._geocode = AsyncRateLimiter(
+            self._nominatim.geocode,
+            min_delay_seconds=min_delay,
+            max_retries=0,
+            swallow_exceptions=False
+        )
+        # Addresses do not move; entries only leave memory through LRU eviction
+        self._memory = TTLCache(ttl=float('inf'), maxsize=cache_size)
+        self._not_found = TTLCache(ttl=not_found_ttl, maxsize=cache_size)
+        self.not_found_ttl = not_found_ttl
+        self._store = AddressStore(cache_path)
+        self.remote_calls = 0
+        self.not_found_hits = 0
+
+    async def geocode(self, address: str) -> Optional[Dict[str, Any]]:
+        """Geocode an address.
+
+        Args:
+            address: The address to geocode
+
+        Returns:
+            Optional[Dict[str, Any]]: A dict with 'lat', 'lon' and 'name',
+            or None if the address could not be found
+
+        Raises:
+            geopy.exc.GeopyError: If Nominatim fails
+            DeadlineExceeded: If the current deadline passed first; the
+                lookup still completes and is cached
+        """
+        query = fold(address)
+        if not query:
+            return None
+        if self._not_found.get(query):
+            self.not_found_hits += 1
+            return None
+        return await self._memory.get_or_load(query, lambda: self._load(query, address))
+
+    async def _load(self, query: str, address: str) -> Optional[Dict[str, Any]]:
+        location = await asyncio.to_thread(self._store.get, query)
+        if location is not None:
+            return location
+        if await asyncio.to_thread(self._store.is_not_found, query):
+            self.not_found_hits += 1
+            self._not_found.set(query, True)
+            return None
+
+        self.remote_calls += 1
+        result = await self._geocode(address)
+        if result is None:
+            self._not_found.set(query, True)
+            await asyncio.to_thread(self._store.put_not_found, query, self.not_found_ttl)
+            return None
+
+        location = {
+            'lat': result.latitude,
+            'lon': result.longitude,
+            'name': result.address
+        }
+        await asyncio.to_thread(self._store.put, query, location)
+        return location
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters and the number of Nominatim calls.
+
+        Returns:
+            Dict[str, Any]: Memory cache stats, remote call count and
+            addresses not found
+        """
+        stats = self._memory.stats()
+        stats['remote_calls'] = self.remote_calls
+        stats['not_found_cached'] = len(self._not_found)
+        stats['not_found_hits'] = self.not_found_hits
+        return stats
+
+    def close(self) -> None:
+        """Close the persistent address cache."""
+        self._store.close()
@@ -0,0 +1,524 @@
+# Standard library imports
+import csv
+import io
+import json
+import logging
+import os
+import zipfile
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from textutils import fold
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Bump when the cache layout changes
+CACHE_FORMAT = 1
+
+SECONDS_PER_DAY = 86400
+
+ARRAY_NAMES = (
+    'stop_lats', 'stop_lons',
+    'trip_route', 'trip_service', 'trip_headsign', 'trip_offsets',
+    'st_trip', 'st_stop', 'st_arrival', 'st_departure',
+    'by_stop', 'bs_route', 'bs_departure', 'stop_offsets',
+)
+
+
+# Transport modes of the basic GTFS route types, named as the API's 'type'
+ROUTE_MODES = {
+    0: 'tram', 1: 'metro', 2: 'train', 3: 'bus', 4: 'ferry', 5: 'cable_car',
+    6: 'gondola', 7: 'funicular', 11: 'trolleybus', 12: 'monorail'
+}
+# Extended route types, by hundreds (e.g. 900-999 are trams)
+EXTENDED_ROUTE_MODES = {
+    1: 'train', 2: 'bus', 4: 'metro', 7: 'bus', 8: 'trolleybus', 9: 'tram',
+    10: 'ferry', 12: 'ferry', 13: 'gondola', 14: 'funicular'
+}
+
+
+class ScheduledDeparture(NamedTuple):
+    """A departure from the static timetable."""
+    line: str
+    destination: str
+    time: str  # HH:MM, local service time
+    type: str  # transport mode, e.g. 'tram'
+    seconds: int  # seconds after midnight of the queried day
+
+
+def route_mode(route_type: int) -> str:
+    """Return the transport mode of a GTFS route type.
+
+    Args:
+        route_type: Basic (0-12) or extended (100-1799) route type
+
+    Returns:
+        str: The mode, e.g. 'tram'; 'bus' for unknown types
+    """
+    if route_type in ROUTE_MODES:
+        return ROUTE_MODES[route_type]
+    return EXTENDED_ROUTE_MODES.get(route_type // 100, 'bus')
+
+
+def parse_time(value: str) -> int:
+    """Convert a GTFS HH:MM:SS time (hours may exceed 23) to seconds.
+
+    Args:
+        value: The GTFS time
+
+    Returns:
+        int: Seconds after midnight of the service day
+    """
+    hours, minutes, seconds = value.strip().split(':')
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+
+def format_time(seconds: int) -> str:
+    """Format seconds after midnight as HH:MM, wrapping past midnight.
+
+    Args:
+        seconds: Seconds after midnight
+
+    Returns:
+        str: The time as HH:MM
+    """
+    minutes = (seconds // 60) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _rows(archive: zipfile.ZipFile, name: str) -> Iterator[Dict[str, str]]:
+    with archive.open(name) as f:
+        yield from csv.DictReader(io.TextIOWrapper(f, encoding='utf-8-sig', newline=''))
+
+
+class Timetable:
+    """Array-backed static GTFS timetable.
+
+    Strings are interned once into lists and referenced by integer index.
+    ``stop_times`` is stored as parallel NumPy columns in trip order
+    (``trip_offsets`` gives each trip's slice), plus a permutation sorted by
+    (stop, route, departure) with ``stop_offsets`` per stop, so "next
+    departures of route R at stop S after T" is two binary searches. All
+    arrays can be saved to and memory-mapped from a cache directory.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+        """Wrap loaded arrays and string tables.
+
+        Args:
+            arrays: Columns named as in ARRAY_NAMES
+            meta: String tables and service calendars
+        """
+        for name in ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.meta = meta
+        self.stop_ids: List[str] = meta['stop_ids']
+        self.stop_names: List[str] = meta['stop_names']
+        self.route_ids: List[str] = meta['route_ids']
+        self.route_short_names: List[str] = meta['route_short_names']
+        self.route_long_names: List[str] = meta['route_long_names']
+        self.route_types: List[int] = meta['route_types']
+        self.headsigns: List[str] = meta['headsigns']
+        self.services: List[str] = meta['services']
+        self._calendar: Dict[int, Tuple[int, int, int]] = {
+            int(k): tuple(v) for k, v in meta['calendar'].items()
+        }
+        self._exceptions: Dict[Tuple[int, int], int] = {
+            (service, day): kind for service, day, kind in meta['exceptions']
+        }
+
+        self._stops_by_name: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.stop_names):
+            self._stops_by_name.setdefault(fold(name), []).append(i)
+        self._routes_by_name: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.route_short_names):
+            self._routes_by_name.setdefault(fold(name), []).append(i)
+        self.active_services = lru_cache(maxsize=8)(self._active_services)
+
+    @property
+    def trip_count(self) -> int:
+        return len(self.trip_route)
+
+    @property
+    def stop_time_count(self) -> int:
+        return len(self.st_trip)
+
+    # ---- Name resolution ----
+
+    def find_stops(self, name: str) -> List[int]:
+        """Return the stop indices sharing a (folded) name.
+
+        Args:
+            name: Stop name, in any case or accents
+
+        Returns:
+            List[int]: Stop indices
+        """
+        return self._stops_by_name.get(fold(name), [])
+
+    def find_routes(self, name: str) -> List[int]:
+        """Return the route indices with a given short name.
+
+        Args:
+            name: Route short name (e.g. "A" or "5")
+
+        Returns:
+            List[int]: Route indices
+        """
+        return self._routes_by_name.get(fold(name), [])
+
+    def lines(self) -> List[Tuple[str, str]]:
+        """Return every line as (short name, long name), sorted naturally.
+
+        Returns:
+            List[Tuple[str, str]]: Lines
+        """
+        seen: Dict[str, str] = {}
+        for short, long in zip(self.route_short_names, self.route_long_names):
+            seen.setdefault(short, long)
+        return sorted(seen.items(), key=lambda item: (len(item[0]), item[0]))
+
+    def route_stops(self, route: int) -> List[int]:
+        """Return the stops of a route in the order of its longest trip.
+
+        Args:
+            route: Route index
+
+        Returns:
+            List[int]: Stop indices
+        """
+        trips = np.flatnonzero(self.trip_route == route)
+        if not len(trips):
+            return []
+        lengths = self.trip_offsets[trips + 1] - self.trip_offsets[trips]
+        trip = int(trips[int(np.argmax(lengths))])
+        return self.st_stop[self.trip_offsets[trip]:self.trip_offsets[trip + 1]].tolist()
+
+    def stop_lines(self, name: str) -> List[str]:
+        """Return the short names of the lines serving a stop.
+
+        Args:
+            name: Stop name, in any case or accents
+
+        Returns:
+            List[str]: Line short names
+        """
+        routes: set = set()
+        for stop in self.find_stops(name):
+            lo, hi = int(self.stop_offsets[stop]), int(self.stop_offsets[stop + 1])
+            routes.update(np.unique(self.bs_route[lo:hi]).tolist())
+        return sorted({self.route_short_names[route] for route in routes}, key=lambda name: (len(name), name))
+
+    # ---- Service calendar ----
+
+    def _active_services(self, day: date) -> np.ndarray:
+        key = int(day.strftime('%Y%m%d'))
+        weekday_bit = 1 << day.weekday()
+        active = np.zeros(len(self.services), dtype=bool)
+        for service, (mask, start, end) in self._calendar.items():
+            active[service] = bool(mask & weekday_bit) and start <= key <= end
+        for (service, exception_day), kind in self._exceptions.items():
+            if exception_day == key:
+                active[service] = kind == 1
+        return active
+
+    # ---- Queries ----
+
+    def next_departures(
+        self,
+        routes: List[int],
+        stops: List[int],
+        day: date,
+        after: int,
+        limit: int = 10
+    ) -> List[ScheduledDeparture]:
+        """Return the next departures of routes at stops.
+
+        Trips of the previous service day running past midnight are included.
+
+        Args:
+            routes: Route indices
+            stops: Stop indices
+            day: Local calendar day
+            after: Seconds after midnight of ``day``
+            limit: Maximum number of departures
+
+        Returns:
+            List[ScheduledDeparture]: Departures sorted by time
+        """
+        results: List[Tuple[int, int]] = []
+        for service_day, offset in ((day - timedelta(days=1), SECONDS_PER_DAY), (day, 0)):
+            active = self.active_services(service_day)
+            for stop in stops:
+                lo, hi = int(self.stop_offsets[stop]), int(self.stop_offsets[stop + 1])
+                for route in routes:
+                    r_lo = lo + int(np.searchsorted(self.bs_route[lo:hi], route, 'left'))
+                    r_hi = lo + int(np.searchsorted(self.bs_route[lo:hi], route, 'right'))
+                    start = r_lo + int(np.searchsorted(self.bs_departure[r_lo:r_hi], after + offset, 'left'))
+                    results.extend(self._collect(start, r_hi, active, offset, limit))
+        results.sort()
+        return [self._departure(seconds, index) for seconds, index in results[:limit]]
+
+    def _collect(self, start: int, end: int, active: np.ndarray, offset: int, limit: int) -> List[Tuple[int, int]]:
+        # Scan forward in windows until `limit` departures run on active services
+        found: List[Tuple[int, int]] = []
+        window = max(limit * 4, 32)
+        while start < end and len(found) < limit:
+            stop_times = self.by_stop[start:min(end, start + window)]
+            trips = self.st_trip[stop_times]
+            keep = active[self.trip_service[trips]]
+            for index in stop_times[keep][:limit - len(found)].tolist():
+                found.append((int(self.st_departure[index]) - offset, index))
+            start += window
+        return found
+
+    def _departure(self, seconds: int, index: int) -> ScheduledDeparture:
+        trip = int(self.st_trip[index])
+        route = int(self.trip_route[trip])
+        return ScheduledDeparture(
+            self.route_short_names[route],
+            self.headsigns[int(self.trip_headsign[trip])],
+            format_time(seconds),
+            route_mode(self.route_types[route]),
+            seconds
+        )
+
+    # ---- Persistence ----
+
+    def save(self, directory: str) -> None:
+        """Write the timetable as .npy columns plus a JSON string table.
+
+        Args:
+            directory: Target directory, created if needed
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str) -> 'Timetable':
+        """Memory-map a timetable saved with :meth:`save`.
+
+        Args:
+            directory: Cache directory
+
+        Returns:
+            Timetable: The timetable, backed by read-only mapped arrays
+        """
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+            for name in ARRAY_NAMES
+        }
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_gtfs(cls, path: str) -> 'Timetable':
+        """Parse a GTFS zip.
+
+        Args:
+            path: Path of the GTFS zip
+
+        Returns:
+            Timetable: The parsed timetable
+        """
+        with zipfile.ZipFile(path) as archive:
+            names = set(archive.namelist())
+
+            stop_index: Dict[str, int] = {}
+            stop_ids: List[str] = []
+            stop_names: List[str] = []
+            lats: List[float] = []
+            lons: List[float] = []
+            for row in _rows(archive, 'stops.txt'):
+                stop_index[row['stop_id']] = len(stop_ids)
+                stop_ids.append(row['stop_id'])
+                stop_names.append(row['stop_name'].strip())
+                lats.append(float(row['stop_lat']))
+                lons.append(float(row['stop_lon']))
+
+            route_index: Dict[str, int] = {}
+            route_ids: List[str] = []
+            short_names: List[str] = []
+            long_names: List[str] = []
+            route_types: List[int] = []
+            for row in _rows(archive, 'routes.txt'):
+                route_index[row['route_id']] = len(route_ids)
+                route_ids.append(row['route_id'])
+                short_names.append(row.get('route_short_name') or row['route_id'])
+                long_names.append(row.get('route_long_name') or '')
+                route_types.append(int(row.get('route_type') or 3))
+
+            service_index: Dict[str, int] = {}
+            headsign_index: Dict[str, int] = {}
+            trip_index: Dict[str, int] = {}
+            trip_route: List[int] = []
+            trip_service: List[int] = []
+            trip_headsign: List[int] = []
+            for row in _rows(archive, 'trips.txt'):
+                trip_index[row['trip_id']] = len(trip_route)
+                trip_route.append(route_index[row['route_id']])
+                trip_service.append(service_index.setdefault(row['service_id'], len(service_index)))
+                headsign = (row.get('trip_headsign') or '').strip()
+                trip_headsign.append(headsign_index.setdefault(headsign, len(headsign_index)))
+
+            calendar: Dict[int, List[int]] = {}
+            if 'calendar.txt' in names:
+                days = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+                for row in _rows(archive, 'calendar.txt'):
+                    service = service_index.setdefault(row['service_id'], len(service_index))
+                    mask = sum(1 << i for i, d in enumerate(days) if row[d] == '1')
+                    calendar[service] = [mask, int(row['start_date']), int(row['end_date'])]
+            exceptions: List[List[int]] = []
+            if 'calendar_dates.txt' in names:
+                for row in _rows(archive, 'calendar_dates.txt'):
+                    service = service_index.setdefault(row['service_id'], len(service_index))
+                    exceptions.append([service, int(row['date']), int(row['exception_type'])])
+
+            st_trip: List[int] = []
+            st_seq: List[int] = []
+            st_stop: List[int] = []
+            st_arrival: List[int] = []
+            st_departure: List[int] = []
+            for row in _rows(archive, 'stop_times.txt'):
+                departure = row['departure_time'] or row['arrival_time']
+                arrival = row['arrival_time'] or departure
+                if not departure:
+                    continue  # untimed stop
+                st_trip.append(trip_index[row['trip_id']])
+                st_seq.append(int(row['stop_sequence']))
+                st_stop.append(stop_index[row['stop_id']])
+                st_arrival.append(parse_time(arrival))
+                st_departure.append(parse_time(departure))
+
+        return cls.build(
+            {
+                'stop_lats': np.array(lats, dtype=np.float64),
+                'stop_lons': np.array(lons, dtype=np.float64),
+                'trip_route': np.array(trip_route, dtype=np.int32),
+                'trip_service': np.array(trip_service, dtype=np.int32),
+                'trip_headsign': np.array(trip_headsign, dtype=np.int32),
+            },
+            np.array(st_trip, dtype=np.int32),
+            np.array(st_seq, dtype=np.int32),
+            np.array(st_stop, dtype=np.int32),
+            np.array(st_arrival, dtype=np.int32),
+            np.array(st_departure, dtype=np.int32),
+            {
+                'format': CACHE_FORMAT,
+                'stop_ids': stop_ids,
+                'stop_names': stop_names,
+                'route_ids': route_ids,
+                'route_short_names': short_names,
+                'route_long_names': long_names,
+                'route_types': route_types,
+                'headsigns': list(headsign_index),
+                'services': list(service_index),
+                'calendar': calendar,
+                'exceptions': exceptions,
+            }
+        )
+
+    @classmethod
+    def build(
+        cls,
+        arrays: Dict[str, np.ndarray],
+        st_trip: np.ndarray,
+        st_seq: np.ndarray,
+        st_stop: np.ndarray,
+        st_arrival: np.ndarray,
+        st_departure: np.ndarray,
+        meta: Dict[str, Any]
+    ) -> 'Timetable':
+        """Sort raw stop_times columns and build the offset indexes.
+
+        Args:
+            arrays: Stop and trip columns
+            st_trip: Trip index of each stop time
+            st_seq: Stop sequence of each stop time
+            st_stop: Stop index of each stop time
+            st_arrival: Arrival, in seconds after midnight
+            st_departure: Departure, in seconds after midnight
+            meta: String tables and service calendars
+
+        Returns:
+            Timetable: The indexed timetable
+        """
+        trip_count = len(arrays['trip_route'])
+        stop_count = len(arrays['stop_lats'])
+
+        order = np.lexsort((st_seq, st_trip))
+        st_trip, st_stop = st_trip[order], st_stop[order]
+        st_arrival, st_departure = st_arrival[order], st_departure[order]
+        trip_offsets = np.zeros(trip_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(st_trip, minlength=trip_count), out=trip_offsets[1:])
+
+        st_route = arrays['trip_route'][st_trip]
+        by_stop = np.lexsort((st_departure, st_route, st_stop)).astype(np.int32)
+        stop_offsets = np.zeros(stop_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(st_stop, minlength=stop_count), out=stop_offsets[1:])
+
+        arrays = dict(arrays)
+        arrays.update({
+            'trip_offsets': trip_offsets,
+            'st_trip': st_trip,
+            'st_stop': st_stop,
+            'st_arrival': st_arrival,
+            'st_departure': st_departure,
+            'by_stop': by_stop,
+            'bs_route': st_route[by_stop],
+            'bs_departure': st_departure[by_stop],
+            'stop_offsets': stop_offsets,
+        })
+        return cls(arrays, meta)
+
+
+def cache_directory(gtfs_path: str, cache_root: str) -> str:
+    """Return the cache directory for a GTFS zip's current contents.
+
+    Args:
+        gtfs_path: Path of the GTFS zip
+        cache_root: Directory holding compiled timetables
+
+    Returns:
+        str: Directory named after the zip's size, mtime and cache format
+    """
+    stat = os.stat(gtfs_path)
+    return os.path.join(cache_root, f"timetable-v{CACHE_FORMAT}-{stat.st_size}-{int(stat.st_mtime)}")
+
+
+def load_timetable(gtfs_path: str, cache_root: str) -> Optional[Timetable]:
+    """Load the timetable, memory-mapping the compiled cache when present.
+
+    The GTFS zip is only parsed when no cache matches it; the result is then
+    compiled into ``cache_root`` for the next start.
+
+    Args:
+        gtfs_path: Path of the GTFS zip
+        cache_root: Directory holding compiled timetables
+
+    Returns:
+        Optional[Timetable]: The timetable, or None if there is no GTFS zip
+    """
+    if not gtfs_path or not os.path.exists(gtfs_path):
+        return None
+    directory = cache_directory(gtfs_path, cache_root)
+    if os.path.exists(os.path.join(directory, 'meta.json')):
+        timetable = Timetable.load(directory)
+        logger.info(f"Timetable mapped from {directory}")
+        return timetable
+    timetable = Timetable.from_gtfs(gtfs_path)
+    try:
+        timetable.save(directory)
+    except OSError as e:
+        logger.error(f"Could not write timetable cache: {str(e)}")
+    logger.info(f"Timetable compiled: {timetable.trip_count} trips, {timetable.stop_time_count} stop times")
+    return timetable
@@ -0,0 +1,141 @@
+# Standard library imports
+import logging
+from typing import Optional, Dict, Any
+
+# Third-party imports
+import aiohttp
+from aiohttp import ClientTimeout, TCPConnector
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class HTTPPool:
+    """Application-scoped aiohttp session with a bounded connection pool.
+
+    One session is opened when the bot starts and shared by every upstream
+    call, so TCP and TLS connections are kept alive and reused instead of
+    being renegotiated for each request.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 20,
+        dns_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 10.0,
+        user_agent: str = "bordeaux_transport_bot"
+    ) -> None:
+        """Configure the pool.
+
+        Args:
+            limit: Maximum number of simultaneous connections
+            limit_per_host: Maximum number of simultaneous connections per host
+            dns_ttl: Seconds a resolved address stays in the DNS cache
+            keepalive_timeout: Seconds an idle connection is kept open
+            timeout: Default total timeout for a request, in seconds
+            user_agent: User-Agent header sent with every request
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[TCPConnector] = None
+        self.requests = 0
+
+    async def open(self) -> aiohttp.ClientSession:
+        """Open the shared session if it is not already open.
+
+        Returns:
+            aiohttp.ClientSession: The shared session
+        """
+        if self._session is None or self._session.closed:
+            self._connector = TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True
+            )
+            # Requests are counted as they are sent, whoever sends them
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_request_start.append(self._on_request_start)
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                timeout=ClientTimeout(total=self.timeout),
+                headers={'User-Agent': self.user_agent},
+                trace_configs=[trace_config]
+            )
+            logger.info(
+                f"HTTP pool opened (limit={self.limit}, per_host={self.limit_per_host}, "
+                f"dns_ttl={self.dns_ttl}s, keepalive={self.keepalive_timeout}s)"
+            )
+        return self._session
+
+    async def _on_request_start(self, session: aiohttp.ClientSession, context: Any, params: Any) -> None:
+        self.requests += 1
+
+    async def close(self) -> None:
+        """Close the shared session and release all pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info(f"HTTP pool closed after {self.requests} requests")
+        self._session = None
+        self._connector = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the shared session.
+
+        Raises:
+            RuntimeError: If the pool has not been opened
+        """
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTP pool is not open")
+        return self._session
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool configuration and current usage.
+
+        Returns:
+            Dict[str, Any]: Limits, connections in use, idle connections and
+            the number of requests sent
+        """
+        in_use = 0
+        idle = 0
+        if self._connector is not None:
+            # aiohttp does not expose these counters publicly
+            in_use = len(getattr(self._connector, '_acquired', ()))
+            idle = sum(len(conns) for conns in getattr(self._connector, '_conns', {}).values())
+        return {
+            'open': self._session is not None and not self._session.closed,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'dns_ttl': self.dns_ttl,
+            'keepalive_timeout': self.keepalive_timeout,
+            'in_use': in_use,
+            'idle': idle,
+            'requests': self.requests
+        }
+
+
+async def discard(response: aiohttp.ClientResponse) -> None:
+    """Stop reading a response before the end of its body.
+
+    A body still arriving is dropped with its connection. A body already
+    received has handed its connection back to the pool, possibly with
+    reading paused until the buffered rest is consumed; the rest is read
+    and dropped so the next request on that connection does not hang.
+
+    Args:
+        response: A response whose body was partly read
+    """
+    if response.connection is not None:
+        response.close()
+        return
+    async for _ in response.content.iter_chunked(64 * 1024):
+        pass
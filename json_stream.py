@@ -0,0 +1,155 @@
+# Standard library imports
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, List, Tuple
+
+# The C scanner behind json.loads, decoding one value at an offset
+_scan_once = json.JSONDecoder().scan_once
+_skip_whitespace = re.compile(r'[ \t\n\r]*').match
+_DELIMITERS = ' \t\n\r,:]}'
+
+
+class _Reader:
+    """Text buffer over a stream of UTF-8 chunks, holding one value at a time."""
+
+    def __init__(self, chunks: AsyncIterable[bytes]) -> None:
+        self._chunks = chunks.__aiter__()
+        self._decode = codecs.getincrementaldecoder('utf-8')().decode
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    async def _fill(self) -> None:
+        try:
+            text = self._decode(await self._chunks.__anext__())
+        except StopAsyncIteration:
+            self.eof = True
+            text = self._decode(b'', final=True)
+        # Drop what was parsed, so the buffer stays the size of one value
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    async def peek(self) -> str:
+        """Skip whitespace and return the next character, '' at the end."""
+        while True:
+            self.pos = _skip_whitespace(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ''
+            await self._fill()
+
+    async def expect(self, char: str) -> None:
+        if await self.peek() != char:
+            raise self.error(f"Expecting {char!r}")
+        self.pos += 1
+
+    async def next_item(self, close: str) -> bool:
+        """Consume a ',' or the closing character; True if there is another item."""
+        char = await self.peek()
+        if char == ',':
+            self.pos += 1
+            return True
+        if char == close:
+            self.pos += 1
+            return False
+        raise self.error(f"Expecting ',' or {close!r}")
+
+    def buffered_items(self, close: str) -> Tuple[List[Any], bool]:
+        """Decode the array items already buffered, without awaiting.
+
+        Returns:
+            Tuple[List[Any], bool]: The items, and whether the closing
+            character was consumed
+        """
+        buffer = self.buffer
+        pos = self.pos
+        items = []
+        while True:
+            try:
+                value, end = _scan_once(buffer, _skip_whitespace(buffer, pos).end())
+            except (StopIteration, json.JSONDecodeError):
+                break  # incomplete or invalid: left to value()
+            end = _skip_whitespace(buffer, end).end()
+            if end >= len(buffer):
+                break
+            char = buffer[end]
+            if char == ',':
+                items.append(value)
+                pos = end + 1
+            elif char == close:
+                items.append(value)
+                self.pos = end + 1
+                return items, True
+            else:
+                break
+        self.pos = pos
+        return items, False
+
+    async def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        await self.peek()
+        while True:
+            try:
+                value, end = _scan_once(self.buffer, self.pos)
+                # A number is only complete once the character after it arrived
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in _DELIMITERS):
+                    self.pos = end
+                    return value
+            except StopIteration:
+                if self.eof:
+                    raise self.error("Expecting value") from None
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            await self._fill()
+
+
+async def iter_array(chunks: AsyncIterable[bytes], key: str) -> AsyncIterator[Any]:
+    """Yield the items of an array in a JSON object as its bytes arrive.
+
+    Only the item being decoded is held in memory, so a response with many
+    records can be read one record at a time, and reading can stop after
+    the records needed. Items are decoded by the standard library's C
+    scanner, as with json.loads.
+
+    Args:
+        chunks: The UTF-8 body of a JSON object, in chunks of any size
+        key: Top-level member holding the array, e.g. 'results'
+
+    Yields:
+        Any: The array's items, decoded; nothing if the member is missing
+
+    Raises:
+        json.JSONDecodeError: If the body is not valid JSON
+    """
+    reader = _Reader(chunks)
+    await reader.expect('{')
+    if await reader.peek() == '}':
+        return
+    while True:
+        name = await reader.value()
+        if not isinstance(name, str):
+            raise reader.error("Expecting property name")
+        await reader.expect(':')
+        if name == key:
+            await reader.expect('[')
+            if await reader.peek() == ']':
+                return
+            while True:
+                items, closed = reader.buffered_items(']')
+                for item in items:
+                    yield item
+                if closed:
+                    return
+                # The next item is not complete yet
+                yield await reader.value()
+                if not await reader.next_item(']'):
+                    return
+        await reader.value()  # another member, skipped
+        if not await reader.next_item('}'):
+            return
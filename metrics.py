@@ -0,0 +1,220 @@
+# Standard library imports
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+# Third-party imports
+from aiohttp import web
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+F = TypeVar('F', bound=Callable[..., Awaitable[Any]])
+
+# Seconds; handlers answer in milliseconds, Nominatim takes about a second
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Metrics:
+    """Prometheus metrics for handlers, upstream calls and bot components.
+
+    Records a latency histogram and an error counter per handler, a latency
+    histogram per upstream service and status, retry and rate-limit
+    rejection counters, and exports the ``stats()`` of registered components
+    as gauges. When disabled, the decorators return the function unchanged
+    and the recording methods return at once, so instrumentation costs
+    nothing; prometheus_client is only imported when enabled.
+    """
+
+    def __init__(self, enabled: bool = False, namespace: str = 'bordeaux_bot') -> None:
+        """Configure the metrics.
+
+        Args:
+            enabled: Whether to record anything
+            namespace: Prefix of every metric name
+        """
+        self.enabled = enabled
+        self.namespace = namespace
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        if not enabled:
+            return
+
+        # Imported here so that prometheus_client is only needed when enabled
+        import prometheus_client
+        from prometheus_client.core import GaugeMetricFamily
+
+        self._prometheus = prometheus_client
+        self._gauge_family = GaugeMetricFamily
+        self.registry = prometheus_client.CollectorRegistry()
+        self._handler_seconds = prometheus_client.Histogram(
+            'handler_seconds', 'Command handler latency', ['handler'],
+            namespace=namespace, registry=self.registry, buckets=LATENCY_BUCKETS
+        )
+        self._handler_errors = prometheus_client.Counter(
+            'handler_errors', 'Exceptions escaping command handlers', ['handler'],
+            namespace=namespace, registry=self.registry
+        )
+        self._upstream_seconds = prometheus_client.Histogram(
+            'upstream_seconds', 'Upstream call latency', ['service', 'status'],
+            namespace=namespace, registry=self.registry, buckets=LATENCY_BUCKETS
+        )
+        self._upstream_retries = prometheus_client.Counter(
+            'upstream_retries', 'Upstream calls retried', ['service'],
+            namespace=namespace, registry=self.registry
+        )
+        self._rejections = prometheus_client.Counter(
+            'rate_limit_rejections', 'Requests refused by a rate limit', ['limiter'],
+            namespace=namespace, registry=self.registry
+        )
+        self.registry.register(self)
+
+    def handler(self, name: Optional[str] = None) -> Callable[[F], F]:
+        """Decorate a command handler to record its latency and errors.
+
+        Args:
+            name: Handler label, the function name by default
+
+        Returns:
+            Callable[[F], F]: The decorator
+        """
+        def decorate(func: F) -> F:
+            if not self.enabled:
+                return func
+            label = name or func.__name__
+            latency = self._handler_seconds.labels(label)
+            errors = self._handler_errors.labels(label)
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    latency.observe(time.perf_counter() - start)
+            return wrapper  # type: ignore[return-value]
+        return decorate
+
+    def timed(self, service: str) -> Callable[[F], F]:
+        """Decorate an upstream call to record its latency.
+
+        Calls are labelled status "ok", or "error" if they raise.
+
+        Args:
+            service: Upstream service label
+
+        Returns:
+            Callable[[F], F]: The decorator
+        """
+        def decorate(func: F) -> F:
+            if not self.enabled:
+                return func
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter()
+                status = 'error'
+                try:
+                    result = await func(*args, **kwargs)
+                    status = 'ok'
+                    return result
+                finally:
+                    self._upstream_seconds.labels(service, status).observe(time.perf_counter() - start)
+            return wrapper  # type: ignore[return-value]
+        return decorate
+
+    def upstream(self, service: str, status: Any, seconds: float) -> None:
+        """Record one upstream call.
+
+        Args:
+            service: Upstream service label
+            status: HTTP status code, or a short error label
+            seconds: Call duration
+        """
+        if self.enabled:
+            self._upstream_seconds.labels(service, str(status)).observe(seconds)
+
+    def retry(self, service: str) -> None:
+        """Count a retried upstream call.
+
+        Args:
+            service: Upstream service label
+        """
+        if self.enabled:
+            self._upstream_retries.labels(service).inc()
+
+    def rejected(self, limiter: str) -> None:
+        """Count a request refused by a rate limit.
+
+        Args:
+            limiter: Rate limiter label
+        """
+        if self.enabled:
+            self._rejections.labels(limiter).inc()
+
+    def register(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """Export a component's counters as gauges named ``<namespace>_<name>_<key>``.
+
+        Args:
+            name: Component name
+            stats: Returns the component's counters; non-numeric values are skipped
+        """
+        self._sources[name] = stats
+
+    def describe(self) -> Iterator[Any]:
+        # Component counters are only known when collected
+        return iter(())
+
+    def collect(self) -> Iterator[Any]:
+        """Yield the registered components' counters (prometheus_client collector)."""
+        for name, stats in list(self._sources.items()):
+            try:
+                values = stats()
+            except Exception as e:
+                logger.error(f"Failed to collect {name} stats: {str(e)}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)):
+                    yield self._gauge_family(
+                        f"{self.namespace}_{name}_{key}",
+                        f"{name} {key.replace('_', ' ')}",
+                        value=float(value)
+                    )
+
+    def render(self) -> bytes:
+        """Return every metric in the Prometheus text format.
+
+        Returns:
+            bytes: The exposition, empty when disabled
+        """
+        if not self.enabled:
+            return b''
+        return self._prometheus.generate_latest(self.registry)
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.render(), headers={'Content-Type': self._prometheus.CONTENT_TYPE_LATEST})
+
+    async def start(self, host: str = '0.0.0.0', port: int = 9100) -> None:
+        """Serve ``GET /metrics`` if enabled.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind
+        """
+        if not self.enabled or self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Metrics served on {host}:{port}/metrics")
+
+    async def stop(self) -> None:
+        """Stop serving metrics."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,70 @@
+-- Move the latest location of each user into a one-row-per-user table.
+--
+-- user_locations was append-only and read with
+-- ORDER BY created_at DESC LIMIT 1, which slows down as history grows.
+-- The bot now upserts user_current_locations and, optionally, keeps
+-- appending history to user_locations.
+
+BEGIN;
+
+-- Create user_current_locations table (one row per user, upserted on change)
+CREATE TABLE IF NOT EXISTS user_current_locations (
+    user_id BIGINT PRIMARY KEY,
+    latitude DOUBLE PRECISION NOT NULL,
+    longitude DOUBLE PRECISION NOT NULL,
+    name TEXT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL
+);
+
+-- Row Level Security, as on the other user tables
+ALTER TABLE user_current_locations ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_locations ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can read their own current location" ON user_current_locations;
+CREATE POLICY "Users can read their own current location" ON user_current_locations
+    FOR SELECT USING (user_id::text = auth.uid()::text);
+
+DROP POLICY IF EXISTS "Users can manage their own current location" ON user_current_locations;
+CREATE POLICY "Users can manage their own current location" ON user_current_locations
+    FOR ALL USING (user_id::text = auth.uid()::text);
+
+DROP POLICY IF EXISTS "Users can read their own location history" ON user_locations;
+CREATE POLICY "Users can read their own location history" ON user_locations
+    FOR SELECT USING (user_id::text = auth.uid()::text);
+
+DROP POLICY IF EXISTS "Users can manage their own location history" ON user_locations;
+CREATE POLICY "Users can manage their own location history" ON user_locations
+    FOR ALL USING (user_id::text = auth.uid()::text);
+
+-- Backfill from the newest history row of each user
+INSERT INTO user_current_locations (user_id, latitude, longitude, name, updated_at)
+SELECT DISTINCT ON (user_id) user_id, latitude, longitude, name, created_at
+FROM user_locations
+ORDER BY user_id, created_at DESC
+ON CONFLICT (user_id) DO NOTHING;
+
+-- Index history for per-user, newest-first reads
+CREATE INDEX IF NOT EXISTS idx_user_locations_user_id_created_at ON user_locations(user_id, created_at DESC);
+
+-- Read the current location in get_user_profile
+CREATE OR REPLACE FUNCTION get_user_profile(p_user_id BIGINT)
+RETURNS JSON
+LANGUAGE sql STABLE
+AS $$
+    SELECT json_build_object(
+        'location', (
+            SELECT json_build_object('latitude', latitude, 'longitude', longitude, 'name', name)
+            FROM user_current_locations
+            WHERE user_id = p_user_id
+        ),
+        'language', (
+            SELECT language FROM user_languages WHERE user_id = p_user_id
+        ),
+        'preferences', COALESCE(
+            (SELECT json_object_agg(setting, value) FROM user_preferences WHERE user_id = p_user_id),
+            '{}'::json
+        )
+    );
+$$;
+
+COMMIT;
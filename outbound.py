@@ -0,0 +1,292 @@
+# Standard library imports
+import asyncio
+import heapq
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Third-party imports
+from telegram import Bot, Message
+from telegram.error import BadRequest, ChatMigrated, Forbidden, NetworkError, RetryAfter
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# Priorities, lowest first
+INTERACTIVE = 0  # replies to a user's command
+ALERT = 1  # time-sensitive pushes (reminders, disruptions)
+BULK = 2  # broadcasts
+
+
+class QueueFull(Exception):
+    """Raised when a push is refused because the queue is at capacity."""
+    pass
+
+
+class _Outbound:
+    """One queued message."""
+
+    __slots__ = ('priority', 'seq', 'chat_id', 'text', 'kwargs', 'future', 'attempts')
+
+    def __init__(
+        self,
+        priority: int,
+        seq: int,
+        chat_id: int,
+        text: str,
+        kwargs: Dict[str, Any],
+        future: Optional[asyncio.Future]
+    ) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.text = text
+        self.kwargs = kwargs
+        self.future = future
+        self.attempts = 0
+
+    def __lt__(self, other: '_Outbound') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class OutboundDispatcher:
+    """Single outbound queue pacing every message sent by the bot.
+
+    Messages wait in a priority queue (interactive replies first, then
+    alerts, then broadcasts) and leave it at no more than ``rate`` per
+    second overall and one per ``chat_interval`` (``group_interval`` for
+    group chats) per chat; a message whose chat is cooling down is parked
+    without holding back other chats. A 429 ``RetryAfter`` pauses the whole
+    queue for the delay Telegram asks for and requeues the message; network
+    errors are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        rate: float = 30.0,
+        chat_interval: float = 1.0,
+        group_interval: float = 3.0,
+        max_queue: int = 50000,
+        max_attempts: int = 5,
+        backoff: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Configure the dispatcher.
+
+        Args:
+            rate: Messages per second, all chats together
+            chat_interval: Minimum seconds between messages to a private chat
+            group_interval: Minimum seconds between messages to a group
+            max_queue: Maximum queued alerts and broadcasts; interactive
+                replies are never refused
+            max_attempts: Attempts per message before giving up
+            backoff: First retry delay after a network error, in seconds
+            clock: Monotonic clock
+        """
+        self.interval = 1.0 / rate
+        self.chat_interval = chat_interval
+        self.group_interval = group_interval
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.clock = clock
+        self._bot: Optional[Bot] = None
+        self._queue: List[_Outbound] = []
+        self._parked: List[Tuple[float, _Outbound]] = []
+        self._chat_ready: Dict[int, float] = {}
+        self._in_flight: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._seq = 0
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+        self._pushed = 0  # queued non-interactive messages
+        self.sent = 0
+        self.failed = 0
+        self.refused = 0
+        self.retries = 0
+        self.flood_waits = 0
+
+    def start(self, bot: Bot) -> None:
+        """Start sending through a bot.
+
+        Args:
+            bot: The Telegram bot
+        """
+        self._bot = bot
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='outbound-dispatcher')
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Send what is queued for up to ``timeout`` seconds, then stop.
+
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        deadline = self.clock() + timeout
+        while (self._queue or self._parked or self._tasks) and self.clock() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in list(self._tasks):
+            task.cancel()
+        dropped = len(self._queue) + len(self._parked)
+        if dropped:
+            logger.error(f"Outbound dispatcher stopped with {dropped} unsent messages")
+
+    def _enqueue(self, chat_id: int, text: str, priority: int, kwargs: Dict[str, Any], future: Optional[asyncio.Future]) -> None:
+        self._seq += 1
+        heapq.heappush(self._queue, _Outbound(priority, self._seq, chat_id, text, kwargs, future))
+        if priority != INTERACTIVE:
+            self._pushed += 1
+        self._wakeup.set()
+
+    async def send(self, chat_id: int, text: str, priority: int = INTERACTIVE, **kwargs: Any) -> Message:
+        """Queue a message and wait until it is delivered.
+
+        Args:
+            chat_id: Target chat
+            text: Message text
+            priority: INTERACTIVE, ALERT or BULK
+            **kwargs: Further ``Bot.send_message`` arguments
+
+        Returns:
+            Message: The sent message
+
+        Raises:
+            QueueFull: If a non-interactive message is refused
+            TelegramError: If Telegram rejects the message or retries run out
+        """
+        if priority != INTERACTIVE and self._pushed >= self.max_queue:
+            self.refused += 1
+            raise QueueFull(f"outbound queue holds {self._pushed} messages")
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(chat_id, text, priority, kwargs, future)
+        return await future
+
+    def push(self, chat_id: int, text: str, priority: int = BULK, **kwargs: Any) -> bool:
+        """Queue a message without waiting; failures are only logged.
+
+        Args:
+            chat_id: Target chat
+            text: Message text
+            priority: INTERACTIVE, ALERT or BULK
+            **kwargs: Further ``Bot.send_message`` arguments
+
+        Returns:
+            bool: False if the queue is full and the message was refused
+        """
+        if priority != INTERACTIVE and self._pushed >= self.max_queue:
+            self.refused += 1
+            return False
+        self._enqueue(chat_id, text, priority, kwargs, None)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            now = self.clock()
+            while self._parked and self._parked[0][0] <= now:
+                heapq.heappush(self._queue, heapq.heappop(self._parked)[1])
+
+            delay = None
+            if self._paused_until > now:
+                delay = self._paused_until - now
+            elif not self._queue:
+                delay = self._parked[0][0] - now if self._parked else None
+            elif self._next_slot > now:
+                delay = self._next_slot - now
+            if delay is not None or not self._queue:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            message = heapq.heappop(self._queue)
+            chat_id = message.chat_id
+            ready = self._chat_ready.get(chat_id, 0.0)
+            if ready > now or chat_id in self._in_flight:
+                # Later messages to this chat keep their order behind it
+                heapq.heappush(self._parked, (max(ready, now + 0.05), message))
+                continue
+
+            self._next_slot = max(self._next_slot, now - self.interval) + self.interval
+            self._chat_ready[chat_id] = now + (self.group_interval if chat_id < 0 else self.chat_interval)
+            self._in_flight.add(chat_id)
+            task = asyncio.create_task(self._deliver(message))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            if len(self._chat_ready) > 4 * len(self._queue) + 10000:
+                self._chat_ready = {c: t for c, t in self._chat_ready.items() if t > now}
+
+    async def _deliver(self, message: _Outbound) -> None:
+        message.attempts += 1
+        try:
+            result = await self._bot.send_message(message.chat_id, message.text, **message.kwargs)
+        except RetryAfter as e:
+            self.flood_waits += 1
+            self._paused_until = max(self._paused_until, self.clock() + float(e.retry_after))
+            logger.error(f"Flood control: pausing outbound messages for {e.retry_after} s")
+            self._retry(message, e, 0.0)
+        except (BadRequest, Forbidden, ChatMigrated) as e:
+            self._fail(message, e)
+        except NetworkError as e:
+            self._retry(message, e, self.backoff * 2 ** (message.attempts - 1))
+        except Exception as e:
+            self._fail(message, e)
+        else:
+            self.sent += 1
+            self._done(message)
+            if message.future is not None and not message.future.done():
+                message.future.set_result(result)
+        finally:
+            self._in_flight.discard(message.chat_id)
+            self._wakeup.set()
+
+    def _retry(self, message: _Outbound, error: Exception, delay: float) -> None:
+        if message.attempts >= self.max_attempts:
+            self._fail(message, error)
+            return
+        self.retries += 1
+        heapq.heappush(self._parked, (self.clock() + delay, message))
+
+    def _fail(self, message: _Outbound, error: Exception) -> None:
+        self.failed += 1
+        self._done(message)
+        if message.future is not None:
+            if not message.future.done():
+                message.future.set_exception(error)
+        else:
+            logger.error(f"Failed to send message to chat {message.chat_id}: {str(error)}")
+
+    def _done(self, message: _Outbound) -> None:
+        if message.priority != INTERACTIVE:
+            self._pushed -= 1
+
+    def depth(self) -> int:
+        """Return the number of messages waiting to be sent."""
+        return len(self._queue) + len(self._parked)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and delivery counters.
+
+        Returns:
+            Dict[str, Any]: Dispatcher counters
+        """
+        return {
+            'queued': len(self._queue),
+            'parked': len(self._parked),
+            'in_flight': len(self._in_flight),
+            'paused_for': max(0.0, self._paused_until - self.clock()),
+            'sent': self.sent,
+            'failed': self.failed,
+            'refused': self.refused,
+            'retries': self.retries,
+            'flood_waits': self.flood_waits
+        }
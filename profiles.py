@@ -0,0 +1,101 @@
+# Standard library imports
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Local imports
+from cache import TTLCache
+
+
+class UserProfile:
+    """Everything the handlers need to know about a user."""
+
+    __slots__ = ('user_id', 'location', 'language', 'preferences')
+
+    def __init__(
+        self,
+        user_id: int,
+        location: Optional[Dict[str, Any]] = None,
+        language: Optional[str] = None,
+        preferences: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.user_id = user_id
+        self.location = location
+        self.language = language
+        self.preferences = preferences or {}
+
+
+class ProfileCache:
+    """Read-through cache of user profiles with TTL and LRU eviction.
+
+    A miss loads the whole profile in one round trip through ``loader``;
+    concurrent misses for the same user share that load. Writes made by the
+    bot are applied to the cached profile, so returning users are served
+    without touching the database until their entry expires. The cache is
+    per process: with several workers, writes must be applied through
+    ``update`` in each of them.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[int], Awaitable[UserProfile]],
+        ttl: float = 300.0,
+        maxsize: int = 50000
+    ) -> None:
+        """Configure the cache.
+
+        Args:
+            loader: Coroutine function loading a profile from the database
+            ttl: Seconds a profile stays cached
+            maxsize: Maximum number of cached profiles
+        """
+        self._loader = loader
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    async def get(self, user_id: int) -> UserProfile:
+        """Return a user's profile, loading it on a miss.
+
+        Args:
+            user_id: The user's ID
+
+        Returns:
+            UserProfile: The user's profile
+        """
+        return await self._cache.get_or_load(user_id, lambda: self._loader(user_id))
+
+    def peek(self, user_id: int) -> Optional[UserProfile]:
+        """Return a cached profile without loading it.
+
+        Args:
+            user_id: The user's ID
+
+        Returns:
+            Optional[UserProfile]: The cached profile, or None
+        """
+        return self._cache.get(user_id)
+
+    def update(self, user_id: int, **fields: Any) -> None:
+        """Apply a write to the cached profile, if any.
+
+        Args:
+            user_id: The user's ID
+            **fields: Profile attributes to replace
+        """
+        profile = self._cache.get(user_id)
+        if profile is not None:
+            for name, value in fields.items():
+                setattr(profile, name, value)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user's cached profile.
+
+        Args:
+            user_id: The user's ID
+        """
+        self._cache.invalidate(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters.
+
+        Returns:
+            Dict[str, Any]: Size and hit/miss counters
+        """
+        return self._cache.stats()
@@ -0,0 +1,106 @@
+# Standard library imports
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Any
+
+
+class TokenBucket:
+    """Per-key token bucket state."""
+
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Constant-time token-bucket rate limiter keyed by user (or any key).
+
+    Each key may spend up to ``capacity`` requests in a burst; tokens refill
+    continuously at ``capacity / period`` per second. Buckets are kept in
+    least-recently-used order, so keys that have been idle long enough to
+    refill completely are evicted from the front in amortized O(1).
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        period: float,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """Configure the limiter.
+
+        Args:
+            capacity: Maximum number of requests per period
+            period: Length of the period, in seconds
+            clock: Monotonic time source, overridable for tests
+        """
+        self.capacity = float(capacity)
+        self.period = period
+        self.rate = capacity / period
+        self._clock = clock
+        self._buckets: 'OrderedDict[Hashable, TokenBucket]' = OrderedDict()
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def allow(self, key: Hashable, cost: float = 1.0) -> bool:
+        """Spend tokens for key if available.
+
+        Args:
+            key: The rate-limited key (e.g. a user ID)
+            cost: Number of tokens the request costs
+
+        Returns:
+            bool: True if the request is within the limit, False otherwise
+        """
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.capacity, now)
+            self._buckets[key] = bucket
+        else:
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+
+        self._evict_idle(now)
+
+        if bucket.tokens < cost:
+            self.rejected += 1
+            return False
+        bucket.tokens -= cost
+        return True
+
+    def _evict_idle(self, now: float) -> None:
+        # The oldest bucket is at the front; once it has been idle for a full
+        # period it is indistinguishable from a fresh one and can be dropped.
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if now - bucket.updated < self.period:
+                break
+            del buckets[key]
+
+    def reset(self, key: Hashable) -> None:
+        """Forget the bucket for key.
+
+        Args:
+            key: The rate-limited key
+        """
+        self._buckets.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of tracked keys and rejected requests.
+
+        Returns:
+            Dict[str, Any]: Limiter configuration and counters
+        """
+        return {
+            'keys': len(self._buckets),
+            'capacity': int(self.capacity),
+            'period': self.period,
+            'rejected': self.rejected
+        }
@@ -0,0 +1,259 @@
+# Standard library imports
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, tzinfo
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Third-party imports
+import aiohttp
+
+# Local imports
+from textutils import fold
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+# Departures listed more than this many minutes ahead are past ones, from
+# before midnight
+UPCOMING_WINDOW = 12 * 60
+
+
+class Departure(NamedTuple):
+    """One upcoming departure; ``_asdict()`` matches TransportInfo."""
+    line: str
+    destination: str
+    time: str
+    type: str
+
+
+def minute_of_day(time_of_day: str) -> int:
+    """Return the minutes after midnight of an 'HH:MM' time.
+
+    Args:
+        time_of_day: Time as 'HH:MM' or 'HH:MM:SS'; hours past 24 wrap
+
+    Returns:
+        int: Minutes after midnight
+
+    Raises:
+        ValueError: If the time is not in that format
+    """
+    hours, minutes = time_of_day.split(':')[:2]
+    return (int(hours) * 60 + int(minutes)) % MINUTES_PER_DAY
+
+
+class DeparturesBoard:
+    """Immutable snapshot of upcoming departures, indexed by stop.
+
+    A board is built once per poll and never modified afterwards, so
+    readers can keep using a board while the poller swaps in a new one.
+    """
+
+    __slots__ = ('generated_at', '_stops')
+
+    def __init__(self, stops: Dict[str, Tuple[Departure, ...]], generated_at: float) -> None:
+        """Wrap parsed departures.
+
+        Args:
+            stops: Departures per folded stop name or stop ID, sorted by time
+            generated_at: Monotonic time at which the snapshot was fetched
+        """
+        self._stops = stops
+        self.generated_at = generated_at
+
+    def __len__(self) -> int:
+        return len(self._stops)
+
+    def __contains__(self, stop: str) -> bool:
+        return stop in self._stops or fold(stop) in self._stops
+
+    def age(self) -> float:
+        """Return the snapshot age in seconds."""
+        return time.monotonic() - self.generated_at
+
+    def departures(self, stop: str, limit: Optional[int] = None) -> Tuple[Departure, ...]:
+        """Return the next departures at a stop.
+
+        Args:
+            stop: Stop name (any case or accents) or stop ID
+            limit: Maximum number of departures
+
+        Returns:
+            Tuple[Departure, ...]: Departures sorted by time
+        """
+        departures = self._stops.get(stop) or self._stops.get(fold(stop), ())
+        return departures[:limit] if limit is not None else departures
+
+
+EMPTY_BOARD = DeparturesBoard({}, float('-inf'))
+
+
+def parse_feed(data: Dict[str, Any]) -> Dict[str, Tuple[Departure, ...]]:
+    """Parse an open-data realtime payload into per-stop departures.
+
+    The payload holds a ``records`` (Opendatasoft) or ``results`` list whose
+    items, or their ``fields``, carry ``stop_name`` (and optionally
+    ``stop_id``), ``line``, ``destination``, ``time`` ('HH:MM') and
+    ``type``. Invalid records are skipped.
+
+    Args:
+        data: The decoded JSON payload
+
+    Returns:
+        Dict[str, Tuple[Departure, ...]]: Departures per folded stop name and
+        per stop ID, sorted by time
+    """
+    stops: Dict[str, List[Departure]] = defaultdict(list)
+    for record in data.get('records') or data.get('results') or ():
+        fields = record.get('fields', record)
+        try:
+            departure = Departure(
+                str(fields['line']),
+                str(fields['destination']),
+                str(fields['time']),
+                str(fields.get('type', 'bus'))
+            )
+            minute_of_day(departure.time)
+            keys = [fold(str(fields['stop_name']))]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if fields.get('stop_id'):
+            keys.append(str(fields['stop_id']))
+        for key in keys:
+            stops[key].append(departure)
+    return {
+        key: tuple(sorted(departures, key=lambda d: minute_of_day(d.time)))
+        for key, departures in stops.items()
+    }
+
+
+class RealtimePoller:
+    """Background task polling the realtime feed into a DeparturesBoard.
+
+    Each successful poll parses the payload into a new board and swaps it in
+    with a single assignment; a failed poll keeps serving the previous board.
+    Departures are read relative to the current time, so those gone since
+    the poll are left out.
+    """
+
+    def __init__(
+        self,
+        session_provider: Callable[[], aiohttp.ClientSession],
+        url: str,
+        interval: float = 30.0,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+        tz: Optional[tzinfo] = None
+    ) -> None:
+        """Configure the poller.
+
+        Args:
+            session_provider: Callable returning the shared aiohttp session
+            url: Feed URL
+            interval: Seconds between polls
+            params: Query parameters sent with every poll
+            headers: Headers sent with every poll
+            timeout: Timeout of a poll, in seconds
+            tz: Timezone of the feed's times, local time if omitted
+        """
+        self._session_provider = session_provider
+        self.url = url
+        self.interval = interval
+        self.params = params or {}
+        self.headers = headers or {}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.tz = tz
+        self.board: DeparturesBoard = EMPTY_BOARD
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        """Start polling in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='realtime-poller')
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await self.poll()
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def poll(self) -> bool:
+        """Fetch the feed once and swap in the new board.
+
+        Returns:
+            bool: True if the board was replaced
+        """
+        self.polls += 1
+        try:
+            session = self._session_provider()
+            async with session.get(self.url, params=self.params, headers=self.headers, timeout=self.timeout) as response:
+                if response.status != 200:
+                    raise ValueError(f"feed returned status {response.status}")
+                data = await response.json(content_type=None)
+            fetched_at = time.monotonic()
+            self.board = DeparturesBoard(parse_feed(data), fetched_at)
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Realtime poll failed: {str(e)}")
+            return False
+
+    def departures(self, stops: Iterable[str], limit: int, max_age: float) -> Optional[List[Departure]]:
+        """Merge the next departures of several stops from the current board.
+
+        Args:
+            stops: Stop names or IDs
+            limit: Maximum number of departures
+            max_age: Maximum board age in seconds
+
+        Returns:
+            Optional[List[Departure]]: Upcoming departures, soonest first
+            across midnight, or None if the board is too old to be trusted
+            or has none of the stops
+        """
+        board = self.board
+        if board.age() > max_age:
+            return None
+        known = [stop for stop in stops if stop in board]
+        if not known:
+            return None
+        now = datetime.now(self.tz)
+        current = now.hour * 60 + now.minute
+        upcoming: List[Tuple[int, Departure]] = []
+        for stop in known:
+            for departure in board.departures(stop):
+                wait = (minute_of_day(departure.time) - current) % MINUTES_PER_DAY
+                if wait < UPCOMING_WINDOW:
+                    upcoming.append((wait, departure))
+        upcoming.sort(key=lambda item: item[0])
+        return [departure for _, departure in upcoming[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return board size, age and poll counters.
+
+        Returns:
+            Dict[str, Any]: Poller counters
+        """
+        return {
+            'stops': len(self.board),
+            'age': self.board.age(),
+            'polls': self.polls,
+            'failures': self.failures
+        }
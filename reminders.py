@@ -0,0 +1,262 @@
+# Standard library imports
+import asyncio
+import heapq
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Local imports
+from textutils import fold
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class Reminder(NamedTuple):
+    """A daily reminder, as stored in ``user_reminders``."""
+    user_id: int
+    line: str
+    stop: str
+    time: str  # HH:MM, local time
+
+
+def parse_time_of_day(value: str) -> Tuple[int, int]:
+    """Parse an HH:MM time of day.
+
+    Args:
+        value: The time, e.g. "07:45"
+
+    Returns:
+        Tuple[int, int]: Hours and minutes
+
+    Raises:
+        ValueError: If the value is not a valid time of day
+    """
+    hours, _, minutes = value.strip().partition(':')
+    if not (hours.isdigit() and minutes.isdigit() and len(minutes) == 2):
+        raise ValueError(f"invalid time of day: {value!r}")
+    h, m = int(hours), int(minutes)
+    if h > 23 or m > 59:
+        raise ValueError(f"invalid time of day: {value!r}")
+    return h, m
+
+
+def next_fire_time(time_of_day: str, after: float, tz: tzinfo) -> float:
+    """Return the next occurrence of a local time of day.
+
+    Args:
+        time_of_day: HH:MM, local time
+        after: Epoch seconds; the result is strictly later
+        tz: Local time zone
+
+    Returns:
+        float: Epoch seconds of the next occurrence
+    """
+    hours, minutes = parse_time_of_day(time_of_day)
+    local = datetime.fromtimestamp(after, tz)
+    candidate = local.replace(hour=hours, minute=minutes, second=0, microsecond=0)
+    if candidate.timestamp() <= after:
+        candidate = (local + timedelta(days=1)).replace(hour=hours, minute=minutes, second=0, microsecond=0)
+    return candidate.timestamp()
+
+
+class ReminderScheduler:
+    """In-memory schedule of daily reminders, fired in batches per stop.
+
+    Reminders are loaded once and kept in a min-heap keyed by their next
+    fire time; adding or removing a reminder only touches the heap (removed
+    entries are skipped lazily when they reach the top). When reminders come
+    due, those sharing a stop are handed to ``on_due`` together so the
+    departures of each stop are looked up once, then every reminder is
+    rescheduled for the next day.
+
+    The clock is injectable: with a fake clock, call :meth:`run_due`
+    directly instead of starting the background task.
+    """
+
+    def __init__(
+        self,
+        on_due: Callable[[str, List[Reminder]], Awaitable[None]],
+        tz: tzinfo,
+        clock: Callable[[], float] = time.time,
+        grace: float = 300.0
+    ) -> None:
+        """Configure the scheduler.
+
+        Args:
+            on_due: Coroutine called with a stop and its due reminders
+            tz: Time zone of the reminder times
+            clock: Returns the current epoch time in seconds
+            grace: Reminders later than this many seconds are skipped
+                (e.g. after downtime) and only rescheduled
+        """
+        self._on_due = on_due
+        self.tz = tz
+        self.clock = clock
+        self.grace = grace
+        self._heap: List[Tuple[float, Reminder]] = []
+        self._fire_at: Dict[Reminder, float] = {}
+        self._next_by_time: Dict[str, Tuple[float, float]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+        self.skipped = 0
+        self.batches = 0
+
+    def __len__(self) -> int:
+        return len(self._fire_at)
+
+    def __contains__(self, reminder: Reminder) -> bool:
+        return reminder in self._fire_at
+
+    def add(self, reminder: Reminder) -> float:
+        """Schedule a reminder, or leave it unchanged if already scheduled.
+
+        Args:
+            reminder: The reminder
+
+        Returns:
+            float: Epoch seconds of its next firing
+
+        Raises:
+            ValueError: If the reminder time is not HH:MM
+        """
+        if reminder in self._fire_at:
+            return self._fire_at[reminder]
+        now = self.clock()
+        # The next occurrence of a time of day only changes once it has passed
+        computed_at, fire_at = self._next_by_time.get(reminder.time, (0.0, 0.0))
+        if not computed_at <= now < fire_at:
+            fire_at = next_fire_time(reminder.time, now, self.tz)
+            self._next_by_time[reminder.time] = (now, fire_at)
+        self._push(reminder, fire_at)
+        return fire_at
+
+    def remove(self, reminder: Reminder) -> bool:
+        """Unschedule a reminder.
+
+        Args:
+            reminder: The reminder
+
+        Returns:
+            bool: True if it was scheduled
+        """
+        if self._fire_at.pop(reminder, None) is None:
+            return False
+        if len(self._heap) > 2 * len(self._fire_at) + 64:
+            self._compact()
+        return True
+
+    def _push(self, reminder: Reminder, fire_at: float) -> None:
+        was_first = not self._heap or fire_at < self._heap[0][0]
+        self._fire_at[reminder] = fire_at
+        heapq.heappush(self._heap, (fire_at, reminder))
+        if was_first:
+            self._wakeup.set()
+
+    def _compact(self) -> None:
+        self._heap = [(fire_at, r) for r, fire_at in self._fire_at.items()]
+        heapq.heapify(self._heap)
+
+    def next_fire(self) -> Optional[float]:
+        """Return the epoch time of the next live entry, if any."""
+        heap = self._heap
+        while heap and self._fire_at.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> Dict[str, List[Reminder]]:
+        """Take the reminders due at ``now`` and reschedule them.
+
+        Args:
+            now: Epoch seconds, the clock by default
+
+        Returns:
+            Dict[str, List[Reminder]]: Due reminders grouped by folded stop
+            name; reminders past the grace period are left out
+        """
+        now = self.clock() if now is None else now
+        heap = self._heap
+        due: Dict[str, List[Reminder]] = defaultdict(list)
+        next_day: Dict[Tuple[str, float], float] = {}
+        while heap and heap[0][0] <= now:
+            fire_at, reminder = heapq.heappop(heap)
+            if self._fire_at.get(reminder) != fire_at:
+                continue  # removed or rescheduled
+            if now - fire_at > self.grace:
+                self.skipped += 1
+            else:
+                due[fold(reminder.stop)].append(reminder)
+            # Reminders sharing a fire time share their next one too
+            key = (reminder.time, fire_at)
+            if key not in next_day:
+                next_day[key] = next_fire_time(reminder.time, max(fire_at, now), self.tz)
+            self._fire_at[reminder] = next_day[key]
+            heapq.heappush(heap, (next_day[key], reminder))
+        return due
+
+    async def run_due(self, now: Optional[float] = None) -> int:
+        """Fire the reminders due at ``now``, one ``on_due`` call per stop.
+
+        Args:
+            now: Epoch seconds, the clock by default
+
+        Returns:
+            int: Number of reminders fired
+        """
+        due = self.pop_due(now)
+        if not due:
+            return 0
+        batches = list(due.values())
+        results = await asyncio.gather(
+            *(self._on_due(reminders[0].stop, reminders) for reminders in batches),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Reminder batch failed: {str(result)}")
+        fired = sum(len(reminders) for reminders in batches)
+        self.fired += fired
+        self.batches += len(batches)
+        return fired
+
+    def start(self) -> None:
+        """Start firing reminders in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='reminder-scheduler')
+
+    async def stop(self) -> None:
+        """Stop firing reminders."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            fire_at = self.next_fire()
+            delay = None if fire_at is None else max(0.0, fire_at - self.clock())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            await self.run_due()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return schedule size and firing counters.
+
+        Returns:
+            Dict[str, Any]: Scheduler counters
+        """
+        return {
+            'scheduled': len(self._fire_at),
+            'heap': len(self._heap),
+            'fired': self.fired,
+            'skipped': self.skipped,
+            'batches': self.batches
+        }
@@ -0,0 +1,294 @@
+# Standard library imports
+import logging
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from footpaths import FOOTPATH_RADIUS, WALKING_SPEED, Footpaths, build_footpaths
+from gtfs_static import SECONDS_PER_DAY, Timetable
+from spatial_index import SpatialIndex
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+INF = 1 << 30
+
+
+class Leg(NamedTuple):
+    """One leg of a journey; ``line`` is None for walking legs."""
+    from_stop: int
+    to_stop: int
+    departure: int  # seconds after midnight
+    arrival: int
+    line: Optional[str]
+    headsign: Optional[str]
+
+
+class Journey(NamedTuple):
+    """A journey option; ``rides`` counts vehicles boarded."""
+    departure: int
+    arrival: int
+    rides: int
+    legs: Tuple[Leg, ...]
+
+
+class Router:
+    """Round-based public transit router (RAPTOR) over a static timetable.
+
+    Trips with identical stop sequences are grouped into patterns, each held
+    as (trips x stops) departure and arrival matrices sorted by departure.
+    Round k finds the earliest arrival at every stop using at most k
+    vehicles, so the destination labels of successive rounds are the Pareto
+    set of arrival time versus number of transfers. Trips of the previous
+    service day still running after midnight are boarded too, their times
+    shifted back by a day.
+    """
+
+    def __init__(self, timetable: Timetable, footpaths: Optional[Footpaths] = None) -> None:
+        """Group trips into patterns and index them by stop.
+
+        Args:
+            timetable: The static timetable
+            footpaths: Walking transfers between stops, computed from the
+                stop coordinates when omitted
+        """
+        self.timetable = timetable
+        self.stop_count = len(timetable.stop_names)
+        self.index = SpatialIndex(timetable.stop_lats, timetable.stop_lons)
+        if footpaths is None:
+            footpaths = build_footpaths(self.index)
+        self.footpaths = footpaths
+
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        offsets = timetable.trip_offsets
+        st_stop = timetable.st_stop
+        for trip in range(timetable.trip_count):
+            key = tuple(st_stop[offsets[trip]:offsets[trip + 1]].tolist())
+            if len(key) > 1:
+                groups.setdefault(key, []).append(trip)
+
+        self.pattern_stops: List[List[int]] = []
+        self.pattern_trips: List[np.ndarray] = []
+        self.pattern_departures: List[np.ndarray] = []  # stops x trips, for searching
+        self.pattern_rows: List[Tuple[np.ndarray, np.ndarray]] = []  # trips x stops (arrivals, departures)
+        stop_patterns: List[List[Tuple[int, int]]] = [[] for _ in range(self.stop_count)]
+        for stops, trips in groups.items():
+            starts = offsets[trips]
+            width = len(stops)
+            columns = starts[:, None] + np.arange(width)
+            arrivals = timetable.st_arrival[columns]
+            departures = timetable.st_departure[columns]
+            order = np.argsort(departures[:, 0], kind='stable')
+            pattern = len(self.pattern_stops)
+            self.pattern_stops.append(list(stops))
+            self.pattern_trips.append(np.asarray(trips, dtype=np.int32)[order])
+            self.pattern_departures.append(np.ascontiguousarray(departures[order].T))
+            self.pattern_rows.append((arrivals[order], departures[order]))
+            for position, stop in enumerate(stops):
+                stop_patterns[stop].append((pattern, position))
+        self.stop_patterns = stop_patterns
+        bounds = footpaths.offsets.tolist()
+        pairs = list(zip(footpaths.neighbours.tolist(), footpaths.seconds.tolist()))
+        self._transfers: List[List[Tuple[int, int]]] = [
+            pairs[bounds[s]:bounds[s + 1]] for s in range(self.stop_count)
+        ]
+        self.active_patterns = lru_cache(maxsize=4)(self._active_patterns)
+        logger.info(f"Router built: {len(self.pattern_stops)} patterns over {timetable.trip_count} trips")
+
+    def _active_patterns(self, day: date) -> List[np.ndarray]:
+        active = self.timetable.active_services(day)
+        service = self.timetable.trip_service
+        return [active[service[trips]] for trips in self.pattern_trips]
+
+    def _earliest_trip(
+        self,
+        pattern: int,
+        position: int,
+        time: int,
+        days: List[Tuple[np.ndarray, int]]
+    ) -> Tuple[int, int]:
+        # Returns the trip and the seconds its times are shifted by, or (-1, 0)
+        column = self.pattern_departures[pattern][position]
+        earliest, best_trip, best_shift = INF, -1, 0
+        for active, shift in days:
+            trip = int(np.searchsorted(column, time + shift, 'left'))
+            while trip < len(column) and not active[pattern][trip]:
+                trip += 1
+            if trip < len(column) and column[trip] - shift < earliest:
+                earliest, best_trip, best_shift = int(column[trip]) - shift, trip, shift
+        return best_trip, best_shift
+
+    def route(
+        self,
+        origins: Dict[int, int],
+        destinations: Dict[int, int],
+        day: date,
+        departure: int,
+        max_rides: int = 5
+    ) -> List[Journey]:
+        """Find Pareto-optimal journeys (arrival time vs. number of rides).
+
+        Args:
+            origins: Origin stops and the walking seconds to reach them
+            destinations: Destination stops and the walking seconds from them
+            day: Service day
+            departure: Departure time, in seconds after midnight
+            max_rides: Maximum number of vehicles boarded
+
+        Returns:
+            List[Journey]: Journeys with strictly decreasing arrival times as
+            the number of rides grows
+        """
+        # Trips after midnight of the previous service day run past 24:00
+        days = [
+            (self.active_patterns(day - timedelta(days=1)), SECONDS_PER_DAY),
+            (self.active_patterns(day), 0)
+        ]
+        best = [INF] * self.stop_count
+        previous = [INF] * self.stop_count
+        rides: List[Dict[int, tuple]] = [{}]
+        walks: List[Dict[int, Tuple[int, int]]] = [{}]
+        marked = set()
+        for stop, walk in origins.items():
+            previous[stop] = best[stop] = departure + walk
+            rides[0][stop] = ()
+            marked.add(stop)
+        self._relax_footpaths(marked, previous, best, walks[0])
+
+        journeys: List[Journey] = []
+        best_target = INF
+        for k in range(1, max_rides + 1):
+            current = list(previous)
+            round_rides: Dict[int, tuple] = {}
+            rides.append(round_rides)
+            walks.append({})
+
+            queue: Dict[int, int] = {}
+            for stop in marked:
+                for pattern, position in self.stop_patterns[stop]:
+                    if position < queue.get(pattern, INF):
+                        queue[pattern] = position
+            marked = set()
+
+            for pattern, start in queue.items():
+                stops = self.pattern_stops[pattern]
+                arrivals_matrix, departures_matrix = self.pattern_rows[pattern]
+                trip = -1
+                shift = 0
+                arrivals: List[int] = []
+                departures: List[int] = []
+                board_stop = board_position = -1
+                for position in range(start, len(stops)):
+                    stop = stops[position]
+                    if trip >= 0:
+                        arrival = arrivals[position]
+                        if arrival < best[stop] and arrival < best_target:
+                            current[stop] = best[stop] = arrival
+                            round_rides[stop] = (pattern, trip, shift, board_stop, board_position, position)
+                            marked.add(stop)
+                    ready = previous[stop]
+                    if ready < INF and (trip < 0 or ready <= departures[position]):
+                        candidate, candidate_shift = self._earliest_trip(pattern, position, ready, days)
+                        if candidate >= 0 and (candidate, candidate_shift) != (trip, shift):
+                            trip, shift = candidate, candidate_shift
+                            arrivals = (arrivals_matrix[trip] - shift).tolist()
+                            departures = (departures_matrix[trip] - shift).tolist()
+                            board_stop, board_position = stop, position
+
+            self._relax_footpaths(marked, current, best, walks[k])
+            if not marked:
+                break
+
+            arrival, target = min((current[s] + walk, s) for s, walk in destinations.items())
+            if arrival < best_target:
+                best_target = arrival
+                journeys.append(self._journey(rides, walks, k, target, departure, destinations[target]))
+            previous = current
+        return journeys
+
+    def _relax_footpaths(
+        self,
+        marked: set,
+        times: List[int],
+        best: List[int],
+        round_walks: Dict[int, Tuple[int, int]]
+    ) -> None:
+        # Walk once from each stop reached by vehicle this round; walks are
+        # labelled apart from rides so a journey never chains two walks
+        for stop in list(marked):
+            base = times[stop]
+            for neighbour, seconds in self._transfers[stop]:
+                arrival = base + seconds
+                if arrival < best[neighbour]:
+                    times[neighbour] = best[neighbour] = arrival
+                    round_walks[neighbour] = (stop, seconds)
+                    marked.add(neighbour)
+
+    def _journey(
+        self,
+        rides: List[Dict[int, tuple]],
+        walks: List[Dict[int, Tuple[int, int]]],
+        k: int,
+        target: int,
+        departure: int,
+        egress: int
+    ) -> Journey:
+        legs: List[Leg] = []
+        stop = target
+        while k >= 0:
+            if stop in walks[k]:
+                source, seconds = walks[k][stop]
+                legs.append(Leg(source, stop, -1, seconds, None, None))
+                stop = source
+            label = rides[k].get(stop)
+            if label is None:
+                k -= 1
+                continue
+            if not label:
+                break  # origin
+            pattern, trip, shift, board_stop, board_position, position = label
+            arrivals, departures = self.pattern_rows[pattern]
+            timetable_trip = int(self.pattern_trips[pattern][trip])
+            legs.append(Leg(
+                board_stop,
+                stop,
+                int(departures[trip][board_position]) - shift,
+                int(arrivals[trip][position]) - shift,
+                self.timetable.route_short_names[int(self.timetable.trip_route[timetable_trip])],
+                self.timetable.headsigns[int(self.timetable.trip_headsign[timetable_trip])]
+            ))
+            stop = board_stop
+            k -= 1
+        legs.reverse()
+
+        # Walking legs were stored as durations; place them in time
+        timed: List[Leg] = []
+        clock = departure
+        for i, leg in enumerate(legs):
+            if leg.line is None:
+                following = next((l.departure for l in legs[i + 1:] if l.line is not None), None)
+                end = following if following is not None else clock + leg.arrival
+                timed.append(leg._replace(departure=end - leg.arrival, arrival=end))
+                clock = end
+            else:
+                timed.append(leg)
+                clock = leg.arrival
+        first = timed[0].departure if timed else departure
+        return Journey(first, clock + egress, sum(1 for leg in timed if leg.line), tuple(timed))
+
+    def stops_near(self, lat: float, lon: float, radius: float = FOOTPATH_RADIUS) -> Dict[int, int]:
+        """Return the stops within walking distance of a point.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            radius: Maximum walking distance, in meters
+
+        Returns:
+            Dict[int, int]: Stops and the walking seconds to reach them
+        """
+        ids, distances = self.index.within(lat, lon, radius)
+        return {s: int(d / WALKING_SPEED) for s, d in zip(ids.tolist(), distances.tolist())}
@@ -0,0 +1,175 @@
+# Standard library imports
+import math
+from typing import Dict, List, Sequence, Tuple
+
+# Third-party imports
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Vectorized great-circle distance from one point to many.
+
+    Args:
+        lat: Latitude of the origin, in degrees
+        lon: Longitude of the origin, in degrees
+        lats: Latitudes of the targets, in degrees
+        lons: Longitudes of the targets, in degrees
+
+    Returns:
+        np.ndarray: Distances in meters
+    """
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - math.radians(lon)
+    a = np.sin(dlat * 0.5) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class SpatialIndex:
+    """Uniform grid index over points for k-nearest and radius queries.
+
+    Points are projected onto a local equirectangular plane (accurate to well
+    under a percent across a metropolitan area), bucketed into square cells
+    and stored cell by cell, so a query only reads the cells it overlaps and
+    ranks them with one vectorized haversine call.
+    """
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float], cell_size: float = 250.0) -> None:
+        """Build the index.
+
+        Args:
+            lats: Point latitudes, in degrees
+            lons: Point longitudes, in degrees
+            cell_size: Grid cell edge, in meters
+        """
+        self.cell_size = cell_size
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self._origin_lat = float(self.lats.mean()) if len(self.lats) else 0.0
+        self._kx = EARTH_RADIUS_M * math.cos(math.radians(self._origin_lat)) * math.pi / 180
+        self._ky = EARTH_RADIUS_M * math.pi / 180
+
+        self._x = self.lons * self._kx
+        self._y = self.lats * self._ky
+        cx, cy = self._cells(self.lats, self.lons)
+        order = np.lexsort((cy, cx))
+        self._order = order
+        self._cell_ranges: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._bounds = (0, 0, 0, 0)
+        if len(order):
+            self._bounds = (int(cx.min()), int(cx.max()), int(cy.min()), int(cy.max()))
+            keys = np.stack((cx[order], cy[order]), axis=1)
+            boundaries = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(order)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self._cell_ranges[(int(keys[start, 0]), int(keys[start, 1]))] = (start, end)
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    def _cells(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        cx = np.floor(lons * (self._kx / self.cell_size)).astype(np.int64)
+        cy = np.floor(lats * (self._ky / self.cell_size)).astype(np.int64)
+        return cx, cy
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lon * (self._kx / self.cell_size)), math.floor(lat * (self._ky / self.cell_size)))
+
+    def _ring_cells(self, cx: int, cy: int, ring: int) -> List[Tuple[int, int]]:
+        # Cells of the square ring at Chebyshev distance `ring`
+        if ring == 0:
+            return [(cx, cy)]
+        cells = []
+        for x in range(cx - ring, cx + ring + 1):
+            cells.append((x, cy - ring))
+            cells.append((x, cy + ring))
+        for y in range(cy - ring + 1, cy + ring):
+            cells.append((cx - ring, y))
+            cells.append((cx + ring, y))
+        return cells
+
+    def _gather(self, cx: int, cy: int, ring: int) -> np.ndarray:
+        # Point indices stored in the ring's cells
+        ranges = self._cell_ranges
+        slices = [self._order[r[0]:r[1]] for r in map(ranges.get, self._ring_cells(cx, cy, ring)) if r]
+        if not slices:
+            return self._order[:0]
+        return slices[0] if len(slices) == 1 else np.concatenate(slices)
+
+    def within(self, lat: float, lon: float, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return every point within a radius, nearest first.
+
+        Args:
+            lat: Query latitude, in degrees
+            lon: Query longitude, in degrees
+            radius: Search radius, in meters
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Point indices and their distances
+            in meters
+        """
+        cx, cy = self._cell(lat, lon)
+        rings = int(math.ceil(radius / self.cell_size))
+        candidates = np.concatenate([self._gather(cx, cy, ring) for ring in range(rings + 1)])
+        distances = haversine_m(lat, lon, self.lats[candidates], self.lons[candidates])
+        mask = distances <= radius
+        candidates, distances = candidates[mask], distances[mask]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int, max_distance: float = math.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the k nearest points.
+
+        Rings of cells are added around the query cell until k candidates
+        are found and the next ring cannot contain anything closer.
+
+        Args:
+            lat: Query latitude, in degrees
+            lon: Query longitude, in degrees
+            k: Number of points to return
+            max_distance: Ignore points further than this, in meters
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Point indices and their distances
+            in meters, nearest first
+        """
+        if not len(self.lats) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        cx, cy = self._cell(lat, lon)
+        min_x, max_x, min_y, max_y = self._bounds
+        max_ring = max(abs(min_x - cx), abs(max_x - cx), abs(min_y - cy), abs(max_y - cy))
+        if math.isfinite(max_distance):
+            max_ring = min(max_ring, int(math.ceil(max_distance / self.cell_size)))
+
+        # Rank on the cheap planar projection while expanding, haversine at the end
+        qx, qy = lon * self._kx, lat * self._ky
+        slices: List[np.ndarray] = []
+        planar: List[np.ndarray] = []
+        found = 0
+        ring = 0
+        while ring <= max_ring:
+            ids = self._gather(cx, cy, ring)
+            if len(ids):
+                slices.append(ids)
+                planar.append((self._x[ids] - qx) ** 2 + (self._y[ids] - qy) ** 2)
+                found += len(ids)
+            # Every point outside rings 0..ring is at least ring * cell_size away
+            if found >= k:
+                kth = np.partition(np.concatenate(planar), k - 1)[k - 1]
+                if kth <= (ring * self.cell_size) ** 2:
+                    break
+            ring += 1
+
+        if not slices:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates = np.concatenate(slices)
+        distances = haversine_m(lat, lon, self.lats[candidates], self.lons[candidates])
+        mask = distances <= max_distance
+        candidates, distances = candidates[mask], distances[mask]
+        order = np.argsort(distances, kind='stable')[:k]
+        return candidates[order], distances[order]
@@ -0,0 +1,462 @@
+# Standard library imports
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Local imports
+from rate_limiter import RateLimiter
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class StateBackend(ABC):
+    """State shared by every worker of the bot.
+
+    Rate-limit buckets, sessions and cached upstream answers live here
+    instead of in process memory, so several workers behind the webhook
+    see the same limits and sessions. The backend also provides a lock, to
+    run background jobs in one worker only, and a broadcast channel, to tell
+    the other workers about changes to their in-memory indexes. Backends
+    implement the abstract methods; one that misses any cannot be created.
+    """
+
+    #: True if the state is visible to other processes
+    shared = False
+
+    def __init__(self) -> None:
+        self.origin = os.urandom(8).hex()
+        self._callbacks: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+
+    async def start(self) -> None:
+        """Connect and start receiving broadcasts."""
+        pass
+
+    async def close(self) -> None:
+        """Stop receiving broadcasts and disconnect."""
+        pass
+
+    @abstractmethod
+    async def allow(self, key: str, capacity: int, period: float, cost: float = 1.0) -> bool:
+        """Spend tokens from a token bucket, atomically across workers.
+
+        Args:
+            key: The rate-limited key
+            capacity: Maximum number of requests per period
+            period: Length of the period, in seconds
+            cost: Number of tokens the request costs
+
+        Returns:
+            bool: True if the request is within the limit
+        """
+        pass
+
+    @abstractmethod
+    async def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        """Return a stored value.
+
+        Args:
+            key: The key
+            ttl: If given, the entry's lifetime is reset to this many seconds
+
+        Returns:
+            Optional[Any]: The value, or None if missing or expired
+        """
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a JSON-serializable value.
+
+        Args:
+            key: The key
+            value: The value
+            ttl: Seconds the entry lives
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete a stored value.
+
+        Args:
+            key: The key
+        """
+        pass
+
+    @abstractmethod
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        """Take or renew a lock.
+
+        Args:
+            name: Lock name
+            owner: Identifier of the would-be holder
+            ttl: Seconds the lock is held unless renewed
+
+        Returns:
+            bool: True if owner holds the lock
+        """
+        pass
+
+    @abstractmethod
+    async def release(self, name: str, owner: str) -> None:
+        """Release a lock if owner holds it.
+
+        Args:
+            name: Lock name
+            owner: Identifier of the holder
+        """
+        pass
+
+    def subscribe(self, channel: str, callback: Callable[[Any], None]) -> None:
+        """Call callback with every message published on a channel.
+
+        Args:
+            channel: Channel name
+            callback: Called with the decoded message
+        """
+        self._callbacks[channel].append(callback)
+
+    async def publish(self, channel: str, message: Any) -> None:
+        """Deliver a message to every worker, this one first.
+
+        Local subscribers are called before this returns; other workers
+        receive the message asynchronously.
+
+        Args:
+            channel: Channel name
+            message: JSON-serializable message
+        """
+        self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: Any) -> None:
+        for callback in self._callbacks.get(channel, ()):
+            try:
+                callback(message)
+            except Exception as e:
+                logger.error(f"Broadcast handler for {channel} failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend counters.
+
+        Returns:
+            Dict[str, Any]: Backend counters
+        """
+        return {'backend': type(self).__name__}
+
+
+class MemoryBackend(StateBackend):
+    """State kept in this process, for a single worker."""
+
+    def __init__(self, maxsize: int = 100000, clock: Callable[[], float] = time.monotonic) -> None:
+        """Configure the backend.
+
+        Args:
+            maxsize: Maximum number of stored values before the least
+                recently used one is evicted
+            clock: Monotonic time source, overridable for tests
+        """
+        super().__init__()
+        self.maxsize = maxsize
+        self._clock = clock
+        self._limiters: Dict[Tuple[int, float], RateLimiter] = {}
+        self._data: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._locks: Dict[str, Tuple[str, float]] = {}
+
+    async def allow(self, key: str, capacity: int, period: float, cost: float = 1.0) -> bool:
+        limiter = self._limiters.get((capacity, period))
+        if limiter is None:
+            limiter = self._limiters[(capacity, period)] = RateLimiter(capacity, period, clock=self._clock)
+        return limiter.allow(key, cost)
+
+    async def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        now = self._clock()
+        if entry[0] <= now:
+            del self._data[key]
+            return None
+        if ttl is not None:
+            self._data[key] = (now + ttl, entry[1])
+        self._data.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (self._clock() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        now = self._clock()
+        holder = self._locks.get(name)
+        if holder is not None and holder[0] != owner and holder[1] > now:
+            return False
+        self._locks[name] = (owner, now + ttl)
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        if self._locks.get(name, (None,))[0] == owner:
+            del self._locks[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'memory',
+            'keys': len(self._data),
+            'rate_limited_keys': sum(len(limiter) for limiter in self._limiters.values()),
+            'rejected': sum(limiter.rejected for limiter in self._limiters.values())
+        }
+
+
+# Token bucket in a hash {tokens, updated}, timed by the Redis server clock so
+# that workers with skewed clocks share one notion of time.
+_ALLOW_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + (now - tonumber(state[2])) * capacity / period)
+end
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', string.format('%.6f', tokens), 'updated', string.format('%.6f', now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(period * 1000))
+return allowed
+"""
+
+_ACQUIRE_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder == false then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+if holder == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisBackend(StateBackend):
+    """State kept in Redis, shared by every worker.
+
+    Token buckets and locks are single Lua scripts, so each check is one
+    atomic round trip; values are stored as JSON strings with a TTL.
+    Broadcasts use Redis pub/sub; a worker ignores its own messages, which
+    it already delivered locally.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = 'bordeaux_bot:') -> None:
+        """Configure the backend.
+
+        Args:
+            url: Redis URL, e.g. redis://localhost:6379/0
+            prefix: Prefix of every key and channel
+        """
+        # Imported here so that redis is only needed when configured
+        import redis.asyncio as redis
+
+        super().__init__()
+        self.url = url
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+        self._allow = self._redis.register_script(_ALLOW_SCRIPT)
+        self._acquire = self._redis.register_script(_ACQUIRE_SCRIPT)
+        self._release = self._redis.register_script(_RELEASE_SCRIPT)
+        self._listener: Optional[asyncio.Task] = None
+        self.commands = 0
+        self.received = 0
+
+    async def start(self) -> None:
+        await self._redis.ping()
+        if self._listener is None and self._callbacks:
+            self._listener = asyncio.create_task(self._listen(), name='state-broadcasts')
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await self._redis.aclose()
+
+    async def _listen(self) -> None:
+        channels = [self.prefix + channel for channel in self._callbacks]
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(*channels)
+                async for message in pubsub.listen():
+                    envelope = json.loads(message['data'])
+                    if envelope['origin'] == self.origin:
+                        continue
+                    self.received += 1
+                    self._dispatch(message['channel'].decode()[len(self.prefix):], envelope['message'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Broadcast subscription lost, reconnecting: {str(e)}")
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
+
+    async def allow(self, key: str, capacity: int, period: float, cost: float = 1.0) -> bool:
+        self.commands += 1
+        return bool(await self._allow(keys=[self.prefix + key], args=[capacity, period, cost]))
+
+    async def get(self, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        self.commands += 1
+        if ttl is None:
+            raw = await self._redis.get(self.prefix + key)
+        else:
+            raw = await self._redis.getex(self.prefix + key, px=int(ttl * 1000))
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.commands += 1
+        await self._redis.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        self.commands += 1
+        await self._redis.delete(self.prefix + key)
+
+    async def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        self.commands += 1
+        return bool(await self._acquire(keys=[self.prefix + 'lock:' + name], args=[owner, int(ttl * 1000)]))
+
+    async def release(self, name: str, owner: str) -> None:
+        self.commands += 1
+        await self._release(keys=[self.prefix + 'lock:' + name], args=[owner])
+
+    async def publish(self, channel: str, message: Any) -> None:
+        self._dispatch(channel, message)
+        self.commands += 1
+        await self._redis.publish(self.prefix + channel, json.dumps({'origin': self.origin, 'message': message}))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'redis',
+            'commands': self.commands,
+            'broadcasts_received': self.received
+        }
+
+
+def create_backend(url: Optional[str]) -> StateBackend:
+    """Create the backend for a configured URL.
+
+    Args:
+        url: Redis URL, or None for in-process state
+
+    Returns:
+        StateBackend: The backend
+    """
+    if url:
+        return RedisBackend(url)
+    return MemoryBackend()
+
+
+class Leadership:
+    """Keeps background jobs running in exactly one worker.
+
+    Every worker tries to take the same backend lock and renews it three
+    times per TTL; the holder runs ``on_elected`` and, when it loses the
+    lock or stops, ``on_deposed``. If a worker dies, another one takes over
+    once the lock expires. A worker that cannot reach the backend steps down.
+    """
+
+    def __init__(
+        self,
+        backend: StateBackend,
+        on_elected: Callable[[], Awaitable[None]],
+        on_deposed: Callable[[], Awaitable[None]],
+        name: str = 'leader',
+        ttl: float = 15.0
+    ) -> None:
+        """Configure the election.
+
+        Args:
+            backend: The shared state backend
+            on_elected: Coroutine run when this worker becomes leader
+            on_deposed: Coroutine run when this worker stops being leader
+            name: Lock name
+            ttl: Seconds the lock outlives a dead leader
+        """
+        self.backend = backend
+        self._on_elected = on_elected
+        self._on_deposed = on_deposed
+        self.name = name
+        self.ttl = ttl
+        self.owner = backend.origin
+        self.leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start campaigning in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='leadership')
+
+    async def stop(self) -> None:
+        """Stop campaigning and hand over the lock."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.leader:
+            await self._set_leader(False)
+            try:
+                await self.backend.release(self.name, self.owner)
+            except Exception as e:
+                logger.error(f"Failed to release {self.name} lock: {str(e)}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                held = await self.backend.acquire(self.name, self.owner, self.ttl)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to renew {self.name} lock: {str(e)}")
+                held = False
+            if held != self.leader:
+                await self._set_leader(held)
+            await asyncio.sleep(self.ttl / 3)
+
+    async def _set_leader(self, leader: bool) -> None:
+        self.leader = leader
+        logger.info(f"Worker {self.owner} {'is now' if leader else 'is no longer'} the {self.name}")
+        try:
+            await (self._on_elected() if leader else self._on_deposed())
+        except Exception as e:
+            logger.error(f"Leadership change handler failed: {str(e)}")
@@ -0,0 +1,212 @@
+# Standard library imports
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+# Third-party imports
+from supabase import Client
+
+# Local imports
+from upstream import within_deadline
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class SupabaseStore:
+    """Async facade over the synchronous supabase-py client.
+
+    Every ``execute()`` runs on a bounded thread pool, so database round
+    trips never block the event loop and at most ``pool_size`` of them are
+    in flight at once.
+    """
+
+    def __init__(self, client: Client, pool_size: int = 8) -> None:
+        """Wrap a client.
+
+        Args:
+            client: The supabase-py client
+            pool_size: Maximum number of concurrent database requests
+        """
+        self.client = client
+        self.pool_size = pool_size
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='supabase')
+
+    def table(self, name: str) -> Any:
+        """Start a query on a table.
+
+        Args:
+            name: The table name
+
+        Returns:
+            Any: The supabase-py query builder
+        """
+        return self.client.table(name)
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        """Start a call to a Postgres function.
+
+        Args:
+            name: The function name
+            params: The function arguments
+
+        Returns:
+            Any: The supabase-py query builder
+        """
+        return self.client.rpc(name, params)
+
+    async def execute(self, query: Any) -> Any:
+        """Execute a query builder off the event loop.
+
+        Args:
+            query: A supabase-py query builder
+
+        Returns:
+            Any: The API response
+
+        Raises:
+            DeadlineExceeded: If the current deadline passed first; the query
+                itself still completes in its thread
+        """
+        loop = asyncio.get_running_loop()
+        return await within_deadline(loop.run_in_executor(self._executor, query.execute))
+
+    def close(self) -> None:
+        """Wait for running requests and stop the thread pool."""
+        self._executor.shutdown(wait=True)
+
+
+class WriteBehindQueue:
+    """Buffer writes to one table and flush them as batched requests.
+
+    Rows are collected for ``interval`` seconds after the first pending
+    write and then sent in a single insert (or upsert when ``on_conflict``
+    is set). With ``on_conflict``, later rows replace earlier pending rows
+    with the same key, so a burst of updates becomes one row per key.
+    """
+
+    def __init__(
+        self,
+        store: SupabaseStore,
+        table: str,
+        on_conflict: Optional[Tuple[str, ...]] = None,
+        interval: float = 0.05,
+        max_batch: int = 500
+    ) -> None:
+        """Configure the queue.
+
+        Args:
+            store: The store used to send batches
+            table: Target table
+            on_conflict: Key columns for upserts; None for plain inserts
+            interval: Seconds to wait for more rows before flushing
+            max_batch: Maximum number of rows per request
+        """
+        self.store = store
+        self.table = table
+        self.on_conflict = on_conflict
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending: Dict[Hashable, Dict[str, Any]] = {}
+        self._counter = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.failed_rows = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, row: Dict[str, Any]) -> None:
+        """Queue a row for the next flush.
+
+        Args:
+            row: The row to write
+        """
+        if self.on_conflict:
+            key: Hashable = tuple(row[column] for column in self.on_conflict)
+            # Re-insert so the row moves to the end of the flush order
+            self._pending.pop(key, None)
+        else:
+            self._counter += 1
+            key = self._counter
+        self._pending[key] = row
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def pending(self, **key: Any) -> Optional[Dict[str, Any]]:
+        """Return the newest unflushed row matching the key columns.
+
+        Args:
+            **key: Column values to match
+
+        Returns:
+            Optional[Dict[str, Any]]: The row if one is pending, None otherwise
+        """
+        if self.on_conflict and set(key) == set(self.on_conflict):
+            return self._pending.get(tuple(key[column] for column in self.on_conflict))
+        for row in reversed(list(self._pending.values())):
+            if all(row.get(column) == value for column, value in key.items()):
+                return row
+        return None
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            if self._pending:
+                self._wakeup.set()
+            self._task = asyncio.create_task(self._run(), name=f"write-behind-{self.table}")
+
+    async def stop(self) -> None:
+        """Stop the background task and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send every pending row now, in batches of at most ``max_batch``."""
+        while self._pending:
+            keys = list(self._pending)[:self.max_batch]
+            rows = [self._pending.pop(key) for key in keys]
+            await self._send(rows)
+
+    async def _send(self, rows: List[Dict[str, Any]]) -> None:
+        if self.on_conflict:
+            query = self.store.table(self.table).upsert(rows, on_conflict=','.join(self.on_conflict))
+        else:
+            query = self.store.table(self.table).insert(rows)
+        try:
+            await self.store.execute(query)
+            self.flushed_rows += len(rows)
+            self.flushed_batches += 1
+        except Exception as e:
+            self.failed_rows += len(rows)
+            logger.error(f"Failed to flush {len(rows)} rows to {self.table}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and flush counters.
+
+        Returns:
+            Dict[str, Any]: Pending, flushed and failed row counts
+        """
+        return {
+            'table': self.table,
+            'pending': len(self._pending),
+            'flushed_rows': self.flushed_rows,
+            'flushed_batches': self.flushed_batches,
+            'failed_rows': self.failed_rows
+        }
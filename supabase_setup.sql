@@ -32,17 +32,39 @@ CREATE TABLE IF NOT EXISTS user_preferences (
     PRIMARY KEY (user_id, setting)
 );
 
+-- Create user_current_locations table (one row per user, upserted on change)
+CREATE TABLE IF NOT EXISTS user_current_locations (
+    user_id BIGINT PRIMARY KEY,
+    latitude DOUBLE PRECISION NOT NULL,
+    longitude DOUBLE PRECISION NOT NULL,
+    name TEXT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL
+);
+
+-- Create user_locations table (append-only location history)
+CREATE TABLE IF NOT EXISTS user_locations (
+    id BIGSERIAL PRIMARY KEY,
+    user_id BIGINT NOT NULL,
+    latitude DOUBLE PRECISION NOT NULL,
+    longitude DOUBLE PRECISION NOT NULL,
+    name TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL
+);
+
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_user_languages_user_id ON user_languages(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_favorites_user_id ON user_favorites(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_reminders_user_id ON user_reminders(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id ON user_preferences(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_locations_user_id_created_at ON user_locations(user_id, created_at DESC);
 
 -- Add RLS (Row Level Security) policies
 ALTER TABLE user_languages ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_favorites ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_reminders ENABLE ROW LEVEL SECURITY;
 ALTER TABLE user_preferences ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_current_locations ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_locations ENABLE ROW LEVEL SECURITY;
 
 -- Create policies for each table
 CREATE POLICY "Users can read their own language" ON user_languages
@@ -71,4 +93,37 @@ CREATE POLICY "Users can read their own preferences" ON user_preferences
     FOR SELECT USING (user_id::text = auth.uid()::text);
 
 CREATE POLICY "Users can manage their own preferences" ON user_preferences
-    FOR ALL USING (user_id::text = auth.uid()::text); 
\ No newline at end of file
+    FOR ALL USING (user_id::text = auth.uid()::text);
+
+CREATE POLICY "Users can read their own current location" ON user_current_locations
+    FOR SELECT USING (user_id::text = auth.uid()::text);
+
+CREATE POLICY "Users can manage their own current location" ON user_current_locations
+    FOR ALL USING (user_id::text = auth.uid()::text);
+
+CREATE POLICY "Users can read their own location history" ON user_locations
+    FOR SELECT USING (user_id::text = auth.uid()::text);
+
+CREATE POLICY "Users can manage their own location history" ON user_locations
+    FOR ALL USING (user_id::text = auth.uid()::text);
+
+-- Load a user's whole profile (latest location, language, preferences) in one round trip
+CREATE OR REPLACE FUNCTION get_user_profile(p_user_id BIGINT)
+RETURNS JSON
+LANGUAGE sql STABLE
+AS $$
+    SELECT json_build_object(
+        'location', (
+            SELECT json_build_object('latitude', latitude, 'longitude', longitude, 'name', name)
+            FROM user_current_locations
+            WHERE user_id = p_user_id
+        ),
+        'language', (
+            SELECT language FROM user_languages WHERE user_id = p_user_id
+        ),
+        'preferences', COALESCE(
+            (SELECT json_object_agg(setting, value) FROM user_preferences WHERE user_id = p_user_id),
+            '{}'::json
+        )
+    );
+$$;
\ No newline at end of file
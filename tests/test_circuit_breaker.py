@@ -0,0 +1,215 @@
+# Standard library imports
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import pytest
+
+# Local imports
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ClientError(Exception):
+    """Stands for an error caused by the request, not the upstream."""
+
+
+def make_breaker(clock, **kwargs):
+    options = dict(
+        window=10,
+        min_calls=4,
+        failure_ratio=0.5,
+        slow_call=2.0,
+        slow_ratio=0.75,
+        open_duration=30.0,
+        max_probes=8,
+        is_failure=lambda e: not isinstance(e, (ClientError, asyncio.TimeoutError)),
+        clock=clock
+    )
+    options.update(kwargs)
+    return CircuitBreaker('api', **options)
+
+
+def call(breaker, func):
+    async def run():
+        return await breaker.call(func)
+    return asyncio.run(run())
+
+
+async def succeed():
+    return 'ok'
+
+
+async def fail():
+    raise RuntimeError('upstream error')
+
+
+def raising(error):
+    async def func():
+        raise error
+    return func
+
+
+def slow(clock, seconds=3.0):
+    async def func():
+        clock.now += seconds
+        return 'late'
+    return func
+
+
+def open_breaker(clock, breaker):
+    for _ in range(4):
+        with pytest.raises(RuntimeError):
+            call(breaker, fail)
+    assert breaker.state == OPEN
+
+
+def test_opens_at_failure_ratio():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    call(breaker, succeed)
+    call(breaker, succeed)
+    with pytest.raises(RuntimeError):
+        call(breaker, fail)
+    assert breaker.state == CLOSED
+
+    with pytest.raises(RuntimeError):
+        call(breaker, fail)
+    assert breaker.state == OPEN
+    assert breaker.opened == 1
+
+
+def test_opens_at_slow_ratio():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    call(breaker, succeed)
+    for _ in range(2):
+        call(breaker, slow(clock))
+    assert breaker.state == CLOSED
+
+    call(breaker, slow(clock))
+    assert breaker.state == OPEN
+
+
+def test_errors_of_the_request_do_not_open():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(10):
+        with pytest.raises(ClientError):
+            call(breaker, raising(ClientError()))
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_rejects_without_calling():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(clock, breaker)
+    calls = []
+
+    async def tracked():
+        calls.append(1)
+        return 'ok'
+
+    clock.now += 10
+    with pytest.raises(CircuitOpenError):
+        call(breaker, tracked)
+    assert calls == []
+    assert breaker.rejected == 1
+    assert breaker.retry_after() == 20.0
+
+
+def test_half_open_probes_ramp_up_then_close():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(clock, breaker)
+    clock.now += 30
+
+    async def ramp():
+        for probes in (1, 2, 4, 8):
+            gate = asyncio.Event()
+
+            async def held():
+                await gate.wait()
+                return 'ok'
+
+            tasks = [asyncio.ensure_future(breaker.call(held)) for _ in range(probes)]
+            await asyncio.sleep(0)
+            assert breaker.state == HALF_OPEN
+            assert breaker.stats()['probes'] == probes
+            # Every slot is taken: one more call is rejected
+            with pytest.raises(CircuitOpenError):
+                await breaker.call(succeed)
+            gate.set()
+            await asyncio.gather(*tasks)
+
+    asyncio.run(ramp())
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(clock, breaker)
+    clock.now += 30
+    call(breaker, succeed)
+    assert breaker.stats()['probes'] == 2
+
+    with pytest.raises(RuntimeError):
+        call(breaker, fail)
+    assert breaker.state == OPEN
+    assert breaker.opened == 2
+
+
+def test_slow_probe_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(clock, breaker)
+    clock.now += 30
+
+    call(breaker, slow(clock))
+    assert breaker.state == OPEN
+
+
+@pytest.mark.parametrize('error', [ClientError(), asyncio.TimeoutError()])
+def test_probe_error_not_counted_as_failure_only_frees_its_slot(error):
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(clock, breaker)
+    clock.now += 30
+
+    with pytest.raises(type(error)):
+        call(breaker, raising(error))
+    assert breaker.state == HALF_OPEN
+    assert breaker.stats()['probes'] == 1
+    assert call(breaker, succeed) == 'ok'
+    assert breaker.stats()['probes'] == 2
+
+
+def test_cancelled_probe_only_frees_its_slot():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    open_breaker(clock, breaker)
+    clock.now += 30
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(breaker.call(asyncio.sleep, 60))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    assert breaker.state == HALF_OPEN
+    assert breaker.stats()['probes'] == 1
+    assert call(breaker, succeed) == 'ok'
+    assert breaker.stats()['probes'] == 2
@@ -0,0 +1,69 @@
+# Standard library imports
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import numpy as np
+import pytest
+from geopy.distance import geodesic
+
+# Local imports
+from footpaths import Footpaths, build_footpaths
+from spatial_index import SpatialIndex
+
+RADIUS = 400.0
+SPEED = 1.2
+# Haversine and geodesic distances differ by well under 0.5% at city scale
+TOLERANCE = 0.005
+
+
+@pytest.fixture(scope='module')
+def stops():
+    # A jittered 12 x 12 grid about 150 m apart, around the city centre
+    rng = random.Random(0)
+    lats, lons = [], []
+    for row in range(12):
+        for column in range(12):
+            lats.append(44.83 + row * 0.00135 + rng.uniform(-0.0003, 0.0003))
+            lons.append(-0.59 + column * 0.0019 + rng.uniform(-0.0004, 0.0004))
+    return np.array(lats), np.array(lons)
+
+
+@pytest.fixture(scope='module')
+def footpaths(stops):
+    return build_footpaths(SpatialIndex(*stops), RADIUS, SPEED)
+
+
+def test_footpaths_match_geodesic_brute_force(stops, footpaths):
+    points = list(zip(*(coordinates.tolist() for coordinates in stops)))
+    for stop, point in enumerate(points):
+        lo, hi = int(footpaths.offsets[stop]), int(footpaths.offsets[stop + 1])
+        found = dict(zip(footpaths.neighbours[lo:hi].tolist(), footpaths.distances[lo:hi].tolist()))
+        assert stop not in found
+        for other, other_point in enumerate(points):
+            if other == stop:
+                continue
+            meters = geodesic(point, other_point).meters
+            if other in found:
+                assert found[other] == pytest.approx(meters, rel=TOLERANCE, abs=0.5)
+            else:
+                assert meters >= RADIUS * (1 - TOLERANCE)
+
+
+def test_footpaths_are_nearest_first_with_walking_times(footpaths):
+    for stop in range(len(footpaths.offsets) - 1):
+        distances = footpaths.distances[footpaths.offsets[stop]:footpaths.offsets[stop + 1]]
+        assert np.all(np.diff(distances) >= 0)
+    assert np.array_equal(footpaths.seconds, np.ceil(footpaths.distances / SPEED).astype(np.int32))
+
+
+def test_footpaths_save_and_load(tmp_path, footpaths):
+    footpaths.save(str(tmp_path))
+    loaded = Footpaths.load(str(tmp_path))
+
+    assert loaded.radius == RADIUS and loaded.speed == SPEED
+    for name in ('offsets', 'neighbours', 'distances', 'seconds'):
+        assert np.array_equal(getattr(loaded, name), getattr(footpaths, name))
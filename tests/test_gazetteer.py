@@ -0,0 +1,67 @@
+# Standard library imports
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import pytest
+
+# Local imports
+from gazetteer import Gazetteer, Place, load_gazetteer
+
+PLACES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'places.csv')
+
+STOPS_TXT = [
+    'stop_id,stop_name,stop_lat,stop_lon,location_type',
+    'S1,Gambetta,44.8408,-0.5806,0',
+    'S2,Quinconces,44.8446,-0.5736,0',
+    'S3,Victoire,44.8311,-0.5725,0',
+    'S4,Ornano,44.8371,-0.5890,0',
+]
+
+
+def test_stop_sharing_a_landmark_name_is_kept():
+    gazetteer = Gazetteer()
+    gazetteer.add(Place('Place Gambetta', 44.8410, -0.5810, 'place'), ['Gambetta'])
+    gazetteer.add(Place('Gambetta', 44.8408, -0.5806, 'stop'))
+
+    assert [place.kind for place in gazetteer.places] == ['place', 'stop']
+    assert gazetteer.lookup('Gambetta').name == 'Place Gambetta'
+    assert gazetteer.lookup('gambetta', kind='stop') == Place('Gambetta', 44.8408, -0.5806, 'stop')
+    assert gazetteer.lookup('Place Gambetta', kind='stop') is None
+    assert gazetteer.lookup('Gambeta', kind='stop').name == 'Gambetta'
+
+
+def test_same_kind_first_source_wins():
+    gazetteer = Gazetteer()
+    gazetteer.add(Place('Gambetta', 44.8408, -0.5806, 'stop'))
+    gazetteer.add(Place('Gambetta', 44.0, -0.5, 'stop'))
+
+    assert len(gazetteer) == 1
+    assert gazetteer.lookup('Gambetta', kind='stop').lat == 44.8408
+
+
+def test_gtfs_stops_load_alongside_landmarks(tmp_path):
+    stops_path = tmp_path / 'stops.txt'
+    stops_path.write_text('\n'.join(STOPS_TXT), encoding='utf-8')
+
+    gazetteer = load_gazetteer(PLACES_PATH, str(stops_path))
+
+    stops = sorted(place.name for place in gazetteer.places if place.kind == 'stop')
+    assert stops == ['Gambetta', 'Ornano', 'Quinconces', 'Victoire']
+    assert gazetteer.lookup('Victoire', kind='place').name == 'Place de la Victoire'
+
+
+@pytest.mark.parametrize('address', ['rue saint jean', 'rue de la victoire'])
+def test_street_address_is_not_matched_to_a_landmark(address):
+    gazetteer = load_gazetteer(PLACES_PATH, None)
+
+    assert gazetteer.lookup(address, fuzzy=False) is None
+
+
+def test_exact_names_and_aliases_match_without_fuzzy():
+    gazetteer = load_gazetteer(PLACES_PATH, None)
+
+    assert gazetteer.lookup('gare saint jean', fuzzy=False).name == 'Gare Saint-Jean'
+    assert gazetteer.lookup('Victoire', fuzzy=False).name == 'Place de la Victoire'
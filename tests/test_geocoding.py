@@ -0,0 +1,81 @@
+# Standard library imports
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from geocoding import AddressStore, Geocoder
+
+
+def make_geocoder(path, results, **kwargs):
+    geocoder = Geocoder(lambda: None, str(path), **kwargs)
+    calls = []
+
+    async def fake_nominatim(address):
+        calls.append(address)
+        return results.get(address)
+
+    geocoder._geocode = fake_nominatim
+    return geocoder, calls
+
+
+def test_found_address_is_cached(tmp_path):
+    found = {
+        '12 cours de l\'Intendance': SimpleNamespace(latitude=44.84, longitude=-0.577, address='Intendance')
+    }
+    geocoder, calls = make_geocoder(tmp_path / 'cache.sqlite3', found)
+
+    first = asyncio.run(geocoder.geocode('12 cours de l\'Intendance'))
+    second = asyncio.run(geocoder.geocode('12 Cours de l\'Intendance'))
+
+    assert first == second == {'lat': 44.84, 'lon': -0.577, 'name': 'Intendance'}
+    assert len(calls) == 1
+    geocoder.close()
+
+
+def test_address_not_found_is_not_looked_up_again(tmp_path):
+    geocoder, calls = make_geocoder(tmp_path / 'cache.sqlite3', {})
+
+    assert asyncio.run(geocoder.geocode('rue qui n existe pas')) is None
+    assert asyncio.run(geocoder.geocode('Rue qui n\'existe pas')) is None
+
+    assert len(calls) == 1
+    stats = geocoder.stats()
+    assert stats['not_found_cached'] == 1 and stats['not_found_hits'] == 1
+    geocoder.close()
+
+
+def test_address_not_found_survives_a_restart(tmp_path):
+    path = tmp_path / 'cache.sqlite3'
+    geocoder, calls = make_geocoder(path, {})
+    asyncio.run(geocoder.geocode('rue inconnue'))
+    geocoder.close()
+
+    restarted, calls = make_geocoder(path, {})
+    assert asyncio.run(restarted.geocode('rue inconnue')) is None
+    assert calls == []
+    restarted.close()
+
+
+def test_address_not_found_expires(tmp_path):
+    geocoder, calls = make_geocoder(tmp_path / 'cache.sqlite3', {}, not_found_ttl=0.0)
+
+    asyncio.run(geocoder.geocode('rue inconnue'))
+    asyncio.run(geocoder.geocode('rue inconnue'))
+
+    assert len(calls) == 2
+    geocoder.close()
+
+
+def test_store_drops_expired_not_found_entries(tmp_path):
+    store = AddressStore(str(tmp_path / 'cache.sqlite3'))
+    store.put_not_found('old', -1.0)
+    store.put_not_found('new', 60.0)
+
+    assert not store.is_not_found('old')
+    assert store.is_not_found('new')
+    assert store._conn.execute("SELECT COUNT(*) FROM geocoding_not_found").fetchone()[0] == 1
+    store.close()
@@ -0,0 +1,64 @@
+# Standard library imports
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from gtfs_static import CACHE_FORMAT, Timetable, route_mode
+
+
+def make_timetable() -> Timetable:
+    # Two stops served by a tram, a bus and a ferry, one trip each
+    route_types = [0, 3, 1200]
+    times = np.array([8 * 3600, 8 * 3600 + 300] * 3, dtype=np.int32)
+    return Timetable.build(
+        {
+            'stop_lats': np.array([44.84, 44.85]),
+            'stop_lons': np.array([-0.57, -0.56]),
+            'trip_route': np.array([0, 1, 2], dtype=np.int32),
+            'trip_service': np.zeros(3, dtype=np.int32),
+            'trip_headsign': np.zeros(3, dtype=np.int32),
+        },
+        np.array([0, 0, 1, 1, 2, 2], dtype=np.int32),
+        np.array([0, 1] * 3, dtype=np.int32),
+        np.array([0, 1] * 3, dtype=np.int32),
+        times,
+        times,
+        {
+            'format': CACHE_FORMAT,
+            'stop_ids': ['S1', 'S2'],
+            'stop_names': ['Quinconces', 'Stalingrad'],
+            'route_ids': ['T', 'B', 'F'],
+            'route_short_names': ['A', '1', 'BAT3'],
+            'route_long_names': [''] * 3,
+            'route_types': route_types,
+            'headsigns': ['Stalingrad'],
+            'services': ['ALL'],
+            'calendar': {0: [127, 20000101, 20991231]},
+            'exceptions': [],
+        }
+    )
+
+
+def test_route_mode_of_basic_and_extended_types():
+    assert route_mode(0) == 'tram'
+    assert route_mode(3) == 'bus'
+    assert route_mode(4) == 'ferry'
+    assert route_mode(900) == 'tram'
+    assert route_mode(1200) == 'ferry'
+    assert route_mode(715) == 'bus'
+    assert route_mode(99) == 'bus'
+
+
+def test_scheduled_departures_carry_the_route_mode():
+    timetable = make_timetable()
+
+    departures = timetable.next_departures([0, 1, 2], [0], date(2026, 10, 20), 7 * 3600)
+
+    assert sorted((d.line, d.type) for d in departures) == [('1', 'bus'), ('A', 'tram'), ('BAT3', 'ferry')]
+    assert all(d.time == '08:00' for d in departures)
@@ -0,0 +1,158 @@
+# Standard library imports
+import asyncio
+import os
+import random
+import sys
+from collections import Counter
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from reminders import Reminder, ReminderScheduler, next_fire_time
+
+TIMEZONE = ZoneInfo('Europe/Paris')
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def at(day: int, hour: int, minute: int, second: int = 0) -> float:
+    return datetime(2026, 10, day, hour, minute, second, tzinfo=TIMEZONE).timestamp()
+
+
+def make_scheduler(clock, calls=None):
+    async def on_due(stop, reminders):
+        if calls is not None:
+            calls.append((clock.now, stop, list(reminders)))
+
+    return ReminderScheduler(on_due, TIMEZONE, clock=clock)
+
+
+def test_pop_due_groups_by_stop_and_reschedules_next_day():
+    clock = FakeClock(at(20, 7, 0))
+    scheduler = make_scheduler(clock)
+    first = Reminder(1, 'A', 'Gambetta', '07:45')
+    second = Reminder(2, 'B', 'gambetta', '07:45')
+    other = Reminder(3, 'C', 'Victoire', '07:45')
+    later = Reminder(4, 'A', 'Gambetta', '08:00')
+    for reminder in (first, second, other, later):
+        scheduler.add(reminder)
+
+    assert scheduler.next_fire() == at(20, 7, 45)
+    assert scheduler.pop_due(at(20, 7, 44, 59)) == {}
+
+    due = scheduler.pop_due(at(20, 7, 45))
+    assert sorted(due) == ['gambetta', 'victoire']
+    assert sorted(due['gambetta']) == [first, second]
+    assert due['victoire'] == [other]
+    assert scheduler.next_fire() == at(20, 8, 0)
+    assert scheduler.add(first) == at(21, 7, 45)
+
+
+def test_run_due_fires_each_stop_once_in_time_order():
+    clock = FakeClock(at(20, 0, 0, 30))
+    calls = []
+    scheduler = make_scheduler(clock, calls)
+    rng = random.Random(1)
+    reminders = list({
+        Reminder(
+            rng.randrange(1000),
+            str(rng.randrange(1, 10)),
+            f"Stop {rng.randrange(20)}",
+            f"{rng.randrange(24):02d}:{rng.randrange(60):02d}"
+        )
+        for _ in range(300)
+    })
+    for reminder in reminders:
+        scheduler.add(reminder)
+
+    async def run_two_days():
+        for _ in range(2 * 24 * 60):
+            clock.now += 60
+            await scheduler.run_due()
+
+    asyncio.run(run_two_days())
+
+    fired = Counter(reminder for _, _, batch in calls for reminder in batch)
+    assert all(fired[reminder] == 2 for reminder in reminders)
+    assert sum(fired.values()) == scheduler.fired == 2 * len(reminders)
+    batches = Counter((now, stop) for now, stop, _ in calls)
+    assert all(count == 1 for count in batches.values())
+    times = [now for now, _, _ in calls]
+    assert times == sorted(times)
+    for now, _, batch in calls:
+        local = datetime.fromtimestamp(now, TIMEZONE)
+        assert {reminder.time for reminder in batch} == {f"{local.hour:02d}:{local.minute:02d}"}
+
+
+def test_removed_reminder_never_fires():
+    clock = FakeClock(at(20, 7, 0))
+    calls = []
+    scheduler = make_scheduler(clock, calls)
+    kept = Reminder(1, 'A', 'Gambetta', '07:45')
+    removed = Reminder(2, 'A', 'Gambetta', '07:45')
+    scheduler.add(kept)
+    scheduler.add(removed)
+
+    assert scheduler.remove(removed)
+    assert not scheduler.remove(removed)
+    assert removed not in scheduler and len(scheduler) == 1
+    assert asyncio.run(scheduler.run_due(at(20, 7, 45))) == 1
+    assert calls == [(clock.now, 'Gambetta', [kept])]
+
+
+def test_many_removals_compact_the_heap():
+    clock = FakeClock(at(20, 7, 0))
+    scheduler = make_scheduler(clock)
+    reminders = [Reminder(user_id, 'A', 'Gambetta', '07:45') for user_id in range(500)]
+    for reminder in reminders:
+        scheduler.add(reminder)
+    for reminder in reminders[:450]:
+        scheduler.remove(reminder)
+
+    assert scheduler.stats()['heap'] <= 2 * len(scheduler) + 64
+    assert sorted(scheduler.pop_due(at(20, 7, 45))['gambetta']) == reminders[450:]
+
+
+def test_reminders_past_the_grace_period_are_skipped_and_rescheduled():
+    clock = FakeClock(at(20, 7, 0))
+    calls = []
+    scheduler = make_scheduler(clock, calls)
+    reminder = Reminder(1, 'A', 'Gambetta', '07:45')
+    scheduler.add(reminder)
+
+    assert asyncio.run(scheduler.run_due(at(20, 9, 0))) == 0
+    assert calls == [] and scheduler.skipped == 1
+    assert scheduler.next_fire() == at(21, 7, 45)
+
+
+def test_failed_batch_does_not_stop_the_others():
+    clock = FakeClock(at(20, 7, 0))
+    delivered = []
+
+    async def on_due(stop, reminders):
+        if stop == 'Gambetta':
+            raise RuntimeError('send failed')
+        delivered.append(stop)
+
+    scheduler = ReminderScheduler(on_due, TIMEZONE, clock=clock)
+    scheduler.add(Reminder(1, 'A', 'Gambetta', '07:45'))
+    scheduler.add(Reminder(2, 'A', 'Victoire', '07:45'))
+
+    assert asyncio.run(scheduler.run_due(at(20, 7, 45))) == 2
+    assert delivered == ['Victoire']
+
+
+def test_next_fire_time_keeps_local_time_across_dst():
+    # Clocks go back on 25 October 2026 in Paris
+    fire_at = next_fire_time('07:45', at(24, 8, 0), TIMEZONE)
+
+    assert fire_at == at(25, 7, 45)
+    assert fire_at - at(24, 7, 45) == 25 * 3600
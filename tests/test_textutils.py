@@ -0,0 +1,37 @@
+# Standard library imports
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from textutils import MAX_MESSAGE_LENGTH, fold, split_message
+
+
+def utf16_length(text):
+    return len(text.encode('utf-16-le')) // 2
+
+
+def test_fold_ignores_case_accents_and_punctuation():
+    assert fold("Gare Saint-Jean") == fold("GARE SAINT JEAN ") == 'gare saint jean'
+    assert fold("Hôtel de Ville") == 'hotel de ville'
+
+
+def test_short_text_is_one_message():
+    assert split_message('A - La Gardette\nB - Pessac') == ['A - La Gardette\nB - Pessac']
+
+
+def test_long_list_is_split_between_lines():
+    lines = [f"• Stop {i} - Bordeaux Centre" for i in range(1000)]
+
+    chunks = split_message('\n'.join(lines))
+
+    assert len(chunks) > 1
+    assert all(utf16_length(chunk) <= MAX_MESSAGE_LENGTH for chunk in chunks)
+    assert [line for chunk in chunks for line in chunk.split('\n')] == lines
+
+
+def test_overlong_line_is_cut_at_the_limit():
+    chunks = split_message('title\n' + '😀' * 10, limit=8)
+
+    assert chunks == ['title', '😀' * 4, '😀' * 4, '😀' * 2]
@@ -0,0 +1,77 @@
+# Standard library imports
+import re
+import unicodedata
+from typing import List
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+# Telegram's limit on a message's text, in UTF-16 code units
+MAX_MESSAGE_LENGTH = 4096
+
+
+def fold(text: str) -> str:
+    """Normalize free text for lookups.
+
+    Lowercases, strips accents and collapses punctuation and whitespace, so
+    that "Gare Saint-Jean", "gare saint jean" and "GARE ST-JEAN " differ
+    only where the words differ.
+
+    Args:
+        text: The text to normalize
+
+    Returns:
+        str: The folded text
+    """
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(' ', stripped).strip()
+
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _cut(line: str, limit: int) -> int:
+    # Index of the first character past `limit` UTF-16 code units
+    units = 0
+    for index, char in enumerate(line):
+        units += 2 if ord(char) > 0xFFFF else 1
+        if units > limit:
+            return index
+    return len(line)
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Split a long text into messages Telegram accepts.
+
+    Texts are cut between lines; a single line longer than the limit is cut
+    where it reaches it.
+
+    Args:
+        text: The message text
+        limit: Maximum length of a message, in UTF-16 code units
+
+    Returns:
+        List[str]: The messages, in order; the text itself if short enough
+    """
+    if _utf16_length(text) <= limit:
+        return [text]
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in text.split('\n'):
+        length = _utf16_length(line)
+        if current and size + 1 + length > limit:
+            chunks.append('\n'.join(current))
+            current, size = [], 0
+        while length > limit:
+            cut = _cut(line, limit)
+            chunks.append(line[:cut])
+            line = line[cut:]
+            length = _utf16_length(line)
+        size += length + (1 if current else 0)
+        current.append(line)
+    if current:
+        chunks.append('\n'.join(current))
+    return chunks
@@ -0,0 +1,51 @@
+"""Rebuild the stop-to-stop walking transfers of the timetable cache.
+
+Computes every stop pair within the walking radius with the grid index and
+writes the CSR adjacency next to the compiled timetable. The adjacency is
+checked against a brute-force geodesic scan by tests/test_footpaths.py.
+
+Usage:
+    python tools/build_footpaths.py data/gtfs.zip data/cache [--radius 400] [--speed 1.2]
+"""
+# Standard library imports
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from footpaths import FOOTPATH_RADIUS, WALKING_SPEED, Footpaths, build_footpaths
+from gtfs_static import cache_directory, load_timetable
+from spatial_index import SpatialIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('gtfs_path')
+    parser.add_argument('cache_root')
+    parser.add_argument('--radius', type=float, default=FOOTPATH_RADIUS, help='meters')
+    parser.add_argument('--speed', type=float, default=WALKING_SPEED, help='meters per second')
+    args = parser.parse_args()
+
+    timetable = load_timetable(args.gtfs_path, args.cache_root)
+    if timetable is None:
+        raise SystemExit(f"No GTFS zip at {args.gtfs_path}")
+    directory = cache_directory(args.gtfs_path, args.cache_root)
+
+    start = time.perf_counter()
+    footpaths = build_footpaths(SpatialIndex(timetable.stop_lats, timetable.stop_lons), args.radius, args.speed)
+    footpaths.save(directory)
+    print(
+        f"{len(footpaths)} transfers between {len(footpaths.offsets) - 1} stops "
+        f"written to {directory} in {time.perf_counter() - start:.2f} s"
+    )
+
+    start = time.perf_counter()
+    Footpaths.load(directory)
+    print(f"Mapped back in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Compile a GTFS zip into the memory-mappable timetable cache.
+
+The walking transfers between stops are computed into the same directory;
+see tools/build_footpaths.py to rebuild them alone.
+
+Usage:
+    python tools/build_timetable.py data/gtfs.zip data/cache
+"""
+# Standard library imports
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local imports
+from footpaths import build_footpaths
+from gtfs_static import Timetable, cache_directory
+from spatial_index import SpatialIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('gtfs_path')
+    parser.add_argument('cache_root')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    timetable = Timetable.from_gtfs(args.gtfs_path)
+    directory = cache_directory(args.gtfs_path, args.cache_root)
+    timetable.save(directory)
+    footpaths = build_footpaths(SpatialIndex(timetable.stop_lats, timetable.stop_lons))
+    footpaths.save(directory)
+    print(
+        f"{timetable.trip_count} trips, {timetable.stop_time_count} stop times "
+        f"and {len(footpaths)} footpaths compiled to {directory} in {time.perf_counter() - start:.1f} s"
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Local fixture server replaying recorded realtime feed snapshots.
+
+Serves the JSON files of a directory, in name order, at /feed. Each request
+returns the next snapshot (wrapping around), or with --period the snapshot
+advances on a timer instead. Point the bot at it with:
+
+    REALTIME_FEED_URL=http://127.0.0.1:8081/feed
+
+Usage:
+    python tools/replay_feed_server.py data/fixtures/realtime [--port 8081] [--period 30] [--delay 0.2]
+"""
+# Standard library imports
+import argparse
+import asyncio
+import glob
+import os
+import time
+from typing import List
+
+# Third-party imports
+from aiohttp import web
+
+
+def load_snapshots(directory: str) -> List[bytes]:
+    paths = sorted(glob.glob(os.path.join(directory, '*.json')))
+    if not paths:
+        raise SystemExit(f"No *.json snapshots in {directory}")
+    snapshots = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            snapshots.append(f.read())
+    return snapshots
+
+
+def make_app(snapshots: List[bytes], period: float, delay: float) -> web.Application:
+    state = {'served': 0, 'started': time.monotonic()}
+
+    async def feed(request: web.Request) -> web.Response:
+        if delay:
+            await asyncio.sleep(delay)
+        if period:
+            index = int((time.monotonic() - state['started']) // period)
+        else:
+            index = state['served']
+        state['served'] += 1
+        body = snapshots[index % len(snapshots)]
+        return web.Response(body=body, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/feed', feed)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--period', type=float, default=0.0, help='seconds per snapshot; 0 advances per request')
+    parser.add_argument('--delay', type=float, default=0.0, help='artificial response delay in seconds')
+    args = parser.parse_args()
+    web.run_app(make_app(load_snapshots(args.directory), args.period, args.delay), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
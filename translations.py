@@ -31,7 +31,10 @@ TRANSLATIONS = {
             "Fonctionnalités avancées:\n"
             "• /route <départ> <arrivée> - Itinéraire\n"
             "• /favorites - Gérer vos arrêts favoris\n"
+            "• /add_favorite <arrêt> - Suivre les alertes d'un arrêt\n"
+            "• /remove_favorite <arrêt> - Ne plus suivre un arrêt\n"
             "• /reminder - Définir des rappels\n"
+            "• /delete_reminder - Supprimer un rappel\n"
             "• /settings - Paramètres du bot\n"
             "• /language - Changer la langue\n\n"
             "Exemples:\n"
@@ -55,17 +58,34 @@ TRANSLATIONS = {
         'error': "Désolé, une erreur s'est produite lors de la recherche.",
         'invalid_time': "Format d'heure invalide. Utilisez HH:MM",
         'reminder_set': "✅ Rappel configuré pour la ligne {} à l'arrêt {} à {}",
+        'reminder_deleted': "Rappel supprimé pour la ligne {} à l'arrêt {} à {}",
+        'reminder_not_found': "Aucun rappel correspondant.",
+        'reminder_title': "⏰ Ligne {} à {}",
         'no_favorites': "Vous n'avez pas encore d'arrêts favoris.",
         'favorite_added': "{} ajouté à vos favoris",
         'favorite_removed': "{} supprimé de vos favoris",
         'favorite_exists': "{} est déjà dans vos favoris",
         'favorite_not_found': "{} n'est pas dans vos favoris",
+        'favorites_title': "⭐ Vos arrêts favoris:",
+        'disruption_alert': "⚠️ {}",
+        'disruption_lines': "Lignes concernées: {}",
+        'disruption_resolved': "✅ Perturbation terminée: {}",
+        'status_title': "🚦 État du réseau",
+        'status_ok': "Aucune perturbation signalée",
+        'status_disrupted': "{} perturbation(s) en cours, lignes: {}",
+        'status_realtime': "Temps réel: mis à jour il y a {} s",
+        'status_realtime_stale': "Temps réel: indisponible",
         'settings_updated': "✅ Paramètre '{}' mis à jour",
         'language_changed': "✅ Langue changée en français",
         'select_language': "Choisissez votre langue / Choose your language / Elija su idioma:",
         'next_bus_title': "Prochains passages à {}",
         'stops_title': "Arrêts de la ligne {}",
         'schedule_title': "Horaires de la ligne {} à {}",
+        'nearby_title': "Arrêts à proximité de {}",
+        'route_title': "Itinéraires de {} à {}",
+        'route_option': "{} → {} ({} min, {} correspondance(s))",
+        'route_ride': "🚌 {} {} → {} {} (ligne {}, direction {})",
+        'route_walk': "🚶 {} min à pied jusqu'à {}",
         'no_schedule_params': "Veuillez spécifier une ligne et un arrêt. Exemple: /times 1 Gambetta",
         'api_error': "Désolé, une erreur s'est produite lors de la communication avec l'API de transport.",
         'timeout_error': "La requête a pris trop de temps. Veuillez réessayer.",
@@ -76,6 +96,15 @@ TRANSLATIONS = {
         'invalid_time_format': "Format d'heure invalide. Utilisez HH:MM",
         'no_departures': "Aucun départ prévu pour le moment.",
         'no_lines': "Aucune ligne de transport disponible.",
+        'set_location': "📍 Définir ma position",
+        'change_location': "📍 Changer de position",
+        'get_transport': "🚌 Prochains départs",
+        'current_location': "📍 Position enregistrée: {}",
+        'no_transport': "Aucun départ trouvé près de votre position.",
+        'transport_info': "🚌 Prochains départs près de {}:",
+        'departure_row': "{line} - {destination} ({time})",
+        'reminder_row': "{time} - {destination}",
+        'stale_departures': "⚠️ API de transport indisponible, horaires d'il y a {} min",
     },
     'en': {
         'welcome': (
@@ -109,7 +138,10 @@ TRANSLATIONS = {
             "Advanced features:\n"
             "• /route <start> <end> - Route planning\n"
             "• /favorites - Manage favorite stops\n"
+            "• /add_favorite <stop> - Follow a stop's alerts\n"
+            "• /remove_favorite <stop> - Stop following a stop\n"
             "• /reminder - Set reminders\n"
+            "• /delete_reminder - Delete a reminder\n"
             "• /settings - Bot settings\n"
             "• /language - Change language\n\n"
             "Examples:\n"
@@ -133,17 +165,34 @@ TRANSLATIONS = {
         'error': "Sorry, an error occurred during the search.",
         'invalid_time': "Invalid time format. Use HH:MM",
         'reminder_set': "✅ Reminder set for line {} at stop {} at {}",
+        'reminder_deleted': "Reminder deleted for line {} at stop {} at {}",
+        'reminder_not_found': "No matching reminder.",
+        'reminder_title': "⏰ Line {} at {}",
         'no_favorites': "You don't have any favorite stops yet.",
         'favorite_added': "{} added to your favorites",
         'favorite_removed': "{} removed from your favorites",
         'favorite_exists': "{} is already in your favorites",
         'favorite_not_found': "{} is not in your favorites",
+        'favorites_title': "⭐ Your favorite stops:",
+        'disruption_alert': "⚠️ {}",
+        'disruption_lines': "Affected lines: {}",
+        'disruption_resolved': "✅ Disruption over: {}",
+        'status_title': "🚦 Network status",
+        'status_ok': "No disruptions reported",
+        'status_disrupted': "{} ongoing disruption(s), lines: {}",
+        'status_realtime': "Real time: updated {} s ago",
+        'status_realtime_stale': "Real time: unavailable",
         'settings_updated': "✅ Setting '{}' updated",
         'language_changed': "✅ Language changed to English",
         'select_language': "Choose your language / Choisissez votre langue / Elija su idioma:",
         'next_bus_title': "Next departures at {}",
         'stops_title': "Stops for line {}",
         'schedule_title': "Schedule for line {} at {}",
+        'nearby_title': "Stops near {}",
+        'route_title': "Routes from {} to {}",
+        'route_option': "{} → {} ({} min, {} transfer(s))",
+        'route_ride': "🚌 {} {} → {} {} (line {}, towards {})",
+        'route_walk': "🚶 {} min walk to {}",
         'no_schedule_params': "Please specify a line and stop. Example: /times 1 Gambetta",
         'api_error': "Sorry, an error occurred while communicating with the transport API.",
         'timeout_error': "The request took too long. Please try again.",
@@ -154,6 +203,15 @@ TRANSLATIONS = {
         'invalid_time_format': "Invalid time format. Use HH:MM",
         'no_departures': "No departures scheduled at the moment.",
         'no_lines': "No transport lines available.",
+        'set_location': "📍 Set my location",
+        'change_location': "📍 Change location",
+        'get_transport': "🚌 Next departures",
+        'current_location': "📍 Saved location: {}",
+        'no_transport': "No departures found near your location.",
+        'transport_info': "🚌 Next departures near {}:",
+        'departure_row': "{line} - {destination} ({time})",
+        'reminder_row': "{time} - {destination}",
+        'stale_departures': "⚠️ Transport API unavailable, departures from {} min ago",
     },
     'es': {
         'welcome': (
@@ -187,7 +245,10 @@ TRANSLATIONS = {
             "Características avanzadas:\n"
             "• /route <inicio> <fin> - Planificación de rutas\n"
             "• /favorites - Gestionar paradas favoritas\n"
+            "• /add_favorite <parada> - Seguir las alertas de una parada\n"
+            "• /remove_favorite <parada> - Dejar de seguir una parada\n"
             "• /reminder - Establecer recordatorios\n"
+            "• /delete_reminder - Eliminar un recordatorio\n"
             "• /settings - Configuración del bot\n"
             "• /language - Cambiar idioma\n\n"
             "Ejemplos:\n"
@@ -211,17 +272,34 @@ TRANSLATIONS = {
         'error': "Lo sentimos, ocurrió un error durante la búsqueda.",
         'invalid_time': "Formato de hora inválido. Use HH:MM",
         'reminder_set': "✅ Recordatorio configurado para la línea {} en la parada {} a las {}",
+        'reminder_deleted': "Recordatorio eliminado para la línea {} en la parada {} a las {}",
+        'reminder_not_found': "Ningún recordatorio coincidente.",
+        'reminder_title': "⏰ Línea {} en {}",
         'no_favorites': "Aún no tiene paradas favoritas.",
         'favorite_added': "{} añadido a sus favoritos",
         'favorite_removed': "{} eliminado de sus favoritos",
         'favorite_exists': "{} ya está en sus favoritos",
         'favorite_not_found': "{} no está en sus favoritos",
+        'favorites_title': "⭐ Sus paradas favoritas:",
+        'disruption_alert': "⚠️ {}",
+        'disruption_lines': "Líneas afectadas: {}",
+        'disruption_resolved': "✅ Disrupción terminada: {}",
+        'status_title': "🚦 Estado de la red",
+        'status_ok': "No hay disrupciones reportadas",
+        'status_disrupted': "{} disrupción(es) en curso, líneas: {}",
+        'status_realtime': "Tiempo real: actualizado hace {} s",
+        'status_realtime_stale': "Tiempo real: no disponible",
         'settings_updated': "✅ Configuración '{}' actualizada",
         'language_changed': "✅ Idioma cambiado a español",
         'select_language': "Choose your language / Choisissez votre langue / Elija su idioma:",
         'next_bus_title': "Próximas salidas en {}",
         'stops_title': "Paradas de la línea {}",
         'schedule_title': "Horario de la línea {} en {}",
+        'nearby_title': "Paradas cerca de {}",
+        'route_title': "Rutas de {} a {}",
+        'route_option': "{} → {} ({} min, {} transbordo(s))",
+        'route_ride': "🚌 {} {} → {} {} (línea {}, dirección {})",
+        'route_walk': "🚶 {} min a pie hasta {}",
         'no_schedule_params': "Por favor, especifique una línea y una parada. Ejemplo: /times 1 Gambetta",
         'api_error': "Lo sentimos, ocurrió un error al comunicarse con la API de transporte.",
         'timeout_error': "La solicitud tomó demasiado tiempo. Por favor, inténtelo de nuevo.",
@@ -232,5 +310,14 @@ TRANSLATIONS = {
         'invalid_time_format': "Formato de hora inválido. Use HH:MM",
         'no_departures': "No hay salidas programadas en este momento.",
         'no_lines': "No hay líneas de transporte disponibles.",
+        'set_location': "📍 Definir mi ubicación",
+        'change_location': "📍 Cambiar de ubicación",
+        'get_transport': "🚌 Próximas salidas",
+        'current_location': "📍 Ubicación guardada: {}",
+        'no_transport': "No se encontraron salidas cerca de su ubicación.",
+        'transport_info': "🚌 Próximas salidas cerca de {}:",
+        'departure_row': "{line} - {destination} ({time})",
+        'reminder_row': "{time} - {destination}",
+        'stale_departures': "⚠️ API de transporte no disponible, salidas de hace {} min",
     }
 } 
\ No newline at end of file
@@ -0,0 +1,150 @@
+# Standard library imports
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+# Third-party imports
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+# Local imports
+from upstream import deadline
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def chat_key(update: object) -> Optional[Hashable]:
+    """Return the key whose updates must be processed in order.
+
+    Args:
+        update: The update
+
+    Returns:
+        Optional[Hashable]: The chat ID, the user ID without a chat, or None
+    """
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    if update.effective_user is not None:
+        return update.effective_user.id
+    return None
+
+
+class OrderedUpdateProcessor(BaseUpdateProcessor):
+    """Processes updates concurrently, but one at a time per chat.
+
+    Each update waits for the previous update of its chat to finish, then
+    for one of ``concurrency`` processing slots, so a chat sending several
+    commands in a row holds at most one slot and never delays other chats.
+    An update whose handlers run longer than ``timeout`` is cancelled, so a
+    hung upstream request cannot pin a slot. Handlers run with a deadline
+    ``reserve`` seconds before that, which upstream calls respect, so they
+    give up in time for the handler to reply. Callbacks added with
+    :meth:`add_done_callback` are called once each update is done.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 64,
+        timeout: float = 30.0,
+        reserve: float = 2.0,
+        max_pending: int = 10000,
+        key: Callable[[object], Optional[Hashable]] = chat_key,
+        on_timeout: Optional[Callable[[object], Awaitable[None]]] = None
+    ) -> None:
+        """Configure the processor.
+
+        Args:
+            concurrency: Maximum number of updates processed at once
+            timeout: Seconds an update may take before it is cancelled
+            reserve: Seconds of the timeout left to handlers after the
+                deadline of their upstream calls
+            max_pending: Maximum number of updates admitted, waiting or
+                processed; the Application holds the others back
+            key: Returns the ordering key of an update, None for unordered
+            on_timeout: Coroutine called with an update that timed out
+        """
+        # The base class semaphore only bounds admission; slots are taken in
+        # do_process_update, after waiting for the chat's previous update
+        super().__init__(max_pending)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.reserve = min(reserve, timeout / 2)
+        self._key = key
+        self._on_timeout = on_timeout
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tails: Dict[Hashable, asyncio.Future] = {}
+        self._done_callbacks: List[Callable[[object], None]] = []
+        self.active = 0
+        self.processed = 0
+        self.timeouts = 0
+
+    def add_done_callback(self, callback: Callable[[object], None]) -> None:
+        """Call callback with every update once it is processed or dropped.
+
+        Args:
+            callback: Called with the update; it must not raise
+        """
+        self._done_callbacks.append(callback)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        # Claim the chat's tail before the first await, so updates keep the
+        # order in which the Application started them
+        key = self._key(update)
+        previous = done = None
+        if key is not None:
+            previous = self._tails.get(key)
+            done = self._tails[key] = asyncio.get_running_loop().create_future()
+        started = False
+        try:
+            if previous is not None:
+                await asyncio.shield(previous)
+            async with self._slots:
+                started = True
+                self.active += 1
+                try:
+                    # Handlers and the tasks they start inherit the deadline
+                    with deadline(self.timeout - self.reserve):
+                        await asyncio.wait_for(coroutine, self.timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    logger.error(f"Update processing timed out after {self.timeout} s (chat {key})")
+                    if self._on_timeout is not None:
+                        try:
+                            await self._on_timeout(update)
+                        except Exception as e:
+                            logger.error(f"Timeout handler failed: {str(e)}")
+                finally:
+                    self.active -= 1
+                    self.processed += 1
+        finally:
+            if not started and hasattr(coroutine, 'close'):
+                coroutine.close()  # cancelled while waiting
+            if done is not None:
+                if not done.done():
+                    done.set_result(None)
+                if self._tails.get(key) is done:
+                    del self._tails[key]
+            for callback in self._done_callbacks:
+                callback(update)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return slot usage and counters.
+
+        Returns:
+            Dict[str, Any]: Processor counters
+        """
+        return {
+            'active': self.active,
+            'concurrency': self.concurrency,
+            'chats': len(self._tails),
+            'processed': self.processed,
+            'timeouts': self.timeouts
+        }
@@ -0,0 +1,256 @@
+# Standard library imports
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Monotonic time by which the current update must be answered
+_deadline: ContextVar[Optional[float]] = ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when the current deadline leaves no time for an upstream call."""
+    pass
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """Set the deadline of the current task and the tasks it starts.
+
+    An enclosing deadline that expires earlier is kept.
+
+    Args:
+        seconds: Seconds from now
+
+    Yields:
+        float: The deadline, in ``time.monotonic()`` time
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None and current < at:
+        at = current
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def no_deadline() -> Iterator[None]:
+    """Clear the deadline, for tasks started inside.
+
+    For work shared by callers with different deadlines: it runs with the
+    timeouts of its own calls, and each caller waits for it with
+    :func:`within_deadline`.
+    """
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Return the seconds left before the current deadline.
+
+    Returns:
+        Optional[float]: Seconds, negative once passed, or None without a
+        deadline (background jobs)
+    """
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def budget(timeout: float) -> float:
+    """Return the time an upstream call may take.
+
+    Args:
+        timeout: The call's own timeout
+
+    Returns:
+        float: The timeout, or less if the deadline is closer
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return min(timeout, left)
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await something, giving up when the current deadline passes.
+
+    Args:
+        awaitable: The call to wait for; it is cancelled on expiry
+
+    Returns:
+        T: Its result
+
+    Raises:
+        DeadlineExceeded: If the deadline passed first
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        if left <= 0:
+            raise asyncio.TimeoutError
+        return await asyncio.wait_for(awaitable, left)
+    except asyncio.TimeoutError:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()  # never started if the deadline had passed
+        raise DeadlineExceeded("Deadline exceeded") from None
+
+
+async def backoff(attempt: int, base: float, cap: float) -> None:
+    """Sleep before a retry, for a jittered exponential delay.
+
+    The delay is drawn uniformly between 0 and ``base * 2 ** attempt``
+    (at most ``cap``), so clients that failed together do not retry
+    together.
+
+    Args:
+        attempt: Number of the failed attempt, from 0
+        base: Maximum delay after the first failure, in seconds
+        cap: Maximum delay, in seconds
+
+    Raises:
+        DeadlineExceeded: If the delay would pass the current deadline
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    left = remaining()
+    if left is not None and delay >= left:
+        raise DeadlineExceeded("No time left to retry")
+    await asyncio.sleep(delay)
+
+
+class Hedger:
+    """Sends a second request when the first is slower than usual.
+
+    If a call has not completed after the ``quantile`` of recent call
+    latencies, the same call is started again and the first success wins;
+    the other call is cancelled. At most ``max_ratio`` of calls are hedged,
+    so an upstream that is slow for everyone does not get twice the load.
+    Only use it for idempotent calls. When disabled, calls go straight
+    through.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        quantile: float = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+        max_ratio: float = 0.1,
+        min_delay: float = 0.01
+    ) -> None:
+        """Configure hedging.
+
+        Args:
+            enabled: Whether to hedge at all
+            quantile: Latency quantile after which a call is hedged
+            window: Number of recent latencies the quantile is taken over
+            min_samples: Latencies needed before hedging starts
+            max_ratio: Maximum share of calls hedged
+            min_delay: Minimum seconds before hedging
+        """
+        self.enabled = enabled
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._delay: Optional[float] = None
+        self._stale = 0
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> Optional[float]:
+        """Return how long a call runs before it is hedged.
+
+        Returns:
+            Optional[float]: Seconds, or None until enough calls were seen
+        """
+        if len(self._latencies) < self.min_samples:
+            return None
+        # Recomputed every few samples rather than on every call
+        if self._delay is None or self._stale >= self.min_samples:
+            ordered = sorted(self._latencies)
+            self._delay = max(self.min_delay, ordered[int(len(ordered) * self.quantile)])
+            self._stale = 0
+        return self._delay
+
+    async def _timed(self, func: Callable[..., Awaitable[T]], args: Any, kwargs: Any) -> T:
+        started = time.monotonic()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            # Failed and cancelled calls count too, up to when they ended:
+            # leaving out the slowest would lower the hedging delay
+            self._latencies.append(time.monotonic() - started)
+            self._stale += 1
+
+    async def call(self, func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Call func, hedging it if it is slow.
+
+        Args:
+            func: Coroutine function making an idempotent call
+            *args: Positional arguments of func
+            **kwargs: Keyword arguments of func
+
+        Returns:
+            T: The first successful result
+
+        Raises:
+            Exception: What the last call raised, if every call failed
+        """
+        if not self.enabled:
+            return await func(*args, **kwargs)
+        self.calls += 1
+        delay = self.delay()
+        tasks = [asyncio.ensure_future(self._timed(func, args, kwargs))]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self.hedged < self.max_ratio * self.calls:
+                    self.hedged += 1
+                    tasks.append(asyncio.ensure_future(self._timed(func, args, kwargs)))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedging counters.
+
+        Returns:
+            Dict[str, Any]: Hedger counters
+        """
+        return {
+            'calls': self.calls,
+            'hedged': self.hedged,
+            'hedge_wins': self.hedge_wins,
+            'hedge_delay': self._delay or 0.0
+        }
@@ -0,0 +1,234 @@
+# Standard library imports
+import asyncio
+import hmac
+import json
+import logging
+import signal
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Third-party imports
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application, ExtBot
+
+# Local imports
+from update_processor import OrderedUpdateProcessor
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class WebhookServer:
+    """aiohttp server receiving Telegram updates and queueing them.
+
+    Each POST on ``path`` is checked against the secret token, decoded and put
+    on the Application's update queue; the request is answered as soon as the
+    update is queued, so Telegram never waits on a handler. How many updates
+    are processed at once is up to the Application's update processor.
+    While ``max_pending`` updates are queued or being processed the server
+    answers 503, and Telegram delivers the update again later; updates are
+    counted as pending from when they are queued until the Application's
+    :class:`OrderedUpdateProcessor` reports them done.
+    ``health_path`` answers 200 while the Application is running, with queue
+    figures in the body.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        path: str = '/telegram',
+        secret_token: Optional[str] = None,
+        max_pending: int = 1000,
+        health_path: str = '/healthz',
+        health: Optional[Callable[[], Dict[str, Any]]] = None
+    ) -> None:
+        """Configure the server.
+
+        Args:
+            application: The Application processing the updates
+            path: URL path Telegram posts updates to
+            secret_token: Expected X-Telegram-Bot-Api-Secret-Token header
+            max_pending: Pending updates above which new ones are refused
+            health_path: URL path of the health endpoint
+            health: Callable returning extra figures for the health endpoint
+
+        Raises:
+            TypeError: If the Application does not use an OrderedUpdateProcessor
+        """
+        processor = application.update_processor
+        if not isinstance(processor, OrderedUpdateProcessor):
+            raise TypeError("WebhookServer needs an Application built with an OrderedUpdateProcessor")
+        processor.add_done_callback(self._update_done)
+        self.application = application
+        self.path = path
+        self.secret_token = secret_token
+        self.max_pending = max_pending
+        self.health_path = health_path
+        self._health = health
+        self._runner: Optional[web.AppRunner] = None
+        self.started_at: Optional[float] = None
+        self._pending = 0
+        self.received = 0
+        self.rejected = 0
+        self.invalid = 0
+
+    def make_app(self) -> web.Application:
+        """Build the aiohttp application.
+
+        Returns:
+            web.Application: Application serving the webhook and health paths
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self._handle_update)
+        app.router.add_get(self.health_path, self._handle_health)
+        return app
+
+    async def start(self, host: str = '0.0.0.0', port: int = 8080) -> None:
+        """Start listening.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind
+        """
+        if self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.started_at = time.monotonic()
+        logger.info(f"Webhook server listening on {host}:{port}{self.path}")
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        if self.secret_token is not None:
+            token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+            if not hmac.compare_digest(token, self.secret_token):
+                self.invalid += 1
+                return web.Response(status=403)
+        if request.content_type != 'application/json':
+            self.invalid += 1
+            return web.Response(status=415)
+
+        if self.pending() >= self.max_pending:
+            self.rejected += 1
+            return web.Response(status=503)
+
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            self.invalid += 1
+            logger.error(f"Invalid webhook update: {str(e)}")
+            return web.Response(status=400)
+        if update is None:
+            self.invalid += 1
+            return web.Response(status=400)
+
+        if isinstance(self.application.bot, ExtBot):
+            self.application.bot.insert_callback_data(update)
+        self._pending += 1
+        await self.application.update_queue.put(update)
+        self.received += 1
+        return web.Response()
+
+    def _update_done(self, update: object) -> None:
+        self._pending -= 1
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        body = self.stats()
+        body['status'] = 'ok' if self.application.running else 'starting'
+        if self._health is not None:
+            try:
+                body.update(self._health())
+            except Exception as e:
+                logger.error(f"Health check failed: {str(e)}")
+                body['status'] = 'error'
+        return web.Response(
+            status=200 if body['status'] == 'ok' else 503,
+            text=json.dumps(body),
+            content_type='application/json'
+        )
+
+    def pending(self) -> int:
+        """Return the number of updates queued or being processed."""
+        return self._pending
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and request counters.
+
+        Returns:
+            Dict[str, Any]: Server counters
+        """
+        return {
+            'pending': self.pending(),
+            'uptime': time.monotonic() - self.started_at if self.started_at is not None else None,
+            'received': self.received,
+            'rejected': self.rejected,
+            'invalid': self.invalid
+        }
+
+
+async def run_webhook(
+    application: Application,
+    server: WebhookServer,
+    url: str,
+    host: str = '0.0.0.0',
+    port: int = 8080,
+    max_connections: int = 40,
+    drop_pending_updates: bool = False,
+    stop_signals: Sequence[int] = (signal.SIGINT, signal.SIGTERM)
+) -> None:
+    """Run an Application behind a webhook server until a stop signal.
+
+    Follows the lifecycle of ``Application.run_polling``: initialize,
+    ``post_init``, start, then on exit stop, ``post_stop``, shutdown and
+    ``post_shutdown``. The webhook is registered with Telegram once the server
+    is listening and is left in place on exit, so Telegram keeps updates
+    until the next start.
+
+    Args:
+        application: The Application to run
+        server: Server receiving the updates
+        url: Public HTTPS URL of the webhook path
+        host: Interface to bind
+        port: Port to bind
+        max_connections: Simultaneous connections Telegram may open (1-100)
+        drop_pending_updates: Discard updates received while the bot was down
+        stop_signals: Signals stopping the bot
+    """
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    for sig in stop_signals:
+        try:
+            loop.add_signal_handler(sig, stopped.set)
+        except NotImplementedError:
+            pass
+
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await application.start()
+        await server.start(host, port)
+        await application.bot.set_webhook(
+            url,
+            secret_token=server.secret_token,
+            max_connections=max_connections,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=drop_pending_updates
+        )
+        logger.info(f"Webhook registered at {url}")
+        await stopped.wait()
+    finally:
+        await server.stop()
+        if application.running:
+            await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)